@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+BGP Policy Verifier
+
+Checks the traffic-engineering policy of BGP_POLICY_GUIDE.md against the
+live routers instead of printing commands to run by hand:
+  - every eBGP session (peering and transit) is Established
+  - on each peering router (r2, r7), the peer ISP's host prefixes have their
+    best path via the peering link with local-pref 200 (PREFER-PEERING)
+  - the transit path is still present as a backup with local-pref 100
+    (TRANSIT-BACKUP)
+The expected sessions and prefixes are derived from the topology spec. BGP
+tables of all BGP routers are pulled in parallel, one batched vtysh call
+per router.
+
+Usage (as root, while the network is running):
+    sudo python3 bgp_verify.py [--json] [--show-rib]
+"""
+
+import argparse
+import ipaddress
+import json
+import sys
+import time
+
+import vtysh_client
+from frr_gen import ConfigGenerator, INTER_AS
+from topology_spec import TopologySpec
+
+PEERING_LOCAL_PREF = 200
+TRANSIT_LOCAL_PREF = 100
+
+BGP_TABLE = 'show ip bgp json'
+BGP_SUMMARY = 'show ip bgp summary json'
+
+
+def _addr(ip):
+    return ip.split('/')[0]
+
+
+def host_prefixes(spec, as_name):
+    """Host networks attached to the routers of an AS"""
+    prefixes = []
+    for router in spec.routers_by_as[as_name]:
+        for entry in spec.interfaces(router):
+            if entry['type'] == 'Host':
+                prefixes.append(str(ipaddress.ip_interface(entry['ip']).network))
+    return prefixes
+
+
+def _local_pref(path):
+    return path.get('locPrf', path.get('localpref'))
+
+
+def _peer(path):
+    if path.get('peerId'):
+        return path['peerId']
+    nexthops = path.get('nexthops') or [{}]
+    return nexthops[0].get('ip')
+
+
+def best_path(paths):
+    for path in paths or []:
+        if path.get('bestpath'):
+            return path
+    return None
+
+
+class Result:
+    """Outcome of one policy check"""
+
+    def __init__(self, router, check, ok, expected, actual):
+        self.router = router
+        self.check = check
+        self.ok = ok
+        self.expected = expected
+        self.actual = actual
+
+    def to_dict(self):
+        return {'router': self.router, 'check': self.check, 'ok': self.ok,
+                'expected': self.expected, 'actual': self.actual}
+
+
+def bgp_routers(spec):
+    generator = ConfigGenerator(spec)
+    return [router for router in spec.routers
+            if generator.ibgp_peers(router)
+            or any(e['type'] in INTER_AS for e in spec.interfaces(router))]
+
+
+def check_router(spec, router, table, summary):
+    """Policy checks for one router given its BGP table and summary"""
+    results = []
+    sessions = [e for e in spec.interfaces(router) if e['type'] in INTER_AS]
+    peers = (summary or {}).get('ipv4Unicast', {}).get('peers', {})
+
+    for entry in sessions:
+        neighbor = _addr(entry['peer_ip'])
+        state = peers.get(neighbor, {}).get('state', 'missing')
+        kind = 'peering' if entry['type'] == 'Peering' else 'transit'
+        results.append(Result(router, f"{kind} session {neighbor} ({entry['peer']})",
+                              state == 'Established', 'Established', state))
+
+    peering = [e for e in sessions if e['type'] == 'Peering']
+    transit = [e for e in sessions if e['type'] == 'BGP']
+    routes = (table or {}).get('routes', {})
+
+    for link in peering:
+        neighbor = _addr(link['peer_ip'])
+        subnet = ipaddress.ip_interface(link['ip']).network
+        peer_as = spec.as_of[link['peer']]
+        for prefix in host_prefixes(spec, peer_as):
+            paths = routes.get(prefix)
+            best = best_path(paths)
+            if best is None:
+                results.append(Result(router, f'{prefix} best path', False,
+                                      f'via {neighbor}', 'no route'))
+                continue
+            via = _peer(best)
+            on_link = via is not None and ipaddress.ip_address(via) in subnet
+            results.append(Result(router, f'{prefix} best path', on_link,
+                                  f'via {neighbor} ({subnet})', f'via {via}'))
+            results.append(Result(router, f'{prefix} PREFER-PEERING local-pref',
+                                  _local_pref(best) == PEERING_LOCAL_PREF,
+                                  PEERING_LOCAL_PREF, _local_pref(best)))
+            for backup in transit:
+                transit_ip = _addr(backup['peer_ip'])
+                path = next((p for p in paths if _peer(p) == transit_ip), None)
+                actual = 'no path' if path is None else _local_pref(path)
+                results.append(Result(router, f'{prefix} TRANSIT-BACKUP via {transit_ip}',
+                                      actual == TRANSIT_LOCAL_PREF,
+                                      TRANSIT_LOCAL_PREF, actual))
+    return results
+
+
+def verify(spec, workers=32):
+    """Run all checks; returns (results, ribs, elapsed)"""
+    routers = bgp_routers(spec)
+    start = time.monotonic()
+    state = vtysh_client.collect_state(routers, [BGP_TABLE, BGP_SUMMARY], workers)
+    elapsed = time.monotonic() - start
+    results = []
+    for router in routers:
+        results += check_router(spec, router, state[router][BGP_TABLE],
+                                state[router][BGP_SUMMARY])
+    ribs = {router: state[router][BGP_TABLE] for router in routers}
+    return results, ribs, elapsed
+
+
+def rib_rows(ribs):
+    """(router, prefix, next hop, local-pref, AS path) of every best path"""
+    for router, table in ribs.items():
+        for prefix, paths in sorted((table or {}).get('routes', {}).items()):
+            best = best_path(paths)
+            if best:
+                yield (router, prefix, _peer(best) or '-', _local_pref(best),
+                       best.get('path', '') or '(local)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify the BGP traffic-engineering policy')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec (default: topology.json)')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    parser.add_argument('--show-rib', action='store_true',
+                        help='also print the best path of every prefix on every router')
+    args = parser.parse_args()
+
+    spec = TopologySpec.load(args.spec)
+    results, ribs, elapsed = verify(spec)
+    passed = sum(1 for r in results if r.ok)
+
+    if args.json:
+        data = {'ok': passed == len(results), 'elapsed': round(elapsed, 3),
+                'checks': [r.to_dict() for r in results]}
+        if args.show_rib:
+            data['best_paths'] = [dict(zip(('router', 'prefix', 'via', 'local_pref', 'as_path'),
+                                           row)) for row in rib_rows(ribs)]
+        print(json.dumps(data, indent=2))
+    else:
+        print(f"{'':2} {'Router':<7} {'Check':<48} {'Expected':<28} Actual")
+        print('-' * 104)
+        for r in results:
+            print(f"{'✓' if r.ok else '❌'} {r.router:<7} {r.check:<48} "
+                  f"{str(r.expected):<28} {r.actual}")
+        if args.show_rib:
+            print(f"\n{'Router':<7} {'Prefix':<18} {'Via':<15} {'LocPrf':>6}  AS path")
+            for router, prefix, via, local_pref, path in rib_rows(ribs):
+                print(f"{router:<7} {prefix:<18} {via:<15} "
+                      f"{'-' if local_pref is None else local_pref:>6}  {path}")
+        status = '✅' if passed == len(results) else '❌'
+        print(f"\n{status} {passed}/{len(results)} checks passed "
+              f"({len(ribs)} routers queried in {elapsed * 1000:.0f} ms)")
+
+    sys.exit(0 if passed == len(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
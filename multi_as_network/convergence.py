@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Convergence barrier for the Multi-AS network
+
+Polls the JSON state of every router through vtysh (concurrently, with all
+of a router's commands batched into one vtysh call by vtysh_client.py) and
+blocks until the declared convergence predicates hold, recording the
+time-to-converge of each protocol.
+
+Usage (as root, while the network is running):
+    sudo python3 convergence.py [--spec topology.json] [--timeout SECONDS] [--json]
+
+The expected neighbors, sessions and prefixes of every router are derived
+from the topology spec, so generated and edited topologies get their own
+barrier.
+"""
+
+import argparse
+import ipaddress
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import vtysh_client
+from frr_gen import ConfigGenerator, INTER_AS
+from topology_spec import TopologySpec
+
+
+def expectations_from_spec(spec):
+    """
+    Expected state per router once everything is up, derived from a
+    TopologySpec:
+      ospf_neighbors - OSPF adjacencies in Full state (intra-AS router links)
+      rip_routes     - minimum number of RIP routes in the RIB (the AS's IGP
+                       networks the router is not attached to)
+      bgp_peers      - BGP sessions in Established state (eBGP links plus
+                       the iBGP sessions frr_gen.py configures)
+      bgp_prefixes   - minimum number of prefixes received over BGP (host
+                       networks of other ASes)
+      pim_neighbors  - PIM neighbors (all router links)
+      routes         - prefixes that must be in the routing table (every
+                       host network)
+    """
+    generator = ConfigGenerator(spec)
+    host_prefixes = {}
+    for link in spec.links:
+        if link['type'] == 'Host':
+            router = link['dst'] if spec.is_router(link['dst']) else link['src']
+            ip = link['dst_ip'] if router == link['dst'] else link['src_ip']
+            host_prefixes[str(ipaddress.ip_interface(ip).network)] = spec.as_of[router]
+
+    igp_networks = {}
+    for router in spec.routers:
+        igp_networks[router] = {
+            str(ipaddress.ip_interface(e['ip']).network) for e in spec.interfaces(router)
+            if e['type'] not in INTER_AS and e['ip'] and e['link'].get('igp', True)}
+
+    expectations = {}
+    for router in spec.routers:
+        as_name = spec.as_of[router]
+        interfaces = spec.interfaces(router)
+        router_links = [e for e in interfaces if spec.is_router(e['peer'])]
+        ebgp = [e for e in router_links if e['type'] in INTER_AS]
+        expected = {}
+
+        if spec.as_info[as_name]['igp'].upper() == 'OSPF':
+            intra = len(router_links) - len(ebgp)
+            if intra:
+                expected['ospf_neighbors'] = intra
+        else:
+            domain = set().union(*(igp_networks[r] for r in spec.routers_by_as[as_name]))
+            remote = len(domain - igp_networks[router])
+            if remote:
+                expected['rip_routes'] = remote
+
+        peers = len(ebgp) + len(generator.ibgp_peers(router))
+        if peers:
+            expected['bgp_peers'] = peers
+            foreign = sum(1 for owner in host_prefixes.values() if owner != as_name)
+            if foreign:
+                expected['bgp_prefixes'] = foreign
+        if router_links:
+            expected['pim_neighbors'] = len(router_links)
+        if host_prefixes:
+            expected['routes'] = list(host_prefixes)
+        expectations[router] = expected
+    return expectations
+
+
+def ospf_full_neighbors(data):
+    """Count OSPF neighbors in Full state"""
+    count = 0
+    for entries in data.get('neighbors', {}).values():
+        for entry in entries:
+            state = entry.get('nbrState', entry.get('state', ''))
+            if state.startswith('Full'):
+                count += 1
+    return count
+
+
+def bgp_established_peers(data):
+    """Count BGP peers in Established state"""
+    peers = data.get('ipv4Unicast', {}).get('peers', {})
+    return sum(1 for peer in peers.values() if peer.get('state') == 'Established')
+
+
+def bgp_received_prefixes(data):
+    """Total prefixes received from all BGP peers"""
+    peers = data.get('ipv4Unicast', {}).get('peers', {})
+    return sum(peer.get('pfxRcd', 0) for peer in peers.values())
+
+
+def pim_neighbor_count(data):
+    """Count PIM neighbors across all interfaces"""
+    return sum(len(neighbors) for neighbors in data.values()
+               if isinstance(neighbors, dict))
+
+
+class Check:
+    """A single convergence predicate evaluated against one vtysh command"""
+
+    def __init__(self, protocol, router, command, predicate, description):
+        self.protocol = protocol
+        self.router = router
+        self.command = command
+        self.predicate = predicate
+        self.description = description
+
+    def evaluate(self, data):
+        if data is None:
+            return False
+        try:
+            return bool(self.predicate(data))
+        except (AttributeError, TypeError, KeyError):
+            return False
+
+
+def build_checks(expectations=None):
+    """
+    Turn a per-router expectation table into a list of Checks (default:
+    derived from topology.json)
+    """
+    if expectations is None:
+        expectations = expectations_from_spec(TopologySpec.load())
+    checks = []
+    for router, expected in expectations.items():
+        if 'ospf_neighbors' in expected:
+            n = expected['ospf_neighbors']
+            checks.append(Check('ospf', router, 'show ip ospf neighbor json',
+                                lambda d, n=n: ospf_full_neighbors(d) >= n,
+                                f'{n} OSPF neighbors Full'))
+        if 'rip_routes' in expected:
+            n = expected['rip_routes']
+            checks.append(Check('rip', router, 'show ip route rip json',
+                                lambda d, n=n: len(d) >= n,
+                                f'{n} RIP routes'))
+        if 'bgp_peers' in expected or 'bgp_prefixes' in expected:
+            n = expected.get('bgp_peers', 0)
+            p = expected.get('bgp_prefixes', 0)
+            checks.append(Check('bgp', router, 'show ip bgp summary json',
+                                lambda d, n=n, p=p: (bgp_established_peers(d) >= n
+                                                     and bgp_received_prefixes(d) >= p),
+                                f'{n} BGP peers Established, {p} prefixes received'))
+        if 'pim_neighbors' in expected:
+            n = expected['pim_neighbors']
+            checks.append(Check('pim', router, 'show ip pim neighbor json',
+                                lambda d, n=n: pim_neighbor_count(d) >= n,
+                                f'{n} PIM neighbors'))
+        if expected.get('routes'):
+            prefixes = list(expected['routes'])
+            checks.append(Check('routes', router, 'show ip route json',
+                                lambda d, prefixes=prefixes: all(p in d for p in prefixes),
+                                f'{len(prefixes)} required prefixes installed'))
+    return checks
+
+
+class ConvergenceResult:
+    """Outcome of a ConvergenceBarrier.wait() call"""
+
+    def __init__(self, converged, elapsed, protocol_times, pending, polls):
+        self.converged = converged
+        self.elapsed = elapsed
+        self.protocol_times = protocol_times
+        self.pending = pending
+        self.polls = polls
+
+    def to_dict(self):
+        return {
+            'converged': self.converged,
+            'elapsed': round(self.elapsed, 3),
+            'polls': self.polls,
+            'protocols': {protocol: (round(t, 3) if t is not None else None)
+                          for protocol, t in self.protocol_times.items()},
+            'pending': [f'{c.router} {c.protocol}: {c.description}' for c in self.pending],
+        }
+
+
+class ConvergenceBarrier:
+    """
+    Block until every Check holds.
+
+    Each poll round queries all routers with pending checks concurrently;
+    `query(router, commands)` returns one parsed document per command.
+    The poll interval starts at `min_interval` and grows by `backoff` up to
+    `max_interval` while nothing changes; it drops back to `min_interval`
+    as soon as a round makes progress.
+    """
+
+    def __init__(self, checks=None, query=vtysh_client.query, workers=16,
+                 min_interval=0.1, max_interval=2.0, backoff=1.5):
+        self.checks = build_checks() if checks is None else checks
+        self.query = query
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+    def _poll_router(self, router, checks):
+        """Evaluate all checks of one router with a single batched query"""
+        commands = list(dict.fromkeys(check.command for check in checks))
+        results = dict(zip(commands, self.query(router, commands)))
+        return [check for check in checks if check.evaluate(results[check.command])]
+
+    def _poll(self, pool, checks):
+        """Evaluate checks on all routers concurrently, return the ones that hold"""
+        by_router = {}
+        for check in checks:
+            by_router.setdefault(check.router, []).append(check)
+        futures = [pool.submit(self._poll_router, router, router_checks)
+                   for router, router_checks in by_router.items()]
+        passed = set()
+        for future in futures:
+            passed.update(future.result())
+        return passed
+
+    def wait(self, timeout=120, on_converged=None):
+        """
+        Poll until all checks hold or `timeout` seconds pass.
+
+        `on_converged(protocol, seconds)` is called the first time every
+        check of a protocol holds. A final confirmation round re-evaluates
+        all checks before declaring convergence, so a flapping session
+        puts its protocol back into the pending set.
+        """
+        protocols = sorted({check.protocol for check in self.checks})
+        protocol_times = {protocol: None for protocol in protocols}
+        pending = set(self.checks)
+        interval = self.min_interval
+        polls = 0
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                polls += 1
+                # Once everything has passed once, confirm with a full round
+                confirming = not pending
+                passed = self._poll(pool, self.checks if confirming else pending)
+                now = time.monotonic()
+
+                if confirming:
+                    pending = set(self.checks) - passed
+                    if not pending:
+                        return ConvergenceResult(True, now - start, protocol_times, [], polls)
+                    for check in pending:
+                        protocol_times[check.protocol] = None
+                    progress = False
+                else:
+                    progress = bool(passed)
+                    pending -= passed
+
+                for protocol in protocols:
+                    done = not any(check.protocol == protocol for check in pending)
+                    if done and protocol_times[protocol] is None:
+                        protocol_times[protocol] = now - start
+                        if on_converged:
+                            on_converged(protocol, now - start)
+
+                if now >= deadline:
+                    return ConvergenceResult(False, now - start, protocol_times,
+                                             sorted(pending, key=lambda c: (c.router, c.protocol)),
+                                             polls)
+
+                interval = self.min_interval if progress else min(interval * self.backoff,
+                                                                  self.max_interval)
+                if not pending:
+                    # Confirm straight away
+                    continue
+                time.sleep(min(interval, max(0.0, deadline - now)))
+
+
+def wait_for_convergence(timeout=120, expectations=None, query=vtysh_client.query,
+                         on_converged=None):
+    """Convenience wrapper: build checks from expectations and wait"""
+    barrier = ConvergenceBarrier(build_checks(expectations), query=query)
+    return barrier.wait(timeout=timeout, on_converged=on_converged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wait until the network has converged')
+    parser.add_argument('--timeout', type=float, default=120,
+                        help='give up after this many seconds (default: 120)')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec the network was built from '
+                             '(default: topology.json)')
+    parser.add_argument('--json', action='store_true',
+                        help='print the result as JSON')
+    args = parser.parse_args()
+
+    def report(protocol, seconds):
+        if not args.json:
+            print(f"✓ {protocol.upper()} converged after {seconds:.2f}s")
+
+    expectations = expectations_from_spec(TopologySpec.load(args.spec))
+    result = wait_for_convergence(args.timeout, expectations, on_converged=report)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    elif result.converged:
+        print(f"✅ Network converged in {result.elapsed:.2f}s ({result.polls} polls)")
+    else:
+        print(f"❌ Not converged after {result.elapsed:.2f}s, still waiting for:")
+        for item in result.to_dict()['pending']:
+            print(f"   - {item}")
+
+    sys.exit(0 if result.converged else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Headless Experiment Runner
+
+Runs an experiment file against the Multi-AS network without the Mininet
+CLI, saves structured results (JSON + CSV with timings) and exits non-zero
+if any step failed, so trials can run unattended:
+
+    sudo python3 experiment.py experiment_failover.json --out results/failover
+    sudo python3 run.py --experiment experiment_failover.json --out results/failover
+
+An experiment file is JSON:
+
+    {
+      "name": "peering-failover",
+      "trials": 10,
+      "continue_on_failed_trial": true,
+      "setup":    [ ...steps run once after the network is up... ],
+      "steps":    [ ...steps run once per trial... ],
+      "teardown": [ ...steps run once at the end, even after a failure... ]
+    }
+
+A failed trial stops the remaining trials unless "continue_on_failed_trial"
+is true (default: false); setup failures always skip the trials, and
+teardown always runs.
+
+Step actions:
+    start           build the network and start FRR (implicit if missing)
+                    options: "converge_timeout", "link_profile", "fast_build"
+    wait_converged  block on the convergence barrier     {"timeout": 120}
+    run             run commands on nodes in parallel     {"nodes": {"pc1": "ping -c 3 pc4"}}
+                    or one command on many nodes          {"nodes": ["pc1", "pc2"], "command": "..."}
+                    options: "timeout", "background", "expect_status", "parse": "json"|"jsonl"
+    wait            wait for background commands          {"nodes": ["pc1"]}
+    collect         read result files written by nodes    {"path": "/tmp/{node}-{trial}.jsonl", "nodes": [...]}
+    fail_link       bring a link down                     {"link": ["r2", "r7"]}
+    restore_link    bring a link back up                  {"link": ["r2", "r7"]}
+    link_profile    switch link shaping at runtime        {"profile": "lossy-transit"}
+    sleep           pause                                 {"seconds": 5}
+    stop            stop FRR and tear the network down
+
+Every step may set "name" and "continue_on_error". A step that raises
+(bad options, a node shell error, ...) is recorded as failed with the error. "{trial}" and "{node}"
+in commands and paths are replaced with the trial number and node name.
+"""
+
+import argparse
+import csv
+import json
+import shlex
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from mininet.log import setLogLevel, info
+
+import link_profiles
+import node_exec
+from run import start_network, stop_network, wait_converged
+
+
+class StepError(Exception):
+    """An experiment step could not be executed"""
+
+
+def _substitute(text, trial, node=None):
+    text = text.replace('{trial}', str(trial))
+    if node is not None:
+        text = text.replace('{node}', node)
+    return text
+
+
+def _parse(output, kind):
+    if kind == 'json':
+        return json.loads(output)
+    if kind == 'jsonl':
+        return [json.loads(line) for line in output.splitlines() if line.strip()]
+    return None
+
+
+def node_command(node, command, timeout=None):
+    """Run a command in a node's shell; returns (status, elapsed, output)"""
+    if timeout:
+        command = f'timeout {timeout:g} bash -c {shlex.quote(command)}'
+    start = time.monotonic()
+    output = node.cmd(command)
+    status = node_exec.last_status(node)
+    return status, time.monotonic() - start, output
+
+
+class Experiment:
+    """Executes the steps of an experiment file and records their results"""
+
+    def __init__(self, spec, workers=None, converge_timeout=120, link_profile=None,
+                 fast_build=False, topology=None):
+        self.spec = spec
+        self.name = spec.get('name', 'experiment')
+        self.workers = workers
+        self.converge_timeout = converge_timeout
+        self.link_profile = link_profile
+        self.fast_build = fast_build
+        self.topology = topology
+        self.net = None
+        self.routers = []
+        self.records = []
+        self.ok = True
+
+    # -- actions ---------------------------------------------------------
+
+    def _node(self, name):
+        if self.net is None:
+            raise StepError('network is not running (missing start step?)')
+        try:
+            return self.net[name]
+        except KeyError:
+            raise StepError(f'unknown node {name}')
+
+    def _targets(self, step, trial):
+        """[(node, command)] for a run step"""
+        nodes = step.get('nodes', {})
+        if isinstance(nodes, dict):
+            pairs = list(nodes.items())
+        else:
+            if 'command' not in step:
+                raise StepError('run step needs "command" when "nodes" is a list')
+            pairs = [(node, step['command']) for node in nodes]
+        return [(node, _substitute(command, trial, node)) for node, command in pairs]
+
+    def do_start(self, step, trial):
+        if self.net is not None:
+            raise StepError('network is already running')
+        timeout = step.get('converge_timeout', self.converge_timeout)
+        profile = step.get('link_profile', self.link_profile)
+        fast = step.get('fast_build', self.fast_build)
+        self.net, self.routers = start_network(self.workers, timeout, profile, fast,
+                                               self.topology)
+        return {'nodes': len(self.net.hosts), 'link_profile': profile,
+                'timings': {phase: round(seconds, 4)
+                            for phase, seconds in self.net.timings.items()}}
+
+    def do_stop(self, step, trial):
+        if self.net is not None:
+            stop_network(self.net, self.routers, self.workers)
+            self.net = None
+        return {}
+
+    def do_wait_converged(self, step, trial):
+        result = wait_converged(step.get('timeout', self.converge_timeout or 120),
+                                self.net.spec if self.net is not None else None)
+        details = result.to_dict()
+        details['ok'] = result.converged
+        return details
+
+    def do_run(self, step, trial):
+        targets = self._targets(step, trial)
+        timeout = step.get('timeout')
+        background = step.get('background', False)
+        expect = step.get('expect_status', 0)
+        parse = step.get('parse')
+
+        # One worker per node: a node's shell runs one command at a time
+        by_node = {}
+        for node, command in targets:
+            by_node.setdefault(node, []).append(command)
+
+        def run_node(node_name):
+            node = self._node(node_name)
+            results = []
+            for command in by_node[node_name]:
+                if background:
+                    node.cmd(f'{command} &')
+                    results.append({'node': node_name, 'command': command,
+                                    'background': True, 'ok': True})
+                    continue
+                status, elapsed, output = node_command(node, command, timeout)
+                entry = {'node': node_name, 'command': command, 'status': status,
+                         'elapsed': round(elapsed, 4), 'output': output,
+                         'ok': expect is None or status == expect}
+                if parse and entry['ok']:
+                    try:
+                        entry['parsed'] = _parse(output, parse)
+                    except ValueError as e:
+                        entry['ok'] = False
+                        entry['error'] = f'cannot parse output as {parse}: {e}'
+                results.append(entry)
+            return results
+
+        with ThreadPoolExecutor(max_workers=max(1, len(by_node))) as pool:
+            nodes = [entry for result in pool.map(run_node, by_node) for entry in result]
+        return {'nodes': nodes, 'ok': all(entry['ok'] for entry in nodes)}
+
+    def do_wait(self, step, trial):
+        nodes = step.get('nodes', [])
+
+        def wait_node(name):
+            start = time.monotonic()
+            self._node(name).cmd('wait')
+            return {'node': name, 'elapsed': round(time.monotonic() - start, 4), 'ok': True}
+
+        with ThreadPoolExecutor(max_workers=max(1, len(nodes))) as pool:
+            return {'nodes': list(pool.map(wait_node, nodes))}
+
+    def do_collect(self, step, trial):
+        # Mininet nodes share the host filesystem, so files are read directly
+        parse = step.get('parse')
+        collected = []
+        for name in step.get('nodes', [None]):
+            path = _substitute(step['path'], trial, name)
+            entry = {'node': name, 'path': path, 'ok': True}
+            try:
+                text = Path(path).read_text()
+                entry['parsed' if parse else 'content'] = _parse(text, parse) if parse else text
+            except (OSError, ValueError) as e:
+                entry['ok'] = False
+                entry['error'] = str(e)
+            collected.append(entry)
+        return {'nodes': collected, 'ok': all(entry['ok'] for entry in collected)}
+
+    def _link_status(self, step, status):
+        if self.net is None:
+            raise StepError('network is not running')
+        a, b = step['link']
+        start = time.monotonic()
+        self.net.configLinkStatus(a, b, status)
+        return {'link': [a, b], 'status': status,
+                'at': round(time.time(), 6), 'elapsed': round(time.monotonic() - start, 4)}
+
+    def do_fail_link(self, step, trial):
+        return self._link_status(step, 'down')
+
+    def do_restore_link(self, step, trial):
+        return self._link_status(step, 'up')
+
+    def do_link_profile(self, step, trial):
+        if self.net is None:
+            raise StepError('network is not running')
+        try:
+            profiles = link_profiles.LinkProfiles.load(step.get('file'))
+            # Shape the links of the running topology, not topology.json
+            name, failed = link_profiles.apply_profile(self.net.spec, profiles,
+                                                       step['profile'])
+        except OSError as e:
+            raise StepError(f'cannot apply link profile: {e}')
+        details = {'profile': name, 'ok': not failed}
+        if failed:
+            details['error'] = '; '.join(f'{node}: {output}' for node, output in failed.items())
+        return details
+
+    def do_sleep(self, step, trial):
+        time.sleep(step.get('seconds', 1))
+        return {}
+
+    # -- driver ----------------------------------------------------------
+
+    def run_step(self, index, step, trial, phase):
+        action = step.get('action')
+        handler = getattr(self, f'do_{action}', None)
+        name = step.get('name', action)
+        info(f'*** [{phase} {trial}] step {index}: {name}\n')
+        start = time.monotonic()
+        try:
+            if handler is None:
+                raise StepError(f'unknown action {action!r}')
+            details = handler(step, trial)
+            ok = details.pop('ok', True)
+        except StepError as e:
+            details = {'error': str(e)}
+            ok = False
+        except Exception as e:
+            # A broken step or node shell fails this step, not the whole run
+            details = {'error': f'{type(e).__name__}: {e}'}
+            ok = False
+        record = {
+            'trial': trial,
+            'phase': phase,
+            'step': index,
+            'name': name,
+            'action': action,
+            'ok': ok,
+            'elapsed': round(time.monotonic() - start, 4),
+            **details,
+        }
+        self.records.append(record)
+        if not ok:
+            self.ok = False
+            info(f'*** step {index} ({name}) FAILED: {details.get("error", "")}\n')
+        return ok or step.get('continue_on_error', False)
+
+    def run_steps(self, steps, trial, phase):
+        for index, step in enumerate(steps):
+            if not self.run_step(index, step, trial, phase):
+                return False
+        return True
+
+    def run(self):
+        setup = self.spec.get('setup', [])
+        steps = self.spec.get('steps', [])
+        teardown = self.spec.get('teardown', [])
+        trials = self.spec.get('trials', 1)
+
+        start = time.monotonic()
+        try:
+            if not any(step.get('action') == 'start' for step in setup + steps):
+                setup = [{'action': 'start'}] + setup
+            if self.run_steps(setup, 0, 'setup'):
+                for trial in range(1, trials + 1):
+                    if not self.run_steps(steps, trial, 'trial') and \
+                            not self.spec.get('continue_on_failed_trial', False):
+                        break
+            self.run_steps(teardown, 0, 'teardown')
+        finally:
+            if self.net is not None:
+                self.do_stop({}, 0)
+        return {
+            'name': self.name,
+            'ok': self.ok,
+            'trials': trials,
+            'elapsed': round(time.monotonic() - start, 3),
+            'steps': self.records,
+        }
+
+
+CSV_FIELDS = ['trial', 'phase', 'step', 'name', 'action', 'node', 'ok', 'status', 'elapsed']
+
+
+def csv_rows(results):
+    """One row per step, or per node for steps that ran on several nodes"""
+    for record in results['steps']:
+        base = {key: record.get(key) for key in CSV_FIELDS}
+        nodes = record.get('nodes')
+        if isinstance(nodes, list) and nodes:
+            for entry in nodes:
+                row = dict(base)
+                row.update({key: entry[key] for key in ('node', 'ok', 'status', 'elapsed')
+                            if key in entry})
+                yield row
+        else:
+            yield base
+
+
+def save_results(results, prefix):
+    Path(prefix).parent.mkdir(parents=True, exist_ok=True)
+    with open(f'{prefix}.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    with open(f'{prefix}.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(csv_rows(results))
+
+
+def run_experiment_file(path, out=None, workers=None, converge_timeout=120,
+                        link_profile=None, fast_build=False, topology=None):
+    """
+    Run an experiment file, save its results and return the exit status.
+    `topology` is a TopologySpec to run it on (default: topology.json).
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    results = Experiment(spec, workers, converge_timeout, link_profile, fast_build,
+                         topology).run()
+    out = out or f"results/{results['name']}-{time.strftime('%Y%m%d-%H%M%S')}"
+    save_results(results, out)
+
+    failed = sum(1 for record in results['steps'] if not record['ok'])
+    state = 'passed' if results['ok'] else f'FAILED ({failed} steps)'
+    info(f"\n*** Experiment {results['name']} {state} in {results['elapsed']:.1f}s\n")
+    info(f"*** Results: {out}.json, {out}.csv\n")
+    return 0 if results['ok'] else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run an experiment file headless')
+    parser.add_argument('experiment', help='experiment file (JSON)')
+    parser.add_argument('--out', default=None,
+                        help='results prefix (default: results/<name>-<timestamp>)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='max routers to start/stop FRR on concurrently')
+    parser.add_argument('--converge-timeout', type=float, default=120,
+                        help='convergence wait after start (0 to skip)')
+    parser.add_argument('--link-profile', default=None,
+                        help='link shaping profile to start with (see link_profiles.py)')
+    parser.add_argument('--fast-build', action='store_true',
+                        help='batched, parallel network bring-up (see fast_build.py)')
+    args = parser.parse_args()
+
+    setLogLevel('info')
+    sys.exit(run_experiment_file(args.experiment, args.out, args.workers,
+                                 args.converge_timeout, args.link_profile,
+                                 args.fast_build))
+
+
+if __name__ == '__main__':
+    main()
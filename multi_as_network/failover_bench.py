@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Link-Failure Reconvergence Benchmark
+
+Starts the network, then for each trial:
+  1. runs a probe stream (traffic.py) between two hosts, pc1 -> pc4 by default
+  2. brings a link down with Mininet's configLinkStatus (r2-r7 peering by
+     default, so traffic has to fall back to transit via r4-r5-r6)
+  3. watches the routing tables of all routers until they stop changing and
+     records, per protocol (bgp, ospf, rip, connected), when the last change
+     happened
+  4. brings the link back up and measures the same way
+  5. reads the probe result: the data-plane outage is the sequence gap that
+     follows each event
+Results are summarized over all trials (mean, p50, max).
+
+Usage (as root):
+    sudo python3 failover_bench.py --trials 5 --json-out failover.json
+    sudo python3 failover_bench.py --link r2 r4 --src pc2 --dst pc3
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from mininet.log import setLogLevel, info
+
+import vtysh_client
+from run import start_network, stop_network
+from traffic import PROBE_PORT
+
+TRAFFIC = Path(__file__).resolve().with_name('traffic.py')
+ROUTE_TABLE = 'show ip route json'
+
+
+def routing_fingerprint(state):
+    """protocol -> frozenset of (router, prefix, next hops) of selected routes"""
+    fingerprint = {}
+    for router, documents in state.items():
+        routes = documents.get(ROUTE_TABLE) or {}
+        for prefix, entries in routes.items():
+            for entry in entries:
+                if not entry.get('selected'):
+                    continue
+                hops = tuple(sorted(f"{hop.get('ip', '')}%{hop.get('interfaceName', '')}"
+                                    for hop in entry.get('nexthops', [])
+                                    if hop.get('active', True)))
+                fingerprint.setdefault(entry.get('protocol', '?'), set()).add(
+                    (router, prefix, hops))
+    return {protocol: frozenset(entries) for protocol, entries in fingerprint.items()}
+
+
+def watch_routing(routers, event_time, settle=5.0, timeout=90.0, interval=0.05):
+    """
+    Poll all routing tables until nothing has changed for `settle` seconds.
+
+    Returns (times, settled) where times maps protocol -> seconds from
+    `event_time` (a time.monotonic() value) to the last change of that
+    protocol's routes.
+    """
+    last = routing_fingerprint(vtysh_client.collect_state(routers, [ROUTE_TABLE]))
+    changed = {}
+    while True:
+        time.sleep(interval)
+        current = routing_fingerprint(vtysh_client.collect_state(routers, [ROUTE_TABLE]))
+        now = time.monotonic()
+        for protocol in set(current) | set(last):
+            if current.get(protocol) != last.get(protocol):
+                changed[protocol] = now
+        last = current
+        quiet_since = max(changed.values(), default=event_time)
+        if now - quiet_since >= settle:
+            return {p: round(t - event_time, 3) for p, t in sorted(changed.items())}, True
+        if now - event_time >= timeout:
+            return {p: round(t - event_time, 3) for p, t in sorted(changed.items())}, False
+
+
+def outage_after(probe, event_wall, until_wall=None):
+    """Total duration (ms) and loss of the probe gaps starting after an event"""
+    gaps = [gap for gap in probe.get('gaps', [])
+            if gap['end'] >= event_wall and (until_wall is None or gap['start'] < until_wall)]
+    return (round(sum(gap['duration_ms'] for gap in gaps), 3),
+            sum(gap['lost'] for gap in gaps))
+
+
+def run_trial(net, routers, trial, args):
+    src, dst = net[args.src], net[args.dst]
+    a, b = args.link
+    result_file = f'/tmp/failover-probe-{trial}.json'
+
+    receiver = dst.cmd(f'python3 {TRAFFIC} probe-recv --port {PROBE_PORT} '
+                       f'--out {result_file} > /dev/null 2>&1 & echo $!').strip()
+    time.sleep(0.5)
+    sender = src.cmd(f'python3 {TRAFFIC} probe-send {dst.IP()} --port {PROBE_PORT} '
+                     f'--rate {args.rate} --duration 100000 > /dev/null 2>&1 & echo $!').strip()
+    time.sleep(args.warmup)
+
+    record = {'trial': trial}
+    for event, status in (('fail', 'down'), ('restore', 'up')):
+        info(f'*** Trial {trial}: link {a}-{b} {status}\n')
+        wall = time.time()
+        start = time.monotonic()
+        net.configLinkStatus(a, b, status)
+        times, settled = watch_routing(routers, start, args.settle, args.timeout)
+        record[event] = {'at': round(wall, 6), 'control_plane': times, 'settled': settled}
+        time.sleep(args.warmup)
+
+    src.cmd(f'kill {sender}; wait {sender}')
+    dst.cmd(f'kill {receiver}; wait {receiver}')
+    try:
+        with open(result_file) as f:
+            probe = json.load(f)
+    except (OSError, ValueError):
+        probe = {}
+    record['probe'] = {key: probe.get(key) for key in ('received', 'expected', 'lost')}
+    fail_ms, fail_lost = outage_after(probe, record['fail']['at'], record['restore']['at'])
+    restore_ms, restore_lost = outage_after(probe, record['restore']['at'])
+    record['fail']['outage_ms'], record['fail']['lost'] = fail_ms, fail_lost
+    record['restore']['outage_ms'], record['restore']['lost'] = restore_ms, restore_lost
+    return record
+
+
+def summarize(values):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    return {'mean': round(sum(values) / len(values), 3),
+            'p50': values[len(values) // 2],
+            'max': values[-1],
+            'n': len(values)}
+
+
+def summary(records):
+    result = {}
+    for event in ('fail', 'restore'):
+        protocols = sorted({p for r in records for p in r[event]['control_plane']})
+        result[event] = {
+            'outage_ms': summarize([r[event]['outage_ms'] for r in records]),
+            'lost': summarize([r[event]['lost'] for r in records]),
+            'control_plane_s': {p: summarize([r[event]['control_plane'].get(p)
+                                              for r in records])
+                                for p in protocols},
+            'unsettled': sum(1 for r in records if not r[event]['settled']),
+        }
+    return result
+
+
+def print_summary(result, args):
+    print(f"\n📊 Link {args.link[0]}-{args.link[1]}, probe {args.src} -> {args.dst} "
+          f"at {args.rate} pps, {args.trials} trials")
+    for event, data in result.items():
+        outage = data['outage_ms']
+        print(f"\n  {event.upper()}")
+        if outage:
+            print(f"   data-plane outage:  mean {outage['mean']:.1f} ms, "
+                  f"p50 {outage['p50']:.1f} ms, max {outage['max']:.1f} ms")
+        for protocol, stats in data['control_plane_s'].items():
+            print(f"   {protocol:<18}  mean {stats['mean']:.2f} s, "
+                  f"p50 {stats['p50']:.2f} s, max {stats['max']:.2f} s ({stats['n']} trials)")
+        if data['unsettled']:
+            print(f"   ⚠️  routing did not settle within the timeout in "
+                  f"{data['unsettled']} trials")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Link-failure reconvergence benchmark')
+    parser.add_argument('--link', nargs=2, default=['r2', 'r7'], metavar=('A', 'B'),
+                        help='link to fail (default: r2 r7, the peering link)')
+    parser.add_argument('--src', default='pc1', help='probe sender (default: pc1)')
+    parser.add_argument('--dst', default='pc4', help='probe receiver (default: pc4)')
+    parser.add_argument('--rate', type=int, default=1000,
+                        help='probe packets per second (default: 1000)')
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--warmup', type=float, default=2.0,
+                        help='seconds of steady traffic around each event (default: 2)')
+    parser.add_argument('--settle', type=float, default=5.0,
+                        help='routing is converged after this long without changes '
+                             '(default: 5s; RIP may need more)')
+    parser.add_argument('--timeout', type=float, default=90.0,
+                        help='max seconds to wait for routing to settle (default: 90)')
+    parser.add_argument('--converge-timeout', type=float, default=120)
+    parser.add_argument('--json-out', default=None,
+                        help='write per-trial records and the summary here')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setLogLevel('info')
+    net, routers = start_network(converge_timeout=args.converge_timeout)
+    records = []
+    try:
+        for trial in range(1, args.trials + 1):
+            records.append(run_trial(net, routers, trial, args))
+    finally:
+        stop_network(net, routers)
+
+    result = summary(records)
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'link': args.link, 'src': args.src, 'dst': args.dst,
+                       'rate': args.rate, 'trials': records, 'summary': result}, f, indent=2)
+    print_summary(result, args)
+    unsettled = any(data['unsettled'] for data in result.values())
+    sys.exit(1 if unsettled or len(records) < args.trials else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Fast Mininet Bring-up
+
+The stock Mininet build runs several small shell commands per interface
+(veth creation in the first node's namespace, then ifconfig for the
+address and the link state) and creates nodes one after another, so a
+generated topology with a few hundred routers takes minutes to come up.
+
+TimedMininet keeps the stock build but records how long each phase takes.
+FastMininet replaces the phases:
+  - nodes:      node shells are started concurrently
+  - links:      every veth pair is created, straight into both namespaces,
+                by one `ip -batch` in the root namespace
+  - addressing: each node gets one `ip -batch` file (addresses, link state,
+                default route) plus its tc shaping, and nodes are
+                configured concurrently
+Both expose `net.timings` (phase -> seconds). FastMininet is meant for
+controller- and switch-less topologies such as NetworkTopo.
+
+Usage (as root):
+    sudo python3 fast_build.py --num-as 10 --routers-per-as 30
+    sudo python3 fast_build.py --num-as 10 --routers-per-as 30 --stock
+    sudo python3 run.py --fast-build
+"""
+
+import argparse
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mininet.net import Mininet
+from mininet.link import Link
+from mininet.log import setLogLevel, info
+
+import node_exec
+from link_profiles import SHAPING_KEYS, tc_commands
+from topology import GeneratedTopo, LinuxRouter
+
+PHASES = [('nodes', 'node creation'), ('links', 'link creation'),
+          ('addressing', 'addressing'), ('frr', 'FRR start')]
+
+
+class TimedMininet(Mininet):
+    """Stock Mininet build that records per-phase timings in `self.timings`"""
+
+    def __init__(self, *args, **kwargs):
+        self.timings = {}
+        super(TimedMininet, self).__init__(*args, **kwargs)
+
+    def timed(self, phase, function, *args):
+        start = time.monotonic()
+        result = function(*args)
+        self.timings[phase] = self.timings.get(phase, 0.0) + time.monotonic() - start
+        return result
+
+    def add_nodes(self, topo):
+        for name in topo.hosts():
+            self.addHost(name, **topo.nodeInfo(name))
+        for name in topo.switches():
+            self.addSwitch(name, **topo.nodeInfo(name))
+
+    def add_links(self, topo):
+        for _, _, params in topo.links(sort=True, withInfo=True):
+            self.addLink(**params)
+
+    def buildFromTopo(self, topo=None):
+        topo = topo or self.topo
+        info('*** Adding nodes\n')
+        self.timed('nodes', self.add_nodes, topo)
+        info('*** Adding links\n')
+        self.timed('links', self.add_links, topo)
+
+    def configHosts(self):
+        self.timed('addressing', super(TimedMininet, self).configHosts)
+
+
+class BatchedLink(Link):
+    """A Link whose veth pair is queued in `veths` instead of created right away"""
+
+    def __init__(self, node1, node2, veths=None, **params):
+        self.veths = veths
+        super(BatchedLink, self).__init__(node1, node2, **params)
+
+    def makeIntfPair(self, intfname1, intfname2, addr1=None, addr2=None,
+                     node1=None, node2=None, deleteIntfs=True):
+        self.veths.append((intfname1, addr1, node1, intfname2, addr2, node2))
+
+
+def _netns(node):
+    return node.pid if node.inNamespace else 1
+
+
+def veth_batch(veths):
+    """`ip -batch` lines creating veth pairs directly in their namespaces"""
+    lines = []
+    for name1, addr1, node1, name2, addr2, node2 in veths:
+        mac1 = f' address {addr1}' if addr1 else ''
+        mac2 = f' address {addr2}' if addr2 else ''
+        lines.append(f'link add name {name1}{mac1} netns {_netns(node1)} '
+                     f'type veth peer name {name2}{mac2} netns {_netns(node2)}')
+    return lines
+
+
+class FastMininet(TimedMininet):
+    """
+    Mininet with batched, concurrent bring-up. `workers` caps how many
+    nodes are created or configured at once.
+    """
+
+    def __init__(self, *args, workers=64, **kwargs):
+        self.workers = workers
+        self.veths = []
+        self.addresses = {}   # Intf -> 'ip/prefix'
+        self.shaping = {}     # Intf -> TCLink parameters
+        super(FastMininet, self).__init__(*args, **kwargs)
+
+    def _map(self, function, items):
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(items)))) as pool:
+            return list(pool.map(function, items))
+
+    def add_nodes(self, topo):
+        if topo.switches():
+            raise Exception('FastMininet does not support switches')
+        names = topo.hosts()
+        self._map(lambda name: self.addHost(name, **topo.nodeInfo(name)), names)
+        # Keep topology order, as the stock build does
+        order = {name: index for index, name in enumerate(names)}
+        self.hosts.sort(key=lambda node: order[node.name])
+
+    def add_links(self, topo):
+        for _, _, params in topo.links(sort=True, withInfo=True):
+            params = dict(params)
+            # Shaping is done with tc later, so plain interfaces are enough
+            params.pop('intf', None)
+            split = []
+            for key in ('params1', 'params2'):
+                intf_params = dict(params.get(key) or {})
+                ip = intf_params.pop('ip', None)
+                shaping = {k: intf_params.pop(k) for k in SHAPING_KEYS if k in intf_params}
+                # Skip Intf.config()'s ifconfig: addressing does it in batch
+                intf_params['up'] = None
+                params[key] = intf_params
+                split.append((ip, shaping))
+            link = self.addLink(cls=BatchedLink, veths=self.veths, **params)
+            for intf, (ip, shaping) in zip((link.intf1, link.intf2), split):
+                if ip:
+                    self.addresses[intf] = ip
+                if shaping:
+                    self.shaping[intf] = shaping
+
+        output = subprocess.run(['ip', '-force', '-batch', '-'],
+                                input='\n'.join(veth_batch(self.veths)) + '\n',
+                                capture_output=True, text=True)
+        if output.returncode != 0:
+            raise Exception(f'Error creating interface pairs: {output.stderr.strip()}')
+
+    def node_batch(self, node):
+        """(`ip -batch` lines, extra shell commands) configuring one node"""
+        lines = ['link set lo up']
+        commands = []
+        # The node's own IP goes on its default interface, as in configDefault()
+        ip = node.params.get('ip')
+        default = node.defaultIntf()
+        for intf in node.intfList():
+            if intf.name == 'lo':
+                continue
+            address = self.addresses.get(intf)
+            if address is None and ip and intf is default:
+                address = ip if '/' in ip else f'{ip}/{self.prefixLen}'
+            if address:
+                lines.append(f'addr add {address} dev {intf.name}')
+                intf.ip, intf.prefixLen = address.split('/')
+            lines.append(f'link set {intf.name} up')
+            if intf in self.shaping:
+                commands += tc_commands(intf.name, self.shaping[intf])[1:]
+
+        route = node.params.get('defaultRoute')
+        if route:
+            lines.append(f'route replace default {route if " " in route else "dev " + route}')
+        if isinstance(node, LinuxRouter):
+            commands.append('sysctl -q net.ipv4.ip_forward=1')
+        return lines, commands
+
+    def configure_node(self, node):
+        """Apply a node's batch; returns (node, error output or '')"""
+        lines, commands = self.node_batch(node)
+        path = f'/tmp/mn-batch-{node.name}'
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        output = node.cmd(f'ip -force -batch {path}')
+        status = node_exec.last_status(node)
+        os.unlink(path)
+        errors = output.strip() if status != 0 else ''
+        if commands:
+            errors += node.cmd('; '.join(commands)).strip()
+        return node, errors
+
+    def configHosts(self):
+        start = time.monotonic()
+        results = self._map(self.configure_node, self.hosts)
+        self.timings['addressing'] = time.monotonic() - start
+        for node, errors in results:
+            if errors:
+                info(f'*** {node.name}: {errors}\n')
+
+
+def report_timings(timings):
+    """Print the bring-up phases and their total"""
+    parts = [f'{label} {timings[phase]:.2f}s' for phase, label in PHASES if phase in timings]
+    total = sum(timings[phase] for phase, _ in PHASES if phase in timings)
+    info(f"*** Bring-up: {', '.join(parts)} (total {total:.2f}s)\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time Mininet bring-up of a generated topology')
+    parser.add_argument('--num-as', type=int, default=10)
+    parser.add_argument('--routers-per-as', type=int, default=30)
+    parser.add_argument('--igp', default='ospf')
+    parser.add_argument('--hosts-per-edge', type=int, default=1)
+    parser.add_argument('--link-profile', default=None,
+                        help='shape links with a profile from link_profiles.json')
+    parser.add_argument('--workers', type=int, default=64,
+                        help='nodes created/configured concurrently (default: 64)')
+    parser.add_argument('--stock', action='store_true',
+                        help='use the stock Mininet build for comparison')
+    args = parser.parse_args()
+
+    setLogLevel('info')
+    topo = GeneratedTopo(num_as=args.num_as, routers_per_as=args.routers_per_as,
+                         igp=args.igp, hosts_per_edge=args.hosts_per_edge,
+                         link_profile=args.link_profile)
+    info(f'*** {len(topo.spec.routers)} routers, {len(topo.spec.hosts)} hosts, '
+         f'{len(topo.spec.links)} links ({"stock" if args.stock else "fast"} build)\n')
+    if args.stock:
+        net = TimedMininet(topo=topo, controller=None)
+    else:
+        net = FastMininet(topo=topo, controller=None, workers=args.workers)
+    try:
+        net.start()
+        report_timings(net.timings)
+    finally:
+        net.stop()
+
+
+if __name__ == '__main__':
+    main()
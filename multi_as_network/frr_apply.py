@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Live FRR Configuration Push
+
+Diffs two frr.conf versions line by line (in the spirit of frr-reload.py)
+and pushes only the changed lines to the running router through
+`vtysh -N <router>`, so unaffected BGP/OSPF/RIP/PIM adjacencies stay up.
+Reports how long the push and the following reconvergence took.
+
+Usage (as root, while the network is running):
+    sudo python3 frr_apply.py r2 r2/frr.conf              # diff against running config
+    sudo python3 frr_apply.py r2 r2/frr.conf --old r2/frr.conf.bak --dry-run
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from convergence import expectations_from_spec, wait_for_convergence
+from topology_spec import TopologySpec
+
+
+# Top-level lines that open a configuration context
+CONTEXT_KEYWORDS = ('router ', 'interface ', 'route-map ', 'line ', 'vrf ',
+                    'key chain ', 'segment-routing', 'bfd')
+# Nested contexts (e.g. inside 'router bgp')
+SUBCONTEXT_KEYWORDS = ('address-family ', 'vni ', 'peer ', 'profile ')
+EXIT_KEYWORDS = ('exit', 'end', 'quit', 'exit-address-family', 'exit-vrf', 'exit-vni')
+# Lines that cannot (or need not) be changed on a running daemon
+IGNORED_LINES = ('frr version', 'frr defaults', 'service integrated-vtysh-config',
+                 'Building configuration', 'Current configuration')
+
+
+def config_paths(text):
+    """
+    Flatten a config into an ordered list of paths.
+
+    Each path is a tuple of the enclosing context headers followed by the
+    line itself, e.g. ('router bgp 200', 'address-family ipv4 unicast',
+    'neighbor 10.0.9.2 route-map PREFER-PEERING in'). Context headers
+    appear as their own one-element (or nested) path.
+    """
+    paths = []
+    seen = set()
+    stack = []  # (indent, header)
+    for raw in text.splitlines():
+        stripped = raw.strip()
+        if not stripped or stripped.startswith(('!', '#')):
+            continue
+        indent = len(raw) - len(raw.lstrip())
+        if stripped in EXIT_KEYWORDS:
+            while stack and stack[-1][0] > indent:
+                stack.pop()
+            if stack:
+                stack.pop()
+            continue
+        if stripped.startswith(IGNORED_LINES):
+            continue
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+
+        path = tuple(header for _, header in stack) + (stripped,)
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+
+        if (indent == 0 and stripped.startswith(CONTEXT_KEYWORDS)) or \
+                (stack and stripped.startswith(SUBCONTEXT_KEYWORDS)):
+            stack.append((indent, stripped))
+    return paths
+
+
+def _negate(line):
+    return line[3:] if line.startswith('no ') else f'no {line}'
+
+
+def diff_config(old_text, new_text):
+    """Return (removed, added) paths between two configs"""
+    old_paths = config_paths(old_text)
+    new_paths = config_paths(new_text)
+    old_set, new_set = set(old_paths), set(new_paths)
+    removed = [p for p in old_paths if p not in new_set]
+    added = [p for p in new_paths if p not in old_set]
+    return removed, added
+
+
+def build_commands(removed, added):
+    """
+    Turn removed/added paths into vtysh configuration commands.
+
+    Removed contexts are deleted as a whole with 'no <header>' (their
+    children are skipped), except interfaces, which cannot be deleted and
+    get their lines negated instead. Deletions run before additions,
+    deepest path first (as frr-reload does), so e.g. a neighbor's
+    address-family lines go before 'no neighbor X remote-as N', which
+    would otherwise make vtysh reject them and skip the rest.
+    """
+    groups = []  # list of (context, [lines]) in order
+
+    def emit(context, line):
+        if groups and groups[-1][0] == context:
+            groups[-1][1].append(line)
+        else:
+            groups.append((context, [line]))
+
+    removed_set = set(removed)
+    for path in sorted(removed, key=len, reverse=True):
+        if any(path[:i] in removed_set and not path[i - 1].startswith('interface ')
+               for i in range(1, len(path))):
+            continue  # a parent context is removed as a whole
+        if len(path) == 1 and path[0].startswith('interface '):
+            continue
+        emit(path[:-1], _negate(path[-1]))
+
+    for path in added:
+        emit(path[:-1], path[-1])
+
+    commands = ['configure terminal']
+    for context, lines in groups:
+        commands += list(context) + lines
+        commands += ['end', 'configure terminal']
+    if commands[-1] == 'configure terminal':
+        commands[-2:] = ['end']
+    return commands if len(commands) > 1 else []
+
+
+def running_config(router, timeout=10):
+    """Fetch a router's running configuration"""
+    result = subprocess.run(['vtysh', '-N', router, '-c', 'show running-config'],
+                            capture_output=True, text=True, timeout=timeout)
+    return result.stdout
+
+
+def push_commands(router, commands, persist=True, timeout=30):
+    """Send configuration commands to a router in a single vtysh invocation"""
+    args = ['vtysh', '-N', router]
+    for command in commands:
+        args += ['-c', command]
+    if persist:
+        args += ['-c', 'write memory']
+    return subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+
+
+def apply_config(router, new_text, old_text=None, wait=True, timeout=60,
+                 persist=True, dry_run=False, spec=None):
+    """
+    Push the difference between old_text (default: the running config) and
+    new_text to a router, then optionally wait for reconvergence of the
+    topology in `spec` (default: topology.json).
+
+    Returns a dict with the commands sent, vtysh exit status/output and the
+    apply and reconvergence timings in seconds.
+    """
+    if old_text is None:
+        old_text = running_config(router)
+    removed, added = diff_config(old_text, new_text)
+    commands = build_commands(removed, added)
+    result = {
+        'router': router,
+        'removed': len(removed),
+        'added': len(added),
+        'commands': commands,
+        'returncode': 0,
+        'output': '',
+        'apply_time': 0.0,
+        'converged': None,
+        'converge_time': None,
+    }
+    if dry_run or not commands:
+        return result
+
+    start = time.monotonic()
+    proc = push_commands(router, commands, persist=persist)
+    result['apply_time'] = time.monotonic() - start
+    result['returncode'] = proc.returncode
+    result['output'] = (proc.stdout + proc.stderr).strip()
+
+    if wait:
+        expectations = expectations_from_spec(spec or TopologySpec.load())
+        convergence = wait_for_convergence(timeout, expectations)
+        result['converged'] = convergence.converged
+        result['converge_time'] = convergence.elapsed
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Push config changes to a running router')
+    parser.add_argument('router')
+    parser.add_argument('config', help='new frr.conf')
+    parser.add_argument('--old', default=None,
+                        help='previous frr.conf (default: the running config)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='only print the commands that would be sent')
+    parser.add_argument('--no-wait', action='store_true',
+                        help='do not wait for reconvergence')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--spec', default=None,
+                        help='topology spec the network was built from, for the '
+                             'reconvergence check (default: topology.json)')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        new_text = f.read()
+    old_text = None
+    if args.old:
+        with open(args.old) as f:
+            old_text = f.read()
+
+    result = apply_config(args.router, new_text, old_text, wait=not args.no_wait,
+                          timeout=args.timeout, dry_run=args.dry_run,
+                          spec=TopologySpec.load(args.spec))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif not result['commands']:
+        print(f"✓ {args.router}: no changes")
+    else:
+        print(f"{args.router}: {result['removed']} lines removed, {result['added']} added")
+        for command in result['commands']:
+            print(f"   {command}")
+        if not args.dry_run:
+            status = '✅' if result['returncode'] == 0 else '❌'
+            print(f"{status} Applied in {result['apply_time']:.2f}s")
+            if result['output']:
+                print(result['output'])
+            if result['converged'] is not None:
+                state = 'converged' if result['converged'] else 'NOT converged'
+                print(f"   Network {state} after {result['converge_time']:.2f}s")
+
+    sys.exit(0 if result['returncode'] == 0 and result['converged'] is not False else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+FRR Configuration Generator
+
+Renders frr.conf, daemons and vtysh.conf for every router from the topology
+spec (RIP/OSPF networks, BGP neighbors and route-maps, PIM interfaces and RP).
+
+Per-router overrides in the spec keep hand-tuned details of the lab:
+  "routers": {"r4": {"router_id": {"ospf": "10.0.4.1", "bgp": "10.0.3.2"},
+                     "bgp_networks": ["10.0.4.0/24"],
+                     "pim": {"join_prune_interval": 60}}}
+router_id is one address for every protocol or one per protocol, and
+bgp_networks replaces the default origination of the host networks. A link
+with "igp": false is left out of the IGP networks, one with "igmp": false
+gets no IGMP on its host interface.
+
+Every output is content-hashed and the hashes are kept in a manifest, so only
+files whose content actually changed are rewritten, and with --install only
+those files are reinstalled into /etc/frr/<router>/.
+
+The lab's r1..r9 directories are this generator's output for topology.json
+(setup_frr.sh runs it with --out .), so edit topology.json and regenerate
+rather than editing them by hand.
+
+Usage:
+    python3 frr_gen.py [--spec topology.json] [--out generated] [--install] [--force]
+"""
+
+import argparse
+import hashlib
+import ipaddress
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from topology_spec import TopologySpec
+
+
+MANIFEST = '.manifest.json'
+FRR_DIR = Path('/etc/frr')
+
+DAEMONS = ['zebra', 'bgpd', 'ospfd', 'ospf6d', 'ripd', 'ripngd', 'isisd', 'pimd',
+           'ldpd', 'nhrpd', 'eigrpd', 'babeld', 'sharpd', 'staticd', 'pbrd',
+           'bfdd', 'fabricd', 'vrrpd', 'pathd']
+
+# Owner, group and mode used by setup_frr.sh for each file
+INSTALL_MODES = {
+    'frr.conf': ('frr', 'frr', '640'),
+    'daemons': ('frr', 'frr', '640'),
+    'vtysh.conf': ('frr', 'frrvty', '640'),
+}
+
+INTER_AS = ('BGP', 'Peering')
+
+
+def _subnet(ip):
+    return str(ipaddress.ip_interface(ip).network)
+
+
+def _addr(ip):
+    return ip.split('/')[0]
+
+
+class ConfigGenerator:
+    """Render per-router FRR configuration from a TopologySpec"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        multicast = spec.data.get('multicast', {})
+        self.rp = multicast.get('rp') or self.router_id(next(iter(spec.routers)))
+        self.group_range = multicast.get('group_range', '239.0.0.0/8')
+
+        # Border routers (with eBGP sessions) per AS
+        self.border = {}
+        for as_name, routers in spec.routers_by_as.items():
+            self.border[as_name] = [
+                r for r in routers
+                if any(e['type'] in INTER_AS for e in spec.interfaces(r))]
+
+    def router_id(self, router, protocol=None):
+        """Router-id of `router`, optionally the one for 'ospf' or 'bgp'"""
+        router_id = self.spec.routers[router].get('router_id')
+        if isinstance(router_id, dict):
+            router_id = router_id.get(protocol)
+        return router_id or self.spec.primary_ip(router)
+
+    def bgp_networks(self, router):
+        """Prefixes originated in BGP: spec override, else the host networks"""
+        networks = self.spec.routers[router].get('bgp_networks')
+        if networks is not None:
+            return list(networks)
+        return [_subnet(e['ip']) for e in self.spec.interfaces(router)
+                if e['type'] == 'Host']
+
+    def asn(self, router):
+        return self.spec.routers[router]['asn']
+
+    def _peer_address(self, router, peer):
+        """Address of `peer` as seen from `router`: shared link IP or router-id"""
+        for entry in self.spec.interfaces(router):
+            if entry['peer'] == peer:
+                return _addr(entry['peer_ip'])
+        return self.router_id(peer, 'bgp')
+
+    def ibgp_peers(self, router):
+        """iBGP neighbors of a router as (peer, role) pairs"""
+        as_name = self.spec.as_of[router]
+        ibgp = self.spec.as_info[as_name].get('ibgp', 'full-mesh')
+        border = self.border[as_name]
+        if isinstance(ibgp, dict) and ibgp.get('route_reflector'):
+            rr = ibgp['route_reflector']
+            if router == rr:
+                return [(peer, 'client') for peer in border if peer != rr]
+            if router in border:
+                return [(rr, 'reflector')]
+            return []
+        if router not in border:
+            return []
+        return [(peer, 'mesh') for peer in border if peer != router]
+
+    def render_daemons(self, router):
+        as_name = self.spec.as_of[router]
+        igp = self.spec.as_info[as_name]['igp'].upper()
+        enabled = {'zebra', 'pimd', 'staticd'}
+        enabled.add('ospfd' if igp == 'OSPF' else 'ripd')
+        if self.ibgp_peers(router) or router in self.border[as_name]:
+            enabled.add('bgpd')
+        return ''.join(f"{d}={'yes' if d in enabled else 'no'}\n" for d in DAEMONS)
+
+    def render_vtysh(self, router):
+        return 'service integrated-vtysh-config\n'
+
+    def render_frr(self, router):
+        spec = self.spec
+        as_name = spec.as_of[router]
+        igp = spec.as_info[as_name]['igp'].upper()
+        interfaces = spec.interfaces(router)
+        ebgp = [e for e in interfaces if e['type'] in INTER_AS]
+        ibgp = self.ibgp_peers(router)
+        runs_bgp = bool(ebgp or ibgp)
+        pim = spec.routers[router].get('pim', {})
+
+        # IGP covers intra-AS links and host networks
+        igp_subnets = [_subnet(e['ip']) for e in interfaces
+                       if e['type'] not in INTER_AS and e['ip']
+                       and e['link'].get('igp', True)]
+
+        lines = ['frr version 8.1',
+                 'frr defaults traditional',
+                 f'hostname {router}',
+                 'log syslog informational',
+                 'no ipv6 forwarding',
+                 'service integrated-vtysh-config',
+                 '!']
+
+        if igp == 'RIP':
+            lines.append('router rip')
+            lines += [f' network {subnet}' for subnet in igp_subnets]
+        else:
+            lines += ['router ospf', f" ospf router-id {self.router_id(router, 'ospf')}"]
+            lines += [f' network {subnet} area 0' for subnet in igp_subnets]
+        if runs_bgp:
+            lines.append(' redistribute bgp')
+        lines += [' redistribute connected', 'exit', '!']
+
+        policies = runs_bgp and any(e['type'] == 'Peering' for e in ebgp)
+        if policies:
+            lines += ['! Route-maps for BGP traffic engineering', '!',
+                      'route-map PREFER-PEERING permit 10',
+                      ' set local-preference 200', 'exit', '!',
+                      'route-map TRANSIT-BACKUP permit 10',
+                      ' set local-preference 100', 'exit', '!']
+
+        if runs_bgp:
+            asn = self.asn(router)
+            router_id = self.router_id(router, 'bgp')
+            lines += [f'router bgp {asn}',
+                      f' bgp router-id {router_id}',
+                      ' no bgp ebgp-requires-policy']
+            if any(role == 'client' for _, role in ibgp):
+                lines.append(f' bgp cluster-id {router_id}')
+            for entry in ebgp:
+                peer_ip = _addr(entry['peer_ip'])
+                kind = 'Peering with' if entry['type'] == 'Peering' else 'Transit to'
+                lines += [f" neighbor {peer_ip} remote-as {self.asn(entry['peer'])}",
+                          f" neighbor {peer_ip} description {kind} {entry['peer'].upper()}"]
+            for peer, _ in ibgp:
+                lines.append(f' neighbor {self._peer_address(router, peer)} remote-as {asn}')
+
+            lines += [' !', ' address-family ipv4 unicast']
+            lines += [f'  network {network}' for network in self.bgp_networks(router)]
+            lines += [f'  redistribute {igp.lower()}', '  redistribute connected']
+            for peer, role in ibgp:
+                address = self._peer_address(router, peer)
+                if role == 'client':
+                    lines.append(f'  neighbor {address} route-reflector-client')
+                else:
+                    lines.append(f'  neighbor {address} next-hop-self')
+            if policies:
+                for entry in ebgp:
+                    route_map = 'PREFER-PEERING' if entry['type'] == 'Peering' else 'TRANSIT-BACKUP'
+                    lines.append(f"  neighbor {_addr(entry['peer_ip'])} route-map {route_map} in")
+            lines += [' exit-address-family', 'exit', '!']
+
+        lines += ['line vty', '!', '! PIM Configuration', '!']
+        for entry in interfaces:
+            lines.append(f"interface {entry['intf']}")
+            if entry['type'] == 'Host':
+                lines.append(f" description {entry['peer'].upper()} Network")
+                if entry['link'].get('igmp', True):
+                    lines.append(' ip igmp')
+            elif entry['type'] == 'Peering':
+                lines.append(f" description Peering to {entry['peer'].upper()}")
+            else:
+                lines.append(f" description Link to {entry['peer'].upper()}")
+            lines += [' ip pim sm', 'exit', '!']
+        lines += ['router pim', f' rp {self.rp} {self.group_range}']
+        if 'join_prune_interval' in pim:
+            lines.append(f" join-prune-interval {pim['join_prune_interval']}")
+        lines += ['exit', '!']
+
+        return '\n'.join(lines) + '\n'
+
+    def render(self, router):
+        """All config files of a router as {filename: content}"""
+        return {
+            'frr.conf': self.render_frr(router),
+            'daemons': self.render_daemons(router),
+            'vtysh.conf': self.render_vtysh(router),
+        }
+
+
+def _digest(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(out_dir / MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'written': {}, 'installed': {}}
+
+
+def generate(spec, out_dir, routers=None):
+    """
+    Render configs and write only the files whose content hash changed.
+
+    Returns (changed, manifest) where changed maps router -> [filenames].
+    """
+    out_dir = Path(out_dir)
+    manifest = _load_manifest(out_dir)
+    written = manifest.setdefault('written', {})
+    generator = ConfigGenerator(spec)
+    changed = {}
+
+    for router in routers or spec.routers:
+        for name, content in generator.render(router).items():
+            key = f'{router}/{name}'
+            digest = _digest(content)
+            path = out_dir / router / name
+            if written.get(key) == digest and path.exists():
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            written[key] = digest
+            changed.setdefault(router, []).append(name)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return changed, manifest
+
+
+def _installed_digest(path, recorded):
+    """
+    Hash of an installed file: read back when possible (as root), since
+    another spec may have installed over it; else the recorded hash if the
+    file still exists.
+    """
+    try:
+        return _digest(path.read_text())
+    except PermissionError:
+        return recorded if path.exists() else None
+    except OSError:
+        return None
+
+
+def install(out_dir, manifest, frr_dir=FRR_DIR, routers=None, force=False):
+    """
+    Install files whose content differs from the last installed version.
+
+    Hashes are taken from the files on disk, so hand edits to a generated
+    config are installed too. `force` reinstalls everything.
+    """
+    out_dir = Path(out_dir)
+    installed = manifest.setdefault('installed', {})
+    done = {}
+
+    for key in sorted(manifest.get('written', {})):
+        router, name = key.split('/', 1)
+        if routers and router not in routers:
+            continue
+        digest = _digest((out_dir / key).read_text())
+        if not force and _installed_digest(frr_dir / key, installed.get(key)) == digest:
+            continue
+        owner, group, mode = INSTALL_MODES[name]
+        if router not in done:
+            subprocess.run(['sudo', 'install', '-m', '775', '-o', 'frr', '-g', 'frr',
+                            '-d', f'/var/log/frr/{router}'], check=True)
+            subprocess.run(['sudo', 'install', '-m', '775', '-o', 'frr', '-g', 'frrvty',
+                            '-d', str(frr_dir / router)], check=True)
+        subprocess.run(['sudo', 'install', '-m', mode, '-o', owner, '-g', group,
+                        str(out_dir / key), str(frr_dir / key)], check=True)
+        installed[key] = digest
+        done.setdefault(router, []).append(name)
+
+    with open(out_dir / MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate FRR configs from the topology spec')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec (default: topology.json)')
+    parser.add_argument('--out', default='generated',
+                        help='output directory, one sub-directory per router '
+                             '(default: generated)')
+    parser.add_argument('--routers', nargs='*', default=None,
+                        help='only render these routers')
+    parser.add_argument('--install', action='store_true',
+                        help='install changed files into /etc/frr/<router>/')
+    parser.add_argument('--force', action='store_true',
+                        help='with --install, reinstall every file')
+    args = parser.parse_args()
+
+    spec = TopologySpec.load(args.spec)
+    changed, manifest = generate(spec, args.out, args.routers)
+
+    files = sum(len(names) for names in changed.values())
+    print(f"✅ {len(spec.routers)} routers rendered, {files} files changed")
+    for router, names in changed.items():
+        print(f"   {router}: {', '.join(names)}")
+
+    if args.install:
+        try:
+            done = install(args.out, manifest, routers=args.routers, force=args.force)
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Install failed: {e}")
+            sys.exit(1)
+        files = sum(len(names) for names in done.values())
+        print(f"✅ Installed {files} files on {len(done)} routers")
+
+
+if __name__ == '__main__':
+    main()
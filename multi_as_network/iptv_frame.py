@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+IPTV Frame Header
+Fixed-size binary header shared by the multicast sender and receivers
+
+Layout (network byte order, 24 bytes):
+    magic      4s   b'IPTV'
+    version    B    1
+    flags      B    FLAG_MONOTONIC if the timestamp is CLOCK_MONOTONIC
+    stream_id  H    channel / stream identifier
+    sequence   Q    64-bit sequence number, starting at 0
+    timestamp  Q    send time in nanoseconds (CLOCK_REALTIME by default)
+
+The rest of the datagram is padding up to the configured packet size.
+"""
+
+import struct
+import time
+
+MAGIC = b'IPTV'
+VERSION = 1
+FLAG_MONOTONIC = 0x01
+
+HEADER = struct.Struct('!4sBBHQQ')
+HEADER_SIZE = HEADER.size
+
+
+def clock_for(flags):
+    """Clock matching the timestamp flags of a frame"""
+    return time.monotonic_ns if flags & FLAG_MONOTONIC else time.time_ns
+
+
+def pack_into(buffer, stream_id, sequence, timestamp, flags=0):
+    """Write a header at the start of a preallocated buffer"""
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, flags, stream_id, sequence, timestamp)
+
+
+def unpack(data):
+    """
+    Parse a frame header.
+
+    Returns (stream_id, sequence, timestamp, flags), or None if the datagram
+    is not a binary IPTV frame (e.g. a legacy text frame).
+    """
+    if len(data) < HEADER_SIZE or data[:4] != MAGIC:
+        return None
+    _, version, flags, stream_id, sequence, timestamp = HEADER.unpack_from(data)
+    if version != VERSION:
+        return None
+    return stream_id, sequence, timestamp, flags
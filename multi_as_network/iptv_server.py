@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Multi-Channel IPTV Server
+Drives many multicast channels from a single asyncio event loop
+
+Channel n (1-based) is sent to the n-th group counted from --base-group
+(239.1.1.1, 239.1.1.2, ...) with stream id n, so receivers can demux by the
+frame header alone. Every channel has its own pacer with its own bitrate and
+packet size; all channels share one UDP socket.
+
+Usage (from tv_server):
+    python3 iptv_server.py --channels 200 --bitrate 2M --duration 60
+    python3 iptv_server.py --lineup lineup.json
+
+A lineup file is a JSON list of channels, each optionally overriding
+"group", "bitrate" (bits/s or '8M' style) and "size":
+    [{"bitrate": "8M"}, {"bitrate": "2M", "size": 188}, {"group": "239.2.0.1"}]
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import socket
+import sys
+import time
+
+import iptv_frame
+from multicast_sender import (MCAST_GRP, MCAST_PORT, MULTICAST_TTL,
+                              BENCH_PACKET_SIZE, parse_rate)
+
+# Never burst more than this far behind schedule (seconds)
+MAX_BACKLOG = 0.1
+# Stream ids are 16 bit
+MAX_CHANNELS = 0xFFFF
+
+
+def channel_groups(count, base=MCAST_GRP):
+    """Group addresses of `count` consecutive channels starting at `base`"""
+    start = int(ipaddress.IPv4Address(base))
+    return [str(ipaddress.IPv4Address(start + n)) for n in range(count)]
+
+
+class Channel:
+    """One paced multicast stream"""
+
+    def __init__(self, stream_id, group, bitrate, size):
+        self.stream_id = stream_id
+        self.group = group
+        self.bitrate = bitrate
+        self.size = max(size, iptv_frame.HEADER_SIZE)
+        self.interval = self.size * 8 / bitrate
+        self.sent = 0
+        self.errors = 0
+        self.resets = 0
+
+    def to_dict(self):
+        return {
+            'stream': self.stream_id,
+            'group': self.group,
+            'bitrate': self.bitrate,
+            'size': self.size,
+            'sent': self.sent,
+            'errors': self.errors,
+            'resets': self.resets,
+        }
+
+
+def build_lineup(count, bitrate, size, base=MCAST_GRP, lineup=None):
+    """Channels from a lineup list, or `count` identical channels"""
+    entries = lineup if lineup is not None else [{} for _ in range(count)]
+    if len(entries) > MAX_CHANNELS:
+        raise ValueError(f'at most {MAX_CHANNELS} channels are supported')
+    groups = channel_groups(len(entries), base)
+    channels = []
+    for n, entry in enumerate(entries):
+        rate = entry.get('bitrate', bitrate)
+        if isinstance(rate, str):
+            rate = parse_rate(rate)
+        channels.append(Channel(n + 1, entry.get('group', groups[n]), rate,
+                                entry.get('size', size)))
+    return channels
+
+
+class ChannelServer:
+    """Sends all channels of a lineup from one event loop"""
+
+    def __init__(self, channels, port=MCAST_PORT, ttl=MULTICAST_TTL, batch=32,
+                 flags=0):
+        self.channels = channels
+        self.port = port
+        self.batch = batch
+        self.flags = flags
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        self.sock.setblocking(False)
+        self.stopping = False
+
+    async def run_channel(self, channel, offset):
+        """
+        Pace one channel on the loop's monotonic clock. Packets that are due
+        go out back-to-back (up to `batch`), then the task yields or sleeps
+        until the next one is due.
+        """
+        loop = asyncio.get_running_loop()
+        payload = bytearray(channel.size)
+        view = memoryview(payload)
+        address = (channel.group, self.port)
+        sendto = self.sock.sendto
+        stamp = iptv_frame.pack_into
+        clock = iptv_frame.clock_for(self.flags)
+        interval = channel.interval
+        next_due = loop.time() + offset
+
+        while not self.stopping:
+            now = loop.time()
+            if now < next_due:
+                await asyncio.sleep(next_due - now)
+                continue
+            if now - next_due > MAX_BACKLOG:
+                channel.resets += 1
+                next_due = now
+
+            due = min(self.batch, int((now - next_due) / interval) + 1)
+            for seq in range(channel.sent, channel.sent + due):
+                stamp(payload, channel.stream_id, seq, clock(), self.flags)
+                try:
+                    sendto(view, address)
+                except OSError:
+                    channel.errors += 1  # socket buffer full: lost locally
+            channel.sent += due
+            next_due += due * interval
+            await asyncio.sleep(0)
+
+    async def report(self, period=1.0):
+        sent = sent_bytes = 0
+        while not self.stopping:
+            await asyncio.sleep(period)
+            total = sum(c.sent for c in self.channels)
+            total_bytes = sum(c.sent * c.size for c in self.channels)
+            pps = (total - sent) / period
+            mbps = (total_bytes - sent_bytes) * 8 / period / 1e6
+            print(f"✓ {total} packets, {pps:.0f} pps, {mbps:.2f} Mbit/s "
+                  f"across {len(self.channels)} channels")
+            sent, sent_bytes = total, total_bytes
+
+    async def run(self, duration=None, quiet=False):
+        """Run every channel until `duration` elapses (or forever)"""
+        count = len(self.channels)
+        # Stagger channel start times so the channels don't burst in lockstep
+        tasks = [asyncio.create_task(self.run_channel(c, c.interval * n / count))
+                 for n, c in enumerate(self.channels)]
+        if not quiet:
+            tasks.append(asyncio.create_task(self.report()))
+        try:
+            if duration:
+                await asyncio.sleep(duration)
+            else:
+                await asyncio.Event().wait()
+        finally:
+            self.stopping = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.sock.close()
+
+
+def summarize(channels, elapsed):
+    sent = sum(c.sent for c in channels)
+    errors = sum(c.errors for c in channels)
+    megabits = sum(c.sent * c.size for c in channels) * 8 / 1e6
+    target = sum(c.bitrate for c in channels) / 1e6
+    return {
+        'channels': len(channels),
+        'elapsed': round(elapsed, 3),
+        'sent': sent,
+        'errors': errors,
+        'resets': sum(c.resets for c in channels),
+        'mbps': round(megabits / elapsed, 3) if elapsed else 0.0,
+        'target_mbps': round(target, 3),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Multi-channel multicast IPTV server')
+    parser.add_argument('--channels', type=int, default=10,
+                        help='number of channels (default: 10)')
+    parser.add_argument('--base-group', default=MCAST_GRP,
+                        help=f'group of channel 1 (default: {MCAST_GRP})')
+    parser.add_argument('--port', type=int, default=MCAST_PORT)
+    parser.add_argument('--ttl', type=int, default=MULTICAST_TTL)
+    parser.add_argument('--bitrate', type=parse_rate, default=2e6,
+                        help="per-channel bitrate, e.g. '2M' (default: 2M)")
+    parser.add_argument('--size', type=int, default=BENCH_PACKET_SIZE,
+                        help=f'packet size in bytes (default: {BENCH_PACKET_SIZE})')
+    parser.add_argument('--lineup', default=None,
+                        help='JSON file with per-channel group/bitrate/size')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--batch', type=int, default=32,
+                        help='max packets per channel sent back-to-back (default: 32)')
+    parser.add_argument('--clock', choices=['realtime', 'monotonic'], default='realtime',
+                        help='timestamp clock; monotonic is only comparable on the same host')
+    parser.add_argument('--json', action='store_true',
+                        help='print a JSON summary with per-channel counters at the end')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    lineup = None
+    if args.lineup:
+        with open(args.lineup) as f:
+            lineup = json.load(f)
+    try:
+        channels = build_lineup(args.channels, args.bitrate, args.size,
+                                args.base_group, lineup)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    flags = iptv_frame.FLAG_MONOTONIC if args.clock == 'monotonic' else 0
+    server = ChannelServer(channels, args.port, args.ttl, max(1, args.batch), flags)
+
+    total = sum(c.bitrate for c in channels)
+    print(f"📺 IPTV Server: {len(channels)} channels, "
+          f"{channels[0].group} .. {channels[-1].group} port {args.port}")
+    print(f"   Aggregate target: {total / 1e6:.2f} Mbit/s")
+    print(f"   Press Ctrl+C to stop")
+    print("")
+
+    start = time.monotonic()
+    try:
+        asyncio.run(server.run(args.duration, quiet=args.json))
+    except KeyboardInterrupt:
+        pass
+    summary = summarize(channels, time.monotonic() - start)
+
+    if args.json:
+        summary['per_channel'] = [c.to_dict() for c in channels]
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"\n📺 IPTV Server stopped after {summary['elapsed']:.2f}s")
+        print(f"   Sent: {summary['sent']} packets, send errors: {summary['errors']}")
+        print(f"   Rate: {summary['mbps']:.2f} of {summary['target_mbps']:.2f} Mbit/s, "
+              f"schedule resets: {summary['resets']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+IPTV Stream Statistics
+Constant-memory loss / reordering / latency / jitter tracking per stream
+
+- Sequence tracking uses a sliding bitmap window over the highest sequence
+  number seen, which detects gaps, duplicates and reorder depth. A jump
+  back by more than the window is a sender restart and starts a new epoch.
+- One-way latency goes into a log-linear (HDR-style) histogram with a fixed
+  number of buckets, good to ~1.6% relative precision.
+- Interarrival jitter follows RFC 3550 section 6.4.1: J += (|D| - J) / 16.
+"""
+
+import time
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-linear histogram of non-negative integer values.
+
+    Values below 2**SUB_BITS are counted exactly; above that each power of
+    two is split into 2**(SUB_BITS - 1) linear sub-buckets.
+    """
+
+    SUB_BITS = 7
+    SUB = 1 << SUB_BITS
+    HALF = SUB >> 1
+    MAX_SHIFT = 64 - SUB_BITS
+
+    def __init__(self):
+        self.counts = [0] * (self.SUB + self.MAX_SHIFT * self.HALF)
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self.SUB:
+            return value
+        shift = value.bit_length() - self.SUB_BITS
+        return self.SUB + (shift - 1) * self.HALF + ((value >> shift) - self.HALF)
+
+    def _value(self, index):
+        """Midpoint of a bucket"""
+        if index < self.SUB:
+            return index
+        shift = (index - self.SUB) // self.HALF + 1
+        mantissa = (index - self.SUB) % self.HALF + self.HALF
+        low = mantissa << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value):
+        value = min(max(0, int(value)), (1 << 64) - 1)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """Value at percentile q (0-100), or None if empty"""
+        if not self.total:
+            return None
+        target = max(1, int(round(q / 100.0 * self.total)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def reset(self):
+        self.__init__()
+
+
+class StreamStats:
+    """Statistics for a single stream, updated once per received frame"""
+
+    def __init__(self, stream_id, window=1024):
+        self.stream_id = stream_id
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.first_seq = None
+        self.max_seq = None
+        self.bitmap = 0          # bit n set = max_seq - n received
+        self.received = 0
+        self.bytes = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.max_reorder_depth = 0
+        self.late = 0            # before the first sequence number, can't classify
+        self.resets = 0          # sender restarts (backward jumps beyond the window)
+        self.expected_before = 0  # frames expected before the last reset
+        self.gaps = 0            # sequence jumps (loss bursts)
+        self.max_gap = 0
+        self.negative_latency = 0
+        self.jitter = 0.0        # ns
+        self.prev_transit = None
+        self.latency = LatencyHistogram()
+        self.interval_received = 0
+        self.interval_bytes = 0
+
+    def update(self, sequence, send_ns, arrival_ns, size):
+        """Account for one frame"""
+        self.bytes += size
+        self.interval_bytes += size
+
+        if self.max_seq is None:
+            self.first_seq = self.max_seq = sequence
+            self.bitmap = 1
+        elif sequence > self.max_seq:
+            jump = sequence - self.max_seq
+            if jump > 1:
+                self.gaps += 1
+                self.max_gap = max(self.max_gap, jump - 1)
+            self.bitmap = ((self.bitmap << jump) | 1) & self.mask
+            self.max_seq = sequence
+        elif self.max_seq - sequence >= self.window:
+            # The sender restarted its sequence numbers: start a new epoch
+            self.resets += 1
+            self.expected_before += self.max_seq - self.first_seq + 1
+            self.first_seq = self.max_seq = sequence
+            self.bitmap = 1
+            self.prev_transit = None
+        else:
+            depth = self.max_seq - sequence
+            if sequence < self.first_seq:
+                self.late += 1
+                return
+            bit = 1 << depth
+            if self.bitmap & bit:
+                self.duplicates += 1
+                return
+            self.bitmap |= bit
+            self.reordered += 1
+            self.max_reorder_depth = max(self.max_reorder_depth, depth)
+
+        self.received += 1
+        self.interval_received += 1
+
+        transit = arrival_ns - send_ns
+        if transit < 0:
+            self.negative_latency += 1
+        self.latency.record(transit)
+        if self.prev_transit is not None:
+            d = abs(transit - self.prev_transit)
+            self.jitter += (d - self.jitter) / 16.0
+        self.prev_transit = transit
+
+    @property
+    def expected(self):
+        if self.max_seq is None:
+            return 0
+        return self.expected_before + self.max_seq - self.first_seq + 1
+
+    @property
+    def lost(self):
+        return max(0, self.expected - self.received)
+
+    def summary(self, interval=None, reset_interval=True):
+        """
+        JSON-serializable snapshot. Counters are cumulative; rates and
+        latency percentiles cover the interval since the last summary.
+        """
+        def ms(value):
+            return None if value is None else round(value / 1e6, 3)
+
+        expected = self.expected
+        data = {
+            'time': round(time.time(), 3),
+            'stream': self.stream_id,
+            'received': self.received,
+            'expected': expected,
+            'lost': self.lost,
+            'loss_pct': round(100.0 * self.lost / expected, 4) if expected else 0.0,
+            'gaps': self.gaps,
+            'max_gap': self.max_gap,
+            'duplicates': self.duplicates,
+            'reordered': self.reordered,
+            'max_reorder_depth': self.max_reorder_depth,
+            'late': self.late,
+            'latency_ms': {
+                'min': ms(self.latency.min),
+                'mean': ms(self.latency.mean()),
+                'p50': ms(self.latency.percentile(50)),
+                'p99': ms(self.latency.percentile(99)),
+                'p999': ms(self.latency.percentile(99.9)),
+                'max': ms(self.latency.max),
+            },
+            'jitter_ms': round(self.jitter / 1e6, 3),
+        }
+        if self.negative_latency:
+            data['negative_latency'] = self.negative_latency
+        if self.resets:
+            data['resets'] = self.resets
+        if interval:
+            data['pps'] = round(self.interval_received / interval, 1)
+            data['mbps'] = round(self.interval_bytes * 8 / interval / 1e6, 3)
+        if reset_interval:
+            self.interval_received = 0
+            self.interval_bytes = 0
+            self.latency.reset()
+        return data
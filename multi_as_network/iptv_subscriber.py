@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Multi-Channel IPTV Subscriber
+Joins many multicast channels from one process and tracks each of them
+
+Groups are spread over a small pool of sockets, at most --per-socket groups
+each (Linux caps IGMP memberships per socket at net.ipv4.igmp_max_memberships,
+20 by default). IP_MULTICAST_ALL is switched off so a socket only sees the
+groups it joined itself, and frames are demultiplexed by the group they
+were sent to (IP_PKTINFO) and the stream id in their header. All sockets
+are served by one asyncio event loop with the batched receive path from
+multicast_receiver.py.
+
+Usage (from a PC, against iptv_server.py):
+    python3 iptv_subscriber.py --channels 200 --interval 5 --json-out pc1.jsonl
+"""
+
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import time
+
+import iptv_frame
+from iptv_server import channel_groups
+from iptv_stats import StreamStats
+from multicast_receiver import MCAST_GRP, MCAST_PORT, BatchReceiver, emit
+
+# Not exported by the socket module on all Python versions (Linux value)
+IP_MULTICAST_ALL = getattr(socket, 'IP_MULTICAST_ALL', 49)
+# Default net.ipv4.igmp_max_memberships
+MAX_MEMBERSHIPS = 20
+
+
+def _mreq(group):
+    return struct.pack("4sl", socket.inet_aton(group), socket.INADDR_ANY)
+
+
+class PoolSocket:
+    """One socket of the pool and the groups it has joined"""
+
+    def __init__(self, port, batch, bufsize, rcvbuf):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.IPPROTO_IP, IP_MULTICAST_ALL, 0)
+        self.sock.bind(('', port))
+        self.receiver = BatchReceiver(self.sock, batch, bufsize, rcvbuf, destinations=True)
+        self.groups = set()
+
+    def join(self, group):
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, _mreq(group))
+        self.groups.add(group)
+
+    def leave(self, group):
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_DROP_MEMBERSHIP, _mreq(group))
+        self.groups.discard(group)
+
+
+class SubscriberPool:
+    """
+    Joins and leaves groups on a pool of sockets and hands every received
+    frame to `on_frame(stream_id, sequence, timestamp, arrival_ns, size,
+    group)`, where group is the multicast group the frame was sent to.
+    Must be used from inside a running event loop.
+    """
+
+    def __init__(self, port=MCAST_PORT, per_socket=MAX_MEMBERSHIPS, on_frame=None,
+                 batch=64, bufsize=9216, rcvbuf=None):
+        self.port = port
+        self.per_socket = per_socket
+        self.on_frame = on_frame
+        self.batch = batch
+        self.bufsize = bufsize
+        self.rcvbuf = rcvbuf
+        self.sockets = []
+        self.membership = {}  # group -> PoolSocket
+        self.legacy = 0
+        self.loop = asyncio.get_running_loop()
+
+    def _socket_with_room(self):
+        for pool_socket in self.sockets:
+            if len(pool_socket.groups) < self.per_socket:
+                return pool_socket
+        pool_socket = PoolSocket(self.port, self.batch, self.bufsize, self.rcvbuf)
+        self.sockets.append(pool_socket)
+        self.loop.add_reader(pool_socket.sock, self._readable, pool_socket)
+        return pool_socket
+
+    def join(self, group):
+        if group not in self.membership:
+            pool_socket = self._socket_with_room()
+            pool_socket.join(group)
+            self.membership[group] = pool_socket
+
+    def leave(self, group):
+        pool_socket = self.membership.pop(group, None)
+        if pool_socket is not None:
+            pool_socket.leave(group)
+
+    def _readable(self, pool_socket):
+        unpack = iptv_frame.unpack
+        clock_for = iptv_frame.clock_for
+        for data, group in pool_socket.receiver.drain_from():
+            frame = unpack(data)
+            if frame is None:
+                self.legacy += 1
+                continue
+            stream_id, seq, timestamp, flags = frame
+            if self.on_frame:
+                self.on_frame(stream_id, seq, timestamp, clock_for(flags)(), len(data), group)
+
+    def summary(self):
+        receivers = [s.receiver for s in self.sockets]
+        drops = [r.kernel_drops for r in receivers if r.overflow_supported]
+        return {
+            'time': round(time.time(), 3),
+            'receiver': socket.gethostname(),
+            'sockets': len(self.sockets),
+            'groups': len(self.membership),
+            'kernel_drops': sum(drops) if drops else None,
+            'truncated': sum(r.truncated for r in receivers),
+        }
+
+    def close(self):
+        for pool_socket in self.sockets:
+            self.loop.remove_reader(pool_socket.sock)
+            for group in list(pool_socket.groups):
+                pool_socket.leave(group)
+            pool_socket.sock.close()
+        self.sockets = []
+        self.membership = {}
+
+
+async def subscribe(groups, port, interval, out, duration=None, window=1024,
+                    per_socket=MAX_MEMBERSHIPS, batch=64, bufsize=9216, rcvbuf=None):
+    """Join all groups and emit per-channel JSON summaries every `interval`"""
+    streams = {}  # (group, stream_id) -> StreamStats
+
+    def on_frame(stream_id, seq, timestamp, arrival_ns, size, group):
+        key = (group or '', stream_id)
+        stream = streams.get(key)
+        if stream is None:
+            stream = streams[key] = StreamStats(stream_id, window)
+        stream.update(seq, timestamp, arrival_ns, size)
+
+    pool = SubscriberPool(port, per_socket, on_frame, batch, bufsize, rcvbuf)
+    start = time.monotonic()
+    for group in groups:
+        pool.join(group)
+    print(f"📺 Subscribed to {len(groups)} channels on {len(pool.sockets)} sockets "
+          f"in {(time.monotonic() - start) * 1000:.1f} ms", file=sys.stderr)
+
+    def emit_all(elapsed):
+        for group, stream_id in sorted(streams):
+            data = streams[group, stream_id].summary(elapsed)
+            data['group'] = group or None
+            emit(data, out)
+        summary = pool.summary()
+        summary['receiving'] = len(streams)
+        emit(summary, out)
+
+    end = start + duration if duration else None
+    last_emit = time.monotonic()
+    try:
+        while end is None or time.monotonic() < end:
+            wait = interval if end is None else min(interval, end - time.monotonic())
+            await asyncio.sleep(max(0, wait))
+            now = time.monotonic()
+            emit_all(now - last_emit)
+            last_emit = now
+    finally:
+        pool.close()
+        if pool.legacy:
+            print(f"   Ignored {pool.legacy} frames without a binary header", file=sys.stderr)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Multi-channel multicast IPTV subscriber')
+    parser.add_argument('--channels', type=int, default=10,
+                        help='number of consecutive channels to join (default: 10)')
+    parser.add_argument('--base-group', default=MCAST_GRP,
+                        help=f'group of channel 1 (default: {MCAST_GRP})')
+    parser.add_argument('--groups', nargs='*', default=None,
+                        help='explicit group list (overrides --channels)')
+    parser.add_argument('--port', type=int, default=MCAST_PORT)
+    parser.add_argument('--interval', type=float, default=5,
+                        help='seconds between summaries (default: 5)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='stop after this many seconds (default: run until Ctrl+C)')
+    parser.add_argument('--json-out', default=None,
+                        help='append summaries to this file instead of stdout')
+    parser.add_argument('--window', type=int, default=1024,
+                        help='reorder/duplicate detection window in packets (default: 1024)')
+    parser.add_argument('--per-socket', type=int, default=MAX_MEMBERSHIPS,
+                        help=f'max groups joined per socket (default: {MAX_MEMBERSHIPS})')
+    parser.add_argument('--rcvbuf', type=int, default=None,
+                        help='socket receive buffer size in bytes')
+    parser.add_argument('--batch', type=int, default=64,
+                        help='max datagrams drained per wakeup (default: 64)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    groups = args.groups or channel_groups(args.channels, args.base_group)
+    out = open(args.json_out, 'a') if args.json_out else sys.stdout
+    try:
+        asyncio.run(subscribe(groups, args.port, args.interval, out, args.duration,
+                              args.window, max(1, args.per_socket), max(1, args.batch),
+                              rcvbuf=args.rcvbuf))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+IPTV Channel-Zapping Benchmark
+
+Repeatedly switches between channels sent by iptv_server.py and measures,
+for every switch:
+  - join latency:  IGMP join of the new group -> its first packet
+  - leave latency: IGMP leave of the old group -> its last packet
+Several receivers can zap concurrently in one process (each on its own
+channels and sockets), and result files from many PCs can be merged into
+one percentile report.
+
+Usage:
+    tv_server python3 iptv_server.py --channels 40 --bitrate 2M &
+    pc1 python3 iptv_zap.py run --channels 40 --switches 50 --json-out pc1-zap.json
+    pc3 python3 iptv_zap.py run --channels 40 --switches 50 --json-out pc3-zap.json
+    python3 iptv_zap.py report pc1-zap.json pc3-zap.json
+
+Leave latency is taken from an AF_PACKET tap on the PC's link (root, as
+in Mininet hosts): the receiving socket stops seeing the old group as soon
+as it drops the membership, but the router keeps forwarding it onto the
+link until its IGMP last-member query times out (about 2s with FRR
+defaults). Keep --dwell above that or leaves are under-reported; switches
+where no packet of the old group was seen after the leave have no leave
+latency. Receivers on the same PC must not watch the same channels,
+otherwise a join finds the group already flowing.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+import sys
+import time
+
+from iptv_server import channel_groups
+from iptv_subscriber import SubscriberPool
+from multicast_receiver import MCAST_GRP, MCAST_PORT
+
+
+ETH_P_IP = 0x0800
+IPPROTO_UDP = 17
+
+
+def default_interface():
+    """First non-loopback interface, e.g. 'pc1-eth0' on a Mininet host"""
+    for _, name in socket.if_nameindex():
+        if name != 'lo':
+            return name
+    raise OSError('No network interface to tap')
+
+
+class LinkTap:
+    """
+    Timestamps multicast packets arriving on an interface, independently
+    of the group memberships of this host's sockets.
+    """
+
+    def __init__(self, interface, port, bufsize=2048):
+        self.port = port
+        self.bufsize = bufsize
+        self.groups = {}  # packed group address -> group
+        self.last = {}    # group -> arrival of the latest packet on the link
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_DGRAM,
+                                  socket.htons(ETH_P_IP))
+        self.sock.bind((interface, 0))
+        self.sock.setblocking(False)
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.sock, self._readable)
+
+    def watch(self, group):
+        self.groups[socket.inet_aton(group)] = group
+
+    def _readable(self):
+        now = time.monotonic_ns()
+        while True:
+            try:
+                packet, address = self.sock.recvfrom(self.bufsize)
+            except (BlockingIOError, InterruptedError):
+                return
+            if address[2] == socket.PACKET_OUTGOING or len(packet) < 20:
+                continue
+            header_len = (packet[0] & 0x0F) * 4
+            if packet[9] != IPPROTO_UDP or len(packet) < header_len + 4:
+                continue
+            group = self.groups.get(packet[16:20])
+            if group is None:
+                continue
+            dport, = struct.unpack_from('!H', packet, header_len + 2)
+            if dport == self.port:
+                self.last[group] = now
+
+    def close(self):
+        self.loop.remove_reader(self.sock)
+        self.sock.close()
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list, or None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Zapper:
+    """One receiver switching between its channels"""
+
+    def __init__(self, name, channels, port=MCAST_PORT, timeout=5.0, tap=None):
+        self.name = name
+        self.channels = channels  # [(stream_id, group)]
+        self.port = port
+        self.timeout = timeout
+        self.tap = tap    # LinkTap for leave latency, or None to skip it
+        self.first = {}   # stream_id -> arrival of the first packet after join
+        self.waiting = {}  # stream_id -> Event set on first packet
+        self.results = []
+        self.pool = None
+
+    def on_frame(self, stream_id, seq, timestamp, arrival_ns, size, group):
+        event = self.waiting.get(stream_id)
+        if event is not None and stream_id not in self.first:
+            self.first[stream_id] = time.monotonic_ns()
+            event.set()
+
+    async def _join(self, stream_id, group):
+        """Join a group, return join latency in ms or None on timeout"""
+        self.first.pop(stream_id, None)
+        event = self.waiting[stream_id] = asyncio.Event()
+        joined = time.monotonic_ns()
+        self.pool.join(group)
+        try:
+            await asyncio.wait_for(event.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.waiting.pop(stream_id, None)
+        return (self.first[stream_id] - joined) / 1e6
+
+    def _leave_latency(self, group, left):
+        """Leave -> last packet of the old group on the link, in ms or None"""
+        if self.tap is None:
+            return None
+        last = self.tap.last.get(group)
+        if last is None or last < left:
+            return None  # nothing arrived after the leave
+        return (last - left) / 1e6
+
+    async def run(self, switches, dwell, shuffle=False):
+        self.pool = SubscriberPool(self.port, on_frame=self.on_frame)
+        order = list(self.channels)
+        if self.tap is not None:
+            for _, group in order:
+                self.tap.watch(group)
+        previous = None
+        try:
+            for switch in range(switches):
+                if shuffle:
+                    candidates = [c for c in order if c != previous] or order
+                    current = random.choice(candidates)
+                else:
+                    current = order[switch % len(order)]
+                stream_id, group = current
+
+                left = None
+                if previous is not None:
+                    left = time.monotonic_ns()
+                    self.pool.leave(previous[1])
+                join_ms = await self._join(stream_id, group)
+                # Stay tuned; late packets of the old channel reach the link meanwhile
+                await asyncio.sleep(dwell)
+                leave_ms = None if left is None else self._leave_latency(previous[1], left)
+
+                self.results.append({
+                    'receiver': self.name,
+                    'switch': switch,
+                    'from': previous[1] if previous else None,
+                    'to': group,
+                    'join_ms': None if join_ms is None else round(join_ms, 3),
+                    'leave_ms': None if leave_ms is None else round(leave_ms, 3),
+                    'timeout': join_ms is None,
+                })
+                previous = current
+        finally:
+            self.pool.close()
+        return self.results
+
+
+async def zap(receivers, channels, switches, dwell, port, timeout, shuffle,
+              interface=None):
+    """Run `receivers` zappers concurrently on disjoint channel sets"""
+    try:
+        tap = LinkTap(interface or default_interface(), port)
+    except OSError as e:
+        print(f"⚠️  No link tap ({e}), leave latency is not measured", file=sys.stderr)
+        tap = None
+
+    zappers = []
+    for k in range(receivers):
+        own = channels[k::receivers]
+        zappers.append(Zapper(f'{socket.gethostname()}/{k}', own, port, timeout, tap))
+    try:
+        results = await asyncio.gather(*(z.run(switches, dwell, shuffle) for z in zappers))
+    finally:
+        if tap is not None:
+            tap.close()
+    return [entry for result in results for entry in result]
+
+
+def report(results):
+    """Percentile summary of a list of switch results"""
+    joins = [r['join_ms'] for r in results if r['join_ms'] is not None]
+    leaves = [r['leave_ms'] for r in results if r['leave_ms'] is not None]
+
+    def stats(values):
+        return {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p90': percentile(values, 90),
+            'p99': percentile(values, 99),
+            'max': max(values) if values else None,
+        }
+
+    return {
+        'switches': len(results),
+        'receivers': len({r['receiver'] for r in results}),
+        'timeouts': sum(1 for r in results if r['timeout']),
+        'join_ms': stats(joins),
+        'leave_ms': stats(leaves),
+    }
+
+
+def print_report(summary):
+    def fmt(value):
+        return '-' if value is None else f'{value:.1f}'
+
+    print(f"📺 Zapping: {summary['switches']} switches from "
+          f"{summary['receivers']} receivers, {summary['timeouts']} join timeouts")
+    print(f"   {'':<8} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)")
+    for key, label in (('join_ms', 'join'), ('leave_ms', 'leave')):
+        s = summary[key]
+        print(f"   {label:<8} {s['count']:>6} {fmt(s['p50']):>8} {fmt(s['p90']):>8} "
+              f"{fmt(s['p99']):>8} {fmt(s['max']):>8}")
+
+
+def cmd_run(args):
+    groups = channel_groups(args.channels, args.base_group)
+    channels = [(n + 1, group) for n, group in enumerate(groups)]
+    if args.channels < 2 * args.receivers:
+        print(f"❌ Need at least {2 * args.receivers} channels for "
+              f"{args.receivers} receivers")
+        sys.exit(1)
+
+    print(f"📺 Zapping {args.switches} times over {args.channels} channels, "
+          f"{args.receivers} receivers, dwell {args.dwell:g}s", file=sys.stderr)
+    try:
+        results = asyncio.run(zap(args.receivers, channels, args.switches, args.dwell,
+                                  args.port, args.timeout, args.shuffle,
+                                  args.interface))
+    except KeyboardInterrupt:
+        sys.exit(1)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'host': socket.gethostname(), 'results': results}, f, indent=1)
+    summary = report(results)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+    sys.exit(0 if summary['timeouts'] == 0 else 1)
+
+
+def cmd_report(args):
+    results = []
+    for path in args.files:
+        with open(path) as f:
+            results += json.load(f)['results']
+    summary = report(results)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='IPTV channel-zapping benchmark')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='zap through channels and measure join/leave latency')
+    run.add_argument('--channels', type=int, default=20,
+                     help='channels sent by iptv_server.py (default: 20)')
+    run.add_argument('--base-group', default=MCAST_GRP)
+    run.add_argument('--port', type=int, default=MCAST_PORT)
+    run.add_argument('--switches', type=int, default=20,
+                     help='channel switches per receiver (default: 20)')
+    run.add_argument('--dwell', type=float, default=3.0,
+                     help='seconds to stay on a channel (default: 3)')
+    run.add_argument('--receivers', type=int, default=1,
+                     help='concurrent receivers in this process (default: 1)')
+    run.add_argument('--timeout', type=float, default=5.0,
+                     help='give up waiting for the first packet after (default: 5s)')
+    run.add_argument('--interface', default=None,
+                     help='link to watch for leave latency (default: first non-loopback)')
+    run.add_argument('--shuffle', action='store_true',
+                     help='switch to random channels instead of in order')
+    run.add_argument('--json-out', default=None,
+                     help='save per-switch results for a later merged report')
+    run.add_argument('--json', action='store_true')
+    run.set_defaults(func=cmd_run)
+
+    rep = sub.add_parser('report', help='merge result files into one percentile report')
+    rep.add_argument('files', nargs='+')
+    rep.add_argument('--json', action='store_true')
+    rep.set_defaults(func=cmd_report)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
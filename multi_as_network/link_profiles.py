@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Link Shaping Profiles
+
+Named sets of TCLink parameters (bw in Mbit/s, delay, jitter, loss in %,
+max_queue_size in packets) per link class, with per-link overrides, read
+from link_profiles.json:
+
+{
+  "default": "unshaped",
+  "profiles": {
+    "wan": {
+      "description": "...",
+      "classes": {"IGP": {"bw": 1000, "delay": "1ms"},
+                  "BGP": {"bw": 100, "delay": "20ms", "jitter": "2ms"},
+                  "Peering": {...}, "Host": {...}},
+      "links": {"r2-r4": {"bw": 20, "max_queue_size": 50}}
+    }
+  }
+}
+
+Link classes follow the spec's link types: RIP and OSPF links are "IGP",
+BGP (transit) links are "BGP", plus "Peering" and "Host". Overrides are
+keyed "a-b" in either order and are merged over the class parameters.
+
+NetworkTopo.build() creates shaped links with Mininet's TCIntf (as TCLink
+does), so the profile named by run.py --link-profile is in place from the
+start. A running network can
+switch profiles without a restart: the same qdiscs Mininet's TCIntf would
+install (htb for bw, netem for delay/jitter/loss/queue) are replaced on
+every interface through the node execution service.
+
+Usage:
+    python3 link_profiles.py list
+    python3 link_profiles.py show wan
+    sudo python3 link_profiles.py apply lossy-transit      # while run.py is running
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import node_exec
+from topology_spec import TopologySpec
+
+PROFILES_FILE = Path(__file__).with_name('link_profiles.json')
+# Name of the profile currently applied to the running network
+ACTIVE_FILE = '/tmp/multi_as_network.link_profile'
+
+SHAPING_KEYS = ('bw', 'delay', 'jitter', 'loss', 'max_queue_size')
+LINK_CLASSES = {'RIP': 'IGP', 'OSPF': 'IGP', 'BGP': 'BGP', 'Peering': 'Peering', 'Host': 'Host'}
+
+
+def link_class(link):
+    """Profile class of a spec link: IGP, BGP, Peering or Host"""
+    return LINK_CLASSES.get(link['type'], link['type'])
+
+
+def describe(params):
+    """Short human-readable form, e.g. '100 Mbit/s, 20ms ±2ms, 1% loss, queue 500'"""
+    if not params:
+        return 'unshaped'
+    parts = []
+    if params.get('bw') is not None:
+        parts.append(f"{params['bw']:g} Mbit/s")
+    if params.get('delay'):
+        delay = params['delay']
+        if params.get('jitter'):
+            delay += f" ±{params['jitter']}"
+        parts.append(delay)
+    if params.get('loss'):
+        parts.append(f"{params['loss']:g}% loss")
+    if params.get('max_queue_size') is not None:
+        parts.append(f"queue {params['max_queue_size']}")
+    return ', '.join(parts)
+
+
+class LinkProfiles:
+    """Loaded shaping profiles"""
+
+    def __init__(self, data):
+        self.data = data
+        self.profiles = data.get('profiles', {})
+        self.default = data.get('default') or next(iter(self.profiles), None)
+        for name, profile in self.profiles.items():
+            sections = list(profile.get('classes', {}).items())
+            sections += list(profile.get('links', {}).items())
+            for section, params in sections:
+                unknown = set(params) - set(SHAPING_KEYS)
+                if unknown:
+                    raise ValueError(f"profile {name}, {section}: unknown parameters "
+                                     f"{', '.join(sorted(unknown))}")
+
+    @classmethod
+    def load(cls, path=None):
+        """Load profiles from a JSON file (defaults to link_profiles.json)"""
+        with open(path or PROFILES_FILE) as f:
+            return cls(json.load(f))
+
+    def names(self):
+        return list(self.profiles)
+
+    def resolve(self, name=None):
+        """Profile name to use; None means the file's default"""
+        name = name or self.default
+        if name not in self.profiles:
+            raise ValueError(f"unknown link profile {name!r} "
+                             f"(available: {', '.join(self.profiles)})")
+        return name
+
+    def params(self, name, link):
+        """TCLink parameters for a spec link under a profile ({} = unshaped)"""
+        profile = self.profiles[self.resolve(name)]
+        params = dict(profile.get('classes', {}).get(link_class(link), {}))
+        overrides = profile.get('links', {})
+        for key in (f"{link['src']}-{link['dst']}", f"{link['dst']}-{link['src']}"):
+            params.update(overrides.get(key, {}))
+        return {key: value for key, value in params.items() if value is not None}
+
+
+def tc_commands(intf, params):
+    """
+    Shell commands that (re)install the shaping of one interface, built the
+    same way as Mininet's TCIntf: an htb class for bw with a netem child
+    for delay, jitter, loss and queue size. The old root qdisc is removed
+    first, so an empty `params` restores the plain interface.
+    """
+    commands = [f'tc qdisc del dev {intf} root 2> /dev/null']
+    parent = 'root'
+    if params.get('bw') is not None:
+        commands += [f'tc qdisc add dev {intf} root handle 5:0 htb default 1',
+                     f"tc class add dev {intf} parent 5:0 classid 5:1 htb "
+                     f"rate {params['bw']:f}Mbit burst 15k"]
+        parent = 'parent 5:1'
+    netem = ''
+    if params.get('delay'):
+        netem += f"delay {params['delay']} "
+        if params.get('jitter'):
+            netem += f"{params['jitter']} "
+    if params.get('loss'):
+        netem += f"loss {params['loss']:.5f} "
+    if params.get('max_queue_size') is not None:
+        netem += f"limit {int(params['max_queue_size'])}"
+    if netem:
+        commands.append(f'tc qdisc add dev {intf} {parent} handle 10: netem {netem.strip()}')
+    return commands
+
+
+def profile_commands(spec, profiles, name):
+    """
+    [(node, command)] that switch every link of the spec to a profile, one
+    command per node. Successful tc commands print nothing.
+    """
+    per_node = {}
+    for link in spec.links:
+        params = profiles.params(name, link)
+        for side in ('src', 'dst'):
+            intf = link.get(f'{side}_intf') or f"{link[side]}-eth0"
+            per_node.setdefault(link[side], []).extend(tc_commands(intf, params))
+    return [(node, '; '.join(commands)) for node, commands in per_node.items()]
+
+
+def save_active(name, path=ACTIVE_FILE):
+    with open(path, 'w') as f:
+        f.write(name + '\n')
+
+
+def clear_active(path=ACTIVE_FILE):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def active_profile(path=ACTIVE_FILE):
+    """Profile applied to the running network, or None"""
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def apply_profile(spec, profiles, name):
+    """
+    Switch a running network to a profile through the node execution
+    service. Returns (name, {node: tc error output}) for nodes that failed.
+    """
+    name = profiles.resolve(name)
+    commands = profile_commands(spec, profiles, name)
+    results = node_exec.run_many(commands)
+    save_active(name)
+    failed = {node: output.strip() for (node, _), (_, output, _) in zip(commands, results)
+              if output.strip()}
+    return name, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Link shaping profiles')
+    parser.add_argument('--profiles', default=None,
+                        help='profiles file (default: link_profiles.json)')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec (default: topology.json)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='list profiles')
+    show = sub.add_parser('show', help='shaping of every link under a profile')
+    show.add_argument('name', nargs='?', default=None)
+    apply = sub.add_parser('apply', help='switch the running network to a profile')
+    apply.add_argument('name')
+    args = parser.parse_args()
+
+    try:
+        profiles = LinkProfiles.load(args.profiles)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot load link profiles: {e}")
+        sys.exit(1)
+    spec = TopologySpec.load(args.spec)
+
+    if args.command == 'list':
+        active = active_profile()
+        for name, profile in profiles.profiles.items():
+            marks = ' (default)' if name == profiles.default else ''
+            marks += ' [active]' if name == active else ''
+            print(f"  {name:<16} {profile.get('description', '')}{marks}")
+        return
+
+    try:
+        name = profiles.resolve(args.name)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.command == 'show':
+        print(f"Profile {name}:")
+        for link in spec.links:
+            print(f"  {link['src'] + '-' + link['dst']:<16} {link_class(link):<8} "
+                  f"{describe(profiles.params(name, link))}")
+        return
+
+    try:
+        name, failed = apply_profile(spec, profiles, name)
+    except (OSError, ConnectionError) as e:
+        print(f"❌ Cannot reach the node execution service: {e} (is run.py running?)")
+        sys.exit(1)
+    for node, output in failed.items():
+        print(f"❌ {node}: {output}")
+    if failed:
+        sys.exit(1)
+    print(f"✅ Link profile {name} applied to {len(spec.links)} links")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,25 +2,148 @@
 """
 Multicast IPTV Receiver (PC Client)
 Receives video stream from multicast group 239.1.1.1
+
+Statistics mode (--stats) tracks loss, duplicates, reordering, latency
+percentiles and RFC 3550 jitter per stream and emits a JSON summary line
+every --interval seconds:
+    python3 multicast_receiver.py --stats --interval 5 --json-out pc1.jsonl
+
+Statistics mode receives in batches into a preallocated ring of buffers
+(no per-packet allocation) and reports the kernel's socket drop counter
+(SO_RXQ_OVFL), so loss in the network can be told apart from loss in this
+process. Use --rcvbuf to enlarge the socket receive buffer.
 """
 
+import argparse
+import json
+import select
 import socket
 import struct
 import sys
+import time
+
+import iptv_frame
+from iptv_stats import StreamStats
 
 MCAST_GRP = '239.1.1.1'
 MCAST_PORT = 5007
 
-def main():
+# Not exported by the socket module on all Python versions (Linux values)
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)
+IP_PKTINFO = getattr(socket, 'IP_PKTINFO', 8)
+
+
+def open_socket(group, port):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     
     # Bind to the multicast port
-    sock.bind(('', MCAST_PORT))
+    sock.bind(('', port))
     
     # Tell the kernel to add us to the multicast group
-    mreq = struct.pack("4sl", socket.inet_aton(MCAST_GRP), socket.INADDR_ANY)
+    mreq = struct.pack("4sl", socket.inet_aton(group), socket.INADDR_ANY)
     sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    return sock
+
+
+class BatchReceiver:
+    """
+    Batched, allocation-free receive path.
+
+    Waits for the socket to become readable, then drains up to `batch`
+    datagrams with recvmsg_into() into a ring of preallocated buffers
+    (Python has no recvmmsg binding, so a non-blocking drain loop stands in
+    for it). The returned memoryviews are only valid until the next call.
+
+    With `destinations` the group (header destination address) of every
+    datagram is read from IP_PKTINFO, for sockets joined to several groups;
+    see drain_from().
+    """
+
+    def __init__(self, sock, batch=64, bufsize=9216, rcvbuf=None, destinations=False):
+        self.sock = sock
+        self.batch = batch
+        self.buffers = [bytearray(bufsize) for _ in range(batch)]
+        self.views = [memoryview(buffer) for buffer in self.buffers]
+        self.truncated = 0
+        self.kernel_drops = 0
+        self.overflow_supported = True
+
+        if rcvbuf:
+            try:
+                # Bypasses net.core.rmem_max when running as root
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUFFORCE, rcvbuf)
+            except (OSError, AttributeError):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.rcvbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        except OSError:
+            self.overflow_supported = False
+        self.ancbufsize = socket.CMSG_SPACE(4)
+        if destinations:
+            sock.setsockopt(socket.IPPROTO_IP, IP_PKTINFO, 1)
+            # struct in_pktinfo: ifindex, spec_dst, addr
+            self.ancbufsize += socket.CMSG_SPACE(12)
+
+        sock.setblocking(False)
+        self.poller = select.poll()
+        self.poller.register(sock, select.POLLIN)
+
+    def receive(self, timeout):
+        """Wait up to `timeout` seconds, return a list of received memoryviews"""
+        if not self.poller.poll(max(0, int(timeout * 1000))):
+            return []
+        return self.drain()
+
+    def drain(self):
+        """Read up to `batch` queued datagrams without blocking"""
+        return [view for view, _ in self._drain()]
+
+    def drain_from(self):
+        """
+        Like drain(), but returns (memoryview, destination) pairs; the
+        destination is None unless the receiver was created with
+        `destinations`.
+        """
+        return self._drain()
+
+    def _drain(self):
+        received = []
+        recvmsg_into = self.sock.recvmsg_into
+        for view in self.views:
+            try:
+                nbytes, ancdata, flags, _ = recvmsg_into([view], self.ancbufsize)
+            except (BlockingIOError, InterruptedError):
+                break
+            if flags & socket.MSG_TRUNC:
+                self.truncated += 1
+            destination = None
+            for level, kind, data in ancdata:
+                if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL and len(data) >= 4:
+                    # Cumulative count of datagrams dropped on this socket
+                    self.kernel_drops = struct.unpack('=I', data[:4])[0]
+                elif level == socket.IPPROTO_IP and kind == IP_PKTINFO and len(data) >= 12:
+                    destination = socket.inet_ntoa(data[8:12])
+            received.append((view[:nbytes], destination))
+        return received
+
+    def summary(self):
+        data = {
+            'time': round(time.time(), 3),
+            'receiver': socket.gethostname(),
+            'rcvbuf': self.rcvbuf,
+            'kernel_drops': self.kernel_drops if self.overflow_supported else None,
+            'truncated': self.truncated,
+        }
+        return data
+
+
+def main():
+    sock = open_socket(MCAST_GRP, MCAST_PORT)
+    buffer = bytearray(65535)
+    view = memoryview(buffer)
     
     hostname = socket.gethostname()
     print(f"📺 IPTV Receiver starting on {hostname}...")
@@ -31,17 +154,122 @@ def main():
     print("")
     
     frame_count = 0
+    header_count = 0
+    first_seq = last_seq = None
     try:
         while True:
-            data, addr = sock.recvfrom(1024)
+            nbytes = sock.recv_into(buffer)
+            data = view[:nbytes]
             frame_count += 1
+            frame = iptv_frame.unpack(data)
+            
+            if frame:
+                stream_id, seq, timestamp, flags = frame
+                header_count += 1
+                if first_seq is None:
+                    first_seq = seq
+                last_seq = seq if last_seq is None else max(last_seq, seq)
             
             if frame_count % 10 == 0:
-                print(f"✓ Received frame {frame_count}: {data.decode('utf-8')}")
+                if frame:
+                    latency = (iptv_frame.clock_for(flags)() - timestamp) / 1e6
+                    print(f"✓ Received frame {frame_count}: stream {stream_id} "
+                          f"seq {seq}, latency {latency:.2f} ms")
+                else:
+                    # Legacy text frames from older senders
+                    print(f"✓ Received frame {frame_count}: {bytes(data).decode('utf-8', 'replace')}")
             
     except KeyboardInterrupt:
         print(f"\n📺 IPTV Receiver stopped (received {frame_count} frames)")
+        if first_seq is not None:
+            expected = last_seq - first_seq + 1
+            print(f"   Sequence {first_seq}..{last_seq}: "
+                  f"{max(0, expected - header_count)} frames missing")
         sock.close()
 
+
+def emit(line, out):
+    out.write(json.dumps(line) + '\n')
+    out.flush()
+
+
+def stats(group, port, interval, out, window, batch=64, bufsize=9216, rcvbuf=None):
+    """Receive frames and periodically emit per-stream JSON summaries"""
+    sock = open_socket(group, port)
+    receiver = BatchReceiver(sock, batch, bufsize, rcvbuf)
+    unpack = iptv_frame.unpack
+    clock_for = iptv_frame.clock_for
+    streams = {}
+    legacy = 0
+    
+    print(f"📺 IPTV Receiver statistics mode on {socket.gethostname()}", file=sys.stderr)
+    print(f"   Multicast Group: {group}:{port}, summary every {interval:g}s", file=sys.stderr)
+    print(f"   Receive buffer: {receiver.rcvbuf} bytes, batch {batch}", file=sys.stderr)
+    
+    def emit_all(elapsed):
+        for stream in streams.values():
+            emit(stream.summary(elapsed), out)
+        emit(receiver.summary(), out)
+    
+    last_emit = time.monotonic()
+    next_emit = last_emit + interval
+    try:
+        while True:
+            for data in receiver.receive(next_emit - time.monotonic()):
+                frame = unpack(data)
+                if frame:
+                    stream_id, seq, timestamp, flags = frame
+                    stream = streams.get(stream_id)
+                    if stream is None:
+                        stream = streams[stream_id] = StreamStats(stream_id, window)
+                    stream.update(seq, timestamp, clock_for(flags)(), len(data))
+                else:
+                    legacy += 1
+            
+            now = time.monotonic()
+            if now >= next_emit:
+                emit_all(now - last_emit)
+                last_emit = now
+                next_emit = now + interval
+    except KeyboardInterrupt:
+        emit_all(time.monotonic() - last_emit)
+        if legacy:
+            print(f"   Ignored {legacy} frames without a binary header", file=sys.stderr)
+        sock.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Multicast IPTV receiver')
+    parser.add_argument('--group', default=MCAST_GRP)
+    parser.add_argument('--port', type=int, default=MCAST_PORT)
+    parser.add_argument('--stats', action='store_true',
+                        help='statistics mode: emit periodic JSON summaries')
+    parser.add_argument('--interval', type=float, default=5,
+                        help='seconds between summaries (default: 5)')
+    parser.add_argument('--json-out', default=None,
+                        help='append summaries to this file instead of stdout')
+    parser.add_argument('--window', type=int, default=1024,
+                        help='reorder/duplicate detection window in packets (default: 1024)')
+    parser.add_argument('--rcvbuf', type=int, default=None,
+                        help='socket receive buffer size in bytes')
+    parser.add_argument('--batch', type=int, default=64,
+                        help='max datagrams drained per wakeup (default: 64)')
+    parser.add_argument('--bufsize', type=int, default=9216,
+                        help='per-datagram buffer size; larger datagrams are '
+                             'counted as truncated (default: 9216)')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    if args.stats:
+        out = open(args.json_out, 'a') if args.json_out else sys.stdout
+        try:
+            stats(args.group, args.port, args.interval, out, args.window,
+                  max(1, args.batch), args.bufsize, args.rcvbuf)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    else:
+        MCAST_GRP, MCAST_PORT = args.group, args.port
+        main()
@@ -2,43 +2,209 @@
 """
 Multicast IPTV Sender (TV Server)
 Sends video stream to multicast group 239.1.1.1
+
+Every datagram starts with the binary header from iptv_frame.py (stream id,
+64-bit sequence number, nanosecond send timestamp).
+
+Benchmark mode (--bitrate) holds a target bitrate with a monotonic-clock
+pacer instead of sleep(), e.g. an 8 Mbit/s channel of 1316-byte packets:
+    python3 multicast_sender.py --bitrate 8M --size 1316 --duration 30
 """
 
+import argparse
+import math
 import socket
-import struct
 import time
 import sys
 
+import iptv_frame
+
 MCAST_GRP = '239.1.1.1'
 MCAST_PORT = 5007
 MULTICAST_TTL = 32
 
-def main():
+STREAM_ID = 1
+# Datagram size of the default 10 fps stream
+FRAME_SIZE = 188
+# 7 MPEG-TS packets per datagram, the usual IPTV payload size
+BENCH_PACKET_SIZE = 1316
+# Never burst more than this far behind schedule (e.g. after a stall)
+MAX_BACKLOG_NS = 100_000_000
+
+
+RATE_UNITS = {'k': 1e3, 'm': 1e6, 'g': 1e9}
+# Longest first, so '8mbit/s' loses 'bit/s' and not just 's'
+RATE_SUFFIXES = ('bit/s', 'bits', 'bps', 'bit', 'b/s', 'b')
+# Byte rates are refused rather than silently read as bits
+BYTE_SUFFIXES = ('B', 'B/s', 'Bps', 'byte', 'bytes', 'Byte', 'Bytes')
+
+
+def parse_rate(value):
+    """
+    Parse a bitrate such as '8M', '500k', '2.5Mbps', '1 Gbit/s' or
+    '20000000' into bits/s. Units are bits only: '8MB' is rejected.
+    """
+    text = value.strip()
+    if text.endswith(BYTE_SUFFIXES):
+        raise ValueError(f'bitrate must be in bits, not bytes: {value}')
+    text = text.lower()
+    for suffix in RATE_SUFFIXES:
+        if text.endswith(suffix):
+            text = text[:-len(suffix)].rstrip()
+            break
+    if text and text[-1] in RATE_UNITS:
+        rate = float(text[:-1]) * RATE_UNITS[text[-1]]
+    else:
+        rate = float(text)
+    if not math.isfinite(rate) or rate <= 0:
+        raise ValueError(f'bitrate must be positive: {value}')
+    return rate
+
+
+def open_socket(group, port, ttl):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
-    
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+    return sock
+
+
+def main(stream_id=STREAM_ID, flags=0):
+    sock = open_socket(MCAST_GRP, MCAST_PORT, MULTICAST_TTL)
+    clock = iptv_frame.clock_for(flags)
+    frame = bytearray(FRAME_SIZE)
+
     print(f"📺 TV Server starting...")
     print(f"   Multicast Group: {MCAST_GRP}")
     print(f"   Port: {MCAST_PORT}")
     print(f"   TTL: {MULTICAST_TTL}")
     print(f"   Press Ctrl+C to stop")
     print("")
-    
+
     frame_number = 0
     try:
         while True:
-            message = f"IPTV Frame #{frame_number} - Timestamp: {time.time():.2f}".encode('utf-8')
-            sock.sendto(message, (MCAST_GRP, MCAST_PORT))
-            
+            iptv_frame.pack_into(frame, stream_id, frame_number, clock(), flags)
+            sock.sendto(frame, (MCAST_GRP, MCAST_PORT))
+
             if frame_number % 10 == 0:
                 print(f"✓ Sent frame {frame_number}")
-            
+
             frame_number += 1
             time.sleep(0.1)  # 10 frames per second
-            
+
     except KeyboardInterrupt:
         print("\n📺 TV Server stopped")
         sock.close()
 
+
+def bench(group, port, ttl, bitrate, size, duration, batch,
+          stream_id=STREAM_ID, flags=0):
+    """
+    Send `size`-byte datagrams at `bitrate` bits/s for `duration` seconds.
+
+    The schedule is kept on the monotonic clock (packet n is due at
+    start + n * interval), so timing errors do not accumulate. Packets that
+    are due are sent back-to-back in bursts of up to `batch` from one
+    preallocated buffer; the pacer sleeps only when more than a millisecond
+    ahead of schedule and spins otherwise. Each packet is stamped with its
+    sequence number and send time in place before it goes out.
+    """
+    sock = open_socket(group, port, ttl)
+    sock.connect((group, port))  # no per-packet address resolution
+    send = sock.send
+
+    size = max(size, iptv_frame.HEADER_SIZE)
+    payload = bytearray(size)
+    view = memoryview(payload)
+    stamp = iptv_frame.pack_into
+    clock = iptv_frame.clock_for(flags)
+    interval_ns = max(1, int(size * 8 * 1e9 / bitrate))
+
+    print(f"📺 TV Server benchmark mode")
+    print(f"   Multicast Group: {group}:{port} (TTL {ttl})")
+    print(f"   Target: {bitrate / 1e6:.2f} Mbit/s, {size}-byte packets, "
+          f"{1e9 / interval_ns:.0f} pps, batch {batch}")
+    print(f"   Duration: {duration:g}s")
+    print("")
+
+    sent = errors = late = 0
+    start = time.monotonic_ns()
+    end = start + int(duration * 1e9)
+    next_due = start
+    next_report = start + 1_000_000_000
+    reported = 0
+
+    try:
+        while True:
+            now = time.monotonic_ns()
+            if now >= end:
+                break
+
+            if now < next_due:
+                ahead = next_due - now
+                if ahead > 1_000_000:
+                    time.sleep((ahead - 500_000) / 1e9)
+                continue
+
+            if now - next_due > MAX_BACKLOG_NS:
+                # Stalled (e.g. descheduled): restart the schedule, don't burst
+                late += 1
+                next_due = now
+
+            due = min(batch, (now - next_due) // interval_ns + 1)
+            for seq in range(sent, sent + due):
+                stamp(payload, stream_id, seq, clock(), flags)
+                try:
+                    send(view)
+                except OSError:
+                    errors += 1  # ENOBUFS / EAGAIN: the packet is lost locally
+            sent += due
+            next_due += due * interval_ns
+
+            if now >= next_report:
+                pps = sent - reported
+                print(f"✓ {sent} packets, {pps} pps, {pps * size * 8 / 1e6:.2f} Mbit/s")
+                reported = sent
+                next_report += 1_000_000_000
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = (time.monotonic_ns() - start) / 1e9
+    sock.close()
+
+    achieved = (sent - errors) * size * 8 / elapsed if elapsed > 0 else 0.0
+    print(f"\n📺 Benchmark finished after {elapsed:.2f}s")
+    print(f"   Sent: {sent} packets ({sent * size / 1e6:.1f} MB), send errors: {errors}")
+    print(f"   Rate: {achieved / 1e6:.2f} Mbit/s "
+          f"({100 * achieved / bitrate:.1f}% of target), schedule resets: {late}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Multicast IPTV sender')
+    parser.add_argument('--group', default=MCAST_GRP)
+    parser.add_argument('--port', type=int, default=MCAST_PORT)
+    parser.add_argument('--ttl', type=int, default=MULTICAST_TTL)
+    parser.add_argument('--stream-id', type=int, default=STREAM_ID,
+                        help=f'stream id written into every frame (default: {STREAM_ID})')
+    parser.add_argument('--clock', choices=['realtime', 'monotonic'], default='realtime',
+                        help='timestamp clock; monotonic is only comparable on the same host')
+    parser.add_argument('--bitrate', type=parse_rate, default=None,
+                        help="benchmark mode: target bitrate in bits/s, e.g. '8M' or "
+                             "'20Mbit/s' (byte units are rejected)")
+    parser.add_argument('--size', type=int, default=BENCH_PACKET_SIZE,
+                        help=f'benchmark packet size in bytes (default: {BENCH_PACKET_SIZE})')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='benchmark duration in seconds (default: 10)')
+    parser.add_argument('--batch', type=int, default=32,
+                        help='max packets sent back-to-back per pacer tick (default: 32)')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    flags = iptv_frame.FLAG_MONOTONIC if args.clock == 'monotonic' else 0
+    if args.bitrate:
+        bench(args.group, args.port, args.ttl, args.bitrate, args.size,
+              args.duration, max(1, args.batch), args.stream_id, flags)
+    else:
+        MCAST_GRP, MCAST_PORT, MULTICAST_TTL = args.group, args.port, args.ttl
+        main(args.stream_id, flags)
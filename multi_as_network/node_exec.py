@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Node Index and Command Execution Service
+
+run.py publishes a node index when the network starts (one line per node:
+name, PID of the node's namespace holder, kind), so tools can find a node
+without scanning the process table. run_on_node.sh reads it with awk.
+
+It also starts an execution service on a unix socket that keeps one
+persistent shell per node (spawned on first use with mnexec) and runs
+commands on different nodes concurrently. Round trips are a few
+milliseconds instead of a process spawn plus a `ps` scan per command.
+
+Usage (as root, while the network is running):
+    sudo python3 node_exec.py nodes
+    sudo python3 node_exec.py run pc1 ip -br addr
+    sudo python3 node_exec.py bench pc1 -n 200
+    sudo python3 node_exec.py serve          # standalone, from the index file
+
+From Python:
+    with NodeExecClient() as client:
+        status, output, elapsed = client.run('pc1', 'ping -c 1 192.168.4.2')
+    results = run_many([('pc1', 'hostname'), ('pc2', 'hostname')])
+"""
+
+import argparse
+import json
+import os
+import select
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+INDEX_FILE = os.environ.get('MININET_NODE_INDEX', '/tmp/multi_as_network.nodes')
+SOCKET_PATH = os.environ.get('MININET_EXEC_SOCKET', '/tmp/multi_as_network.sock')
+
+
+# -- node index --------------------------------------------------------------
+
+def publish_index(nodes, path=INDEX_FILE):
+    """
+    Write the node index atomically. `nodes` is an iterable of
+    (name, pid, kind) tuples.
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write('# name pid kind\n')
+        for name, pid, kind in nodes:
+            f.write(f'{name} {pid} {kind}\n')
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def load_index(path=INDEX_FILE):
+    """{name: (pid, kind)} from the index file, or {} if there is none"""
+    index = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith('#') or not line.strip():
+                    continue
+                name, pid, kind = line.split()
+                index[name] = (int(pid), kind)
+    except OSError:
+        pass
+    return index
+
+
+def remove_index(path=INDEX_FILE):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# -- Mininet node shells -------------------------------------------------------
+
+def last_status(node):
+    """
+    Exit status of the last command run with node.cmd(). The status is the
+    last line of the reply; anything unparsable (late background-job
+    notices, a wedged shell) counts as a failure.
+    """
+    lines = node.cmd('echo $?').strip().splitlines()
+    try:
+        return int(lines[-1].strip())
+    except (IndexError, ValueError):
+        return 1
+
+
+# -- persistent shells ---------------------------------------------------------
+
+class NodeShell:
+    """A bash running inside a node's namespaces, reused for every command"""
+
+    def __init__(self, name, pid):
+        self.name = name
+        self.pid = pid
+        self.lock = threading.Lock()
+        self.proc = None
+
+    def _spawn(self):
+        self.proc = subprocess.Popen(
+            ['mnexec', '-a', str(self.pid), 'bash', '--norc', '--noprofile'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            bufsize=0)
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+    def run(self, command, timeout=None):
+        """Run a command; returns (status, output, elapsed)"""
+        with self.lock:
+            if self.proc is None or self.proc.poll() is not None:
+                self._spawn()
+            marker = uuid.uuid4().hex
+            # stdin is the control channel: keep commands from reading it
+            script = (f'{{ {command}\n}} < /dev/null 2>&1\n'
+                      f'printf "\\n{marker} %d\\n" $?\n')
+            start = time.monotonic()
+            self.proc.stdin.write(script.encode())
+
+            fd = self.proc.stdout.fileno()
+            tail = f'\n{marker} '.encode()
+            data = bytearray()
+            deadline = start + timeout if timeout else None
+            while True:
+                wait = None if deadline is None else max(0, deadline - time.monotonic())
+                if not select.select([fd], [], [], wait)[0]:
+                    # Timed out: the shell is busy, so replace it
+                    self.close()
+                    return 124, data.decode('utf-8', 'replace'), time.monotonic() - start
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    self.proc = None
+                    return 127, data.decode('utf-8', 'replace'), time.monotonic() - start
+                data += chunk
+                position = data.find(tail)
+                if position >= 0 and data.endswith(b'\n'):
+                    status = int(data[position + len(tail):].split(b'\n', 1)[0])
+                    output = data[:position].decode('utf-8', 'replace')
+                    return status, output, time.monotonic() - start
+
+
+class NodeExecService:
+    """Unix-socket server multiplexing commands onto per-node shells"""
+
+    def __init__(self, nodes, path=SOCKET_PATH):
+        self.nodes = dict(nodes)  # name -> pid
+        self.path = path
+        self.shells = {}
+        self.shells_lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    def shell(self, name):
+        with self.shells_lock:
+            shell = self.shells.get(name)
+            if shell is None:
+                shell = self.shells[name] = NodeShell(name, self.nodes[name])
+            return shell
+
+    def handle(self, request):
+        if request.get('op') == 'nodes':
+            return {'nodes': sorted(self.nodes)}
+        node = request.get('node')
+        if node not in self.nodes:
+            return {'error': f'unknown node {node}'}
+        status, output, elapsed = self.shell(node).run(request['cmd'], request.get('timeout'))
+        return {'status': status, 'output': output, 'elapsed': elapsed}
+
+    def start(self):
+        """Serve in a daemon thread"""
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = service.handle(json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        response = {'error': str(e)}
+                    self.wfile.write(json.dumps(response).encode() + b'\n')
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        # Commands run as root inside the nodes: root only
+        os.chmod(self.path, 0o600)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        for shell in self.shells.values():
+            shell.close()
+        self.shells = {}
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def start(net, routers, index_path=INDEX_FILE, socket_path=SOCKET_PATH):
+    """Publish the index for a running Mininet and start the exec service"""
+    routers = set(routers)
+    nodes = [(node.name, node.pid, 'router' if node.name in routers else 'host')
+             for node in net.hosts]
+    publish_index(nodes, index_path)
+    return NodeExecService({name: pid for name, pid, _ in nodes}, socket_path).start()
+
+
+def stop(service, index_path=INDEX_FILE):
+    service.close()
+    remove_index(index_path)
+
+
+# -- client ------------------------------------------------------------------
+
+class NodeExecClient:
+    """One connection to the exec service; requests on it run one at a time"""
+
+    def __init__(self, path=SOCKET_PATH):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.file = self.sock.makefile('rwb')
+
+    def request(self, request):
+        self.file.write(json.dumps(request).encode() + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError('exec service closed the connection')
+        return json.loads(line)
+
+    def run(self, node, command, timeout=None):
+        """Returns (status, output, elapsed)"""
+        response = self.request({'node': node, 'cmd': command, 'timeout': timeout})
+        if 'error' in response:
+            raise KeyError(response['error'])
+        return response['status'], response['output'], response['elapsed']
+
+    def nodes(self):
+        return self.request({'op': 'nodes'})['nodes']
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_many(commands, path=SOCKET_PATH, workers=32, timeout=None):
+    """
+    Run (node, command) pairs concurrently over several connections.
+    Returns a list of (status, output, elapsed) in input order.
+    """
+    local = threading.local()
+    clients = []
+
+    def run_one(item):
+        if not hasattr(local, 'client'):
+            local.client = NodeExecClient(path)
+            clients.append(local.client)
+        return local.client.run(item[0], item[1], timeout)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(commands)))) as pool:
+            return list(pool.map(run_one, commands))
+    finally:
+        for client in clients:
+            client.close()
+
+
+# -- CLI ---------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Run commands on Mininet nodes')
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    parser.add_argument('--index', default=INDEX_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('nodes', help='list nodes from the index')
+    run = sub.add_parser('run', help='run a command on a node')
+    run.add_argument('node')
+    run.add_argument('cmd', nargs=argparse.REMAINDER)
+    run.add_argument('--timeout', type=float, default=None)
+    bench = sub.add_parser('bench', help='measure command round-trip latency')
+    bench.add_argument('node')
+    bench.add_argument('-n', type=int, default=100)
+    sub.add_parser('serve', help='serve the nodes in the index file (standalone)')
+    args = parser.parse_args()
+
+    if args.command == 'nodes':
+        index = load_index(args.index)
+        if not index:
+            print(f"❌ No node index at {args.index} (is run.py running?)")
+            sys.exit(1)
+        for name, (pid, kind) in sorted(index.items()):
+            print(f"{name:<12} {pid:>8}  {kind}")
+    elif args.command == 'run':
+        with NodeExecClient(args.socket) as client:
+            status, output, _ = client.run(args.node, ' '.join(args.cmd), args.timeout)
+        sys.stdout.write(output)
+        sys.exit(status)
+    elif args.command == 'bench':
+        with NodeExecClient(args.socket) as client:
+            times = sorted(client.run(args.node, 'true')[2] * 1000 for _ in range(args.n))
+        print(f"✓ {args.n} round trips to {args.node}: "
+              f"p50 {times[len(times) // 2]:.2f} ms, "
+              f"p99 {times[min(len(times) - 1, int(len(times) * 0.99))]:.2f} ms, "
+              f"max {times[-1]:.2f} ms")
+    elif args.command == 'serve':
+        index = load_index(args.index)
+        if not index:
+            print(f"❌ No node index at {args.index} (is run.py running?)")
+            sys.exit(1)
+        service = NodeExecService({name: pid for name, (pid, _) in index.items()},
+                                  args.socket).start()
+        print(f"✅ Serving {len(index)} nodes on {args.socket}")
+        try:
+            service.thread.join()
+        except KeyboardInterrupt:
+            service.close()
+
+
+if __name__ == '__main__':
+    main()
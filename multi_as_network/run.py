@@ -3,44 +3,242 @@
 Main script to run the Multi-AS Network with Mininet and FRR
 """
 
-from mininet.net import Mininet
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from mininet.cli import CLI
 from mininet.log import setLogLevel, info
 
+import frr_gen
+import link_profiles
+import node_exec
+from fast_build import TimedMininet, FastMininet, report_timings
 from topology import NetworkTopo
+from topology_spec import TopologySpec
+from convergence import expectations_from_spec, wait_for_convergence
 
 
-def run():
-    """Start the network and FRR daemons"""
-    topo = NetworkTopo()
-    net = Mininet(topo=topo, controller=None)
-    
+def frr_action(node, action):
+    """Run frrinit.sh on a single router and return (status, elapsed, output)"""
+    start = time.monotonic()
+    output = node.cmd(f"/usr/lib/frr/frrinit.sh {action} '{node.name}'")
+    status = node_exec.last_status(node)
+    return status, time.monotonic() - start, output
+
+
+def frr_service(net, routers, action, workers=None):
+    """
+    Start or stop FRR on all routers, one worker per router.
+
+    Every Mininet node owns its own shell, so commands on different routers
+    can run concurrently. `workers` caps how many routers are handled at once
+    (1 reproduces the old serial behaviour).
+
+    Returns (results, wall) where results maps router -> (status, elapsed, output).
+    """
+    workers = max(1, min(workers or len(routers), len(routers)))
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {router: pool.submit(frr_action, net[router], action)
+                   for router in routers}
+        results = {router: future.result() for router, future in futures.items()}
+    return results, time.monotonic() - start
+
+
+def report_frr_service(action, results, wall):
+    """Print per-router status/timing and wall-clock against the serial baseline"""
+    for router, (status, elapsed, output) in results.items():
+        state = 'ok' if status == 0 else f'FAILED (exit {status})'
+        info(f'{router}: {action} {state} in {elapsed:.2f}s\n')
+        if status != 0 and output.strip():
+            info(f'{router}: {output.strip()}\n')
+
+    serial = sum(elapsed for _, elapsed, _ in results.values())
+    speedup = serial / wall if wall > 0 else 1.0
+    failed = [router for router, (status, _, _) in results.items() if status != 0]
+    info(f'*** FRR {action}: {len(results)} routers in {wall:.2f}s wall-clock '
+         f'(serial baseline {serial:.2f}s, {speedup:.1f}x)\n')
+    if failed:
+        info(f'*** FRR {action} failed on: {", ".join(failed)}\n')
+
+
+def wait_converged(timeout, spec=None):
+    """
+    Block until routing has converged, reporting per-protocol timings.
+    The expected state is derived from `spec` (default: topology.json).
+    """
+    info(f'\n*** Waiting for convergence (timeout {timeout:.0f}s) ***\n')
+    result = wait_for_convergence(
+        timeout, expectations_from_spec(spec or TopologySpec.load()),
+        on_converged=lambda protocol, seconds:
+            info(f'{protocol.upper()} converged after {seconds:.2f}s\n'))
+    if result.converged:
+        info(f'*** Converged in {result.elapsed:.2f}s ***\n')
+    else:
+        info(f'*** Not converged after {result.elapsed:.2f}s, still waiting for:\n')
+        for item in result.to_dict()['pending']:
+            info(f'  - {item}\n')
+    return result
+
+
+def setup_frr(spec, out_dir=None):
+    """
+    Render FRR configs for a spec and install the changed ones into
+    /etc/frr/<router>/ (see frr_gen.py). Configs go to
+    generated/<spec hash> unless `out_dir` is given.
+    """
+    out_dir = out_dir or f'generated/{spec.digest()[:12]}'
+    start = time.monotonic()
+    _, manifest = frr_gen.generate(spec, out_dir)
+    done = frr_gen.install(out_dir, manifest)
+    files = sum(len(names) for names in done.values())
+    info(f'*** FRR configs in {out_dir}: {files} files installed on {len(done)} '
+         f'routers in {time.monotonic() - start:.2f}s\n')
+
+
+def parse_generate(value):
+    """
+    Parse --generate NUM_AS,ROUTERS_PER_AS[,IGP[,HOSTS_PER_EDGE]] into
+    plan_topology() parameters; IGP is 'ospf', 'rip' or a '/'-separated
+    list repeated over the ASes (e.g. 'ospf/rip' alternates).
+    """
+    parts = value.split(',')
+    if not 2 <= len(parts) <= 4:
+        raise argparse.ArgumentTypeError(
+            'expected NUM_AS,ROUTERS_PER_AS[,IGP[,HOSTS_PER_EDGE]]')
+    try:
+        params = {'num_as': int(parts[0]), 'routers_per_as': int(parts[1])}
+        if len(parts) > 3:
+            params['hosts_per_edge'] = int(parts[3])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if len(parts) > 2:
+        igp = parts[2].split('/')
+        params['igp'] = ([igp[i % len(igp)] for i in range(params['num_as'])]
+                         if len(igp) > 1 else igp[0])
+    return params
+
+
+def start_network(workers=None, converge_timeout=120, link_profile=None, fast_build=False,
+                  spec=None):
+    """
+    Build the topology, start FRR and wait for convergence; returns (net,
+    routers). `spec` is a TopologySpec to build instead of topology.json;
+    its FRR configs are generated and installed first. `fast_build` uses
+    batched, concurrent node and link setup (see fast_build.py). Phase
+    timings are kept in `net.timings`, the topology spec in `net.spec`.
+    """
+    if spec is not None:
+        info(f'*** Topology {spec.name}: {len(spec.routers)} routers, '
+             f'{len(spec.hosts)} hosts, {len(spec.links)} links\n')
+        setup_frr(spec)
+    topo = NetworkTopo(spec=spec, link_profile=link_profile)
+    if fast_build:
+        net = FastMininet(topo=topo, controller=None)
+    else:
+        net = TimedMininet(topo=topo, controller=None)
+
     net.start()
-    
+    net.spec = topo.spec
+    if topo.link_profile:
+        link_profiles.save_active(topo.link_profile)
+        info(f'*** Link profile: {topo.link_profile}\n')
+    else:
+        link_profiles.clear_active()
+
     # List of all routers
-    routers = ['r1', 'r2', 'r3', 'r4', 'r5', 'r6', 'r7', 'r8', 'r9']
-    
+    routers = list(topo.spec.routers)
+
+    # Node -> PID index for run_on_node.sh, plus the persistent exec service
+    net.node_exec = node_exec.start(net, routers)
+    info(f'*** Node index: {node_exec.INDEX_FILE}, exec service: {node_exec.SOCKET_PATH}\n')
+
     # Start FRR on each router
     info('\n*** Starting FRR on routers ***\n')
-    for router in routers:
-        info(f'Starting FRR on {router}...\n')
-        result = net[router].cmd(f"/usr/lib/frr/frrinit.sh start '{router}'")
-        info(f'{router}: {result}\n')
-    
+    results, wall = frr_service(net, routers, 'start', workers)
+    report_frr_service('start', results, wall)
+    net.timings['frr'] = wall
+    report_timings(net.timings)
+
+    if converge_timeout > 0:
+        wait_converged(converge_timeout, topo.spec)
+    return net, routers
+
+
+def stop_network(net, routers, workers=None):
+    """Stop FRR on all routers and tear the network down"""
+    info('\n*** Stopping FRR on routers ***\n')
+    results, wall = frr_service(net, routers, 'stop', workers)
+    report_frr_service('stop', results, wall)
+
+    node_exec.stop(net.node_exec)
+    link_profiles.clear_active()
+    net.stop()
+
+
+def run(workers=None, converge_timeout=120, link_profile=None, fast_build=False, spec=None):
+    """Start the network and FRR daemons"""
+    net, routers = start_network(workers, converge_timeout, link_profile, fast_build, spec)
+
     info('\n*** Network is ready ***\n')
     info('*** You can test connectivity with: pc1 ping pc4 ***\n\n')
-    
+
     CLI(net)
 
-    # Stop FRR on each router
-    info('\n*** Stopping FRR on routers ***\n')
-    for router in routers:
-        info(f'Stopping FRR on {router}...\n')
-        net[router].cmd(f"/usr/lib/frr/frrinit.sh stop '{router}'")
+    stop_network(net, routers, workers)
 
-    net.stop()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the Multi-AS network')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='max routers to start/stop FRR on concurrently '
+                             '(default: all at once)')
+    parser.add_argument('--serial', action='store_true',
+                        help='start/stop FRR one router at a time')
+    parser.add_argument('--converge-timeout', type=float, default=120,
+                        help='seconds to wait for OSPF/RIP/BGP/PIM convergence '
+                             'before opening the CLI (0 to skip)')
+    parser.add_argument('--link-profile', default=None, metavar='NAME',
+                        help='shape links with a profile from link_profiles.json '
+                             '(default: unshaped); switch later with link_profiles.py apply')
+    parser.add_argument('--fast-build', action='store_true',
+                        help='create nodes, links and addresses in batches and in '
+                             'parallel (see fast_build.py)')
+    topology = parser.add_mutually_exclusive_group()
+    topology.add_argument('--spec', default=None, metavar='FILE',
+                          help='build this topology spec instead of topology.json; '
+                               'FRR configs are generated and installed for it')
+    topology.add_argument('--generate', type=parse_generate, default=None,
+                          metavar='AS,R[,IGP[,HOSTS]]',
+                          help='build a generated topology, e.g. 10,20,ospf/rip '
+                               '(see topology_spec.py generate)')
+    parser.add_argument('--experiment', default=None, metavar='FILE',
+                        help='run an experiment file headless instead of opening '
+                             'the CLI (see experiment.py)')
+    parser.add_argument('--out', default=None,
+                        help='results prefix for --experiment (writes .json and .csv)')
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
+    args = parse_args()
     setLogLevel('info')
-    run()
+    workers = 1 if args.serial else args.workers
+    try:
+        if args.spec:
+            spec = TopologySpec.load(args.spec)
+        elif args.generate:
+            spec = TopologySpec.generate(**args.generate)
+        else:
+            spec = None
+    except (OSError, ValueError) as e:
+        sys.exit(f'Invalid topology: {e}')
+    if args.experiment:
+        from experiment import run_experiment_file
+        sys.exit(run_experiment_file(args.experiment, args.out, workers,
+                                     args.converge_timeout, args.link_profile,
+                                     args.fast_build, spec))
+    run(workers=workers, converge_timeout=args.converge_timeout,
+        link_profile=args.link_profile, fast_build=args.fast_build, spec=spec)
@@ -1,5 +1,18 @@
 #!/bin/bash
 # run_on_node.sh - Execute commands on Mininet nodes from external terminal
+#
+# Node PIDs come from the index run.py publishes at startup; the ps scan is
+# only a fallback for networks started without it.
+
+INDEX="${MININET_NODE_INDEX:-/tmp/multi_as_network.nodes}"
+
+list_nodes() {
+    if [ -f "$INDEX" ]; then
+        awk '!/^#/ {print "  - " $1}' "$INDEX" | sort
+    else
+        ps aux | grep "mininet:" | grep -v grep | sed 's/.*mininet://g' | awk '{print "  - " $1}' | sort -u
+    fi
+}
 
 if [ "$#" -lt 2 ]; then
     echo "Usage: $0 <node> <command> [args...]"
@@ -11,7 +24,7 @@ if [ "$#" -lt 2 ]; then
     echo "  $0 r5 'show ip pim neighbor'  # For routers, vtysh is automatic"
     echo ""
     echo "Available nodes:"
-    ps aux | grep "mininet:" | grep -v grep | sed 's/.*mininet://g' | awk '{print "  - " $1}' | sort -u
+    list_nodes
     exit 1
 fi
 
@@ -39,7 +52,17 @@ if [[ $NODE =~ ^r[0-9]+$ ]] && [[ $CMD =~ ^vtysh ]]; then
     exit $?
 fi
 
-PID=$(ps aux | grep "mininet:$NODE" | grep -v grep | awk '{print $2}' | head -1)
+PID=""
+if [ -f "$INDEX" ]; then
+    PID=$(awk -v node="$NODE" '$1 == node {print $2; exit}' "$INDEX")
+    # Ignore a stale index left behind by a crashed run
+    if [ -n "$PID" ] && [ ! -d "/proc/$PID" ]; then
+        PID=""
+    fi
+fi
+if [ -z "$PID" ]; then
+    PID=$(ps aux | grep "mininet:$NODE" | grep -v grep | awk '{print $2}' | head -1)
+fi
 
 if [ -z "$PID" ]; then
     echo "❌ Error: Node '$NODE' not found or not running"
@@ -47,7 +70,7 @@ if [ -z "$PID" ]; then
     echo "Make sure Mininet is running with: sudo python3 run.py"
     echo ""
     echo "Available nodes:"
-    ps aux | grep "mininet:" | grep -v grep | sed 's/.*mininet://g' | awk '{print "  - " $1}' | sort -u
+    list_nodes
     exit 1
 fi
 
@@ -1,32 +1,23 @@
 #!/bin/bash
 # Setup FRR configuration directories for each router
+#
+# Usage: ./setup_frr.sh [--force] [router ...]   (default: all routers)
+#
+# Renders r1..r9 from topology.json with frr_gen.py and installs them into
+# /etc/frr/<router>/. Only files whose content changed since the last
+# install are reinstalled; --force reinstalls everything.
+# For generated topologies use: python3 frr_gen.py --spec big.json --install
 
-ROUTERS="r1 r2 r3 r4 r5 r6 r7 r8 r9"
+cd "$(dirname "$0")" || exit 1
 
-for NODE in $ROUTERS
-do
-    echo "Setting up FRR for $NODE..."
-    
-    # Create log directory
-    sudo install -m 775 -o frr -g frr -d /var/log/frr/${NODE}
-    
-    # Create config directory
-    sudo install -m 775 -o frr -g frrvty -d /etc/frr/${NODE}
-    
-    # Clean existing configs
-    sudo rm -f /etc/frr/${NODE}/*
-    
-    # Install configuration files
-    sudo install -m 640 -o frr -g frrvty ${NODE}/vtysh.conf \
-        /etc/frr/${NODE}/vtysh.conf
-    sudo install -m 640 -o frr -g frr ${NODE}/frr.conf \
-        /etc/frr/${NODE}/frr.conf
-    sudo install -m 640 -o frr -g frr ${NODE}/daemons \
-        /etc/frr/${NODE}/daemons
-    
-    echo "Done with $NODE"
-done
+FORCE=""
+if [ "$1" = "--force" ]; then
+    FORCE="--force"
+    shift
+fi
+
+python3 frr_gen.py --out . --install $FORCE ${1:+--routers "$@"} || exit 1
 
 echo ""
-echo "FRR setup complete for all routers!"
+echo "FRR setup complete for: ${@:-all routers}"
 echo "You can now run: sudo python3 run.py"
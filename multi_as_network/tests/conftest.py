@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The lab scripts are run from multi_as_network/ and import each other flat
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
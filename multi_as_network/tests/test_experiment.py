@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('mininet')
+
+import experiment
+import link_profiles
+from topology_spec import TopologySpec
+
+
+class RunningNet:
+    def __init__(self, spec):
+        self.spec = spec
+
+
+def test_link_profile_step_shapes_the_running_topology(monkeypatch):
+    spec = TopologySpec.generate(num_as=2, routers_per_as=2)
+    applied = {}
+
+    def apply_profile(spec, profiles, name):
+        applied['links'] = [(link['src'], link['dst']) for link in spec.links]
+        return profiles.resolve(name), {}
+
+    monkeypatch.setattr(link_profiles, 'apply_profile', apply_profile)
+    runner = experiment.Experiment({'name': 'shaping'}, topology=spec)
+    runner.net = RunningNet(spec)
+
+    assert runner.run_step(0, {'action': 'link_profile', 'profile': 'wan'}, 1, 'trial')
+    assert applied['links'] == [(link['src'], link['dst']) for link in spec.links]
+    assert runner.records[-1]['ok']
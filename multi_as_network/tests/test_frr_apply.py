@@ -0,0 +1,86 @@
+from frr_apply import build_commands, config_paths, diff_config
+
+
+BASE = """\
+frr version 8.1
+hostname r2
+!
+router rip
+ network 10.0.1.0/24
+ redistribute connected
+exit
+!
+router bgp 200
+ neighbor 10.0.9.2 remote-as 300
+ !
+ address-family ipv4 unicast
+  network 192.168.1.0/24
+  neighbor 10.0.9.2 route-map PREFER-PEERING in
+ exit-address-family
+exit
+!
+interface r2-eth0
+ description Link to R1
+ ip pim sm
+exit
+!
+"""
+
+
+def test_config_paths_nest_contexts():
+    paths = config_paths(BASE)
+    assert ('router rip', 'network 10.0.1.0/24') in paths
+    assert ('router bgp 200', 'address-family ipv4 unicast',
+            'neighbor 10.0.9.2 route-map PREFER-PEERING in') in paths
+    assert ('interface r2-eth0', 'ip pim sm') in paths
+    # Ignored and comment lines never become paths
+    assert not any(p[-1].startswith(('frr version', '!')) for p in paths)
+
+
+def test_diff_inside_context_block():
+    new = BASE.replace('  network 192.168.1.0/24\n',
+                       '  network 192.168.1.0/24\n  network 192.168.2.0/24\n')
+    removed, added = diff_config(BASE, new)
+    assert removed == []
+    assert added == [('router bgp 200', 'address-family ipv4 unicast',
+                      'network 192.168.2.0/24')]
+    assert build_commands(removed, added) == [
+        'configure terminal', 'router bgp 200', 'address-family ipv4 unicast',
+        'network 192.168.2.0/24', 'end']
+
+
+def test_removed_context_is_deleted_as_a_whole_before_additions():
+    new = BASE.replace('router rip\n network 10.0.1.0/24\n redistribute connected\nexit\n', '')
+    new = new.replace(' description Link to R1\n', ' description Uplink\n')
+    commands = build_commands(*diff_config(BASE, new))
+    assert commands == [
+        'configure terminal', 'interface r2-eth0', 'no description Link to R1', 'end',
+        'configure terminal', 'no router rip', 'end',
+        'configure terminal', 'interface r2-eth0', 'description Uplink', 'end']
+
+
+def test_peer_removal_negates_children_before_the_neighbor():
+    new = BASE.replace(' neighbor 10.0.9.2 remote-as 300\n', '')
+    new = new.replace('  neighbor 10.0.9.2 route-map PREFER-PEERING in\n', '')
+    commands = build_commands(*diff_config(BASE, new))
+    assert commands == [
+        'configure terminal', 'router bgp 200', 'address-family ipv4 unicast',
+        'no neighbor 10.0.9.2 route-map PREFER-PEERING in', 'end',
+        'configure terminal', 'router bgp 200', 'no neighbor 10.0.9.2 remote-as 300', 'end']
+
+
+def test_removed_interface_gets_its_lines_negated():
+    new = BASE.replace('interface r2-eth0\n description Link to R1\n ip pim sm\nexit\n', '')
+    commands = build_commands(*diff_config(BASE, new))
+    assert 'no interface r2-eth0' not in commands
+    assert commands == ['configure terminal', 'interface r2-eth0',
+                        'no description Link to R1', 'no ip pim sm', 'end']
+
+
+def test_no_op_diff_sends_nothing():
+    # Comments, blank lines and version headers do not count as changes
+    lines = [line for line in BASE.splitlines() if line.strip() != '!']
+    reformatted = '\n'.join(lines).replace('frr version 8.1', 'frr version 8.4') + '\n\n! end\n'
+    removed, added = diff_config(BASE, reformatted)
+    assert (removed, added) == ([], [])
+    assert build_commands(removed, added) == []
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+import pytest
+
+from frr_gen import ConfigGenerator
+from topology_spec import TopologySpec
+
+LAB = Path(__file__).resolve().parent.parent
+SPEC = TopologySpec.load()
+
+
+@pytest.mark.parametrize('router', list(SPEC.routers))
+def test_lab_configs_match_the_generator(router):
+    """r1..r9 are frr_gen.py output; regenerate them after editing topology.json"""
+    rendered = ConfigGenerator(SPEC).render(router)
+    for name, content in rendered.items():
+        assert (LAB / router / name).read_text() == content, f'{router}/{name}'
@@ -0,0 +1,73 @@
+from iptv_stats import LatencyHistogram, StreamStats
+
+
+def test_histogram_is_exact_below_sub_buckets():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(99) == 99
+    assert histogram.percentile(100) == 100
+    assert (histogram.min, histogram.max, histogram.mean()) == (1, 100, 50.5)
+
+
+def test_histogram_relative_precision():
+    for value in (1000, 123456, 5_000_000, 987_654_321_000):
+        histogram = LatencyHistogram()
+        histogram.record(value)
+        histogram.record(value * 2)
+        estimate = histogram.percentile(50)
+        assert abs(estimate - value) / value < 0.016
+
+
+def test_histogram_empty_and_clamped():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.mean() is None
+    histogram.record(-5)
+    assert histogram.min == 0
+    histogram.reset()
+    assert histogram.total == 0
+
+
+def test_jitter_constant_transit_is_zero():
+    stats = StreamStats(1)
+    for seq in range(50):
+        stats.update(seq, seq * 1000, seq * 1000 + 500, 100)
+    assert stats.jitter == 0.0
+
+
+def test_jitter_follows_rfc3550():
+    stats = StreamStats(1)
+    stats.update(0, 0, 1000, 100)
+    stats.update(1, 10_000, 12_600, 100)   # transit 1000 -> 2600, D = 1600
+    assert stats.jitter == 100.0
+    stats.update(2, 20_000, 21_000, 100)   # transit 2600 -> 1000, D = 1600
+    assert stats.jitter == 100.0 + (1600 - 100.0) / 16
+
+
+def test_loss_reorder_and_duplicates():
+    stats = StreamStats(1, window=64)
+    for seq in (0, 1, 2, 5, 4, 4, 6):
+        stats.update(seq, 0, 1, 10)
+    assert stats.expected == 7
+    assert stats.received == 6
+    assert stats.lost == 1               # seq 3
+    assert stats.gaps == 1 and stats.max_gap == 2
+    assert stats.reordered == 1 and stats.max_reorder_depth == 1
+    assert stats.duplicates == 1
+
+
+def test_sender_restart_starts_a_new_epoch():
+    stats = StreamStats(1, window=16)
+    for seq in range(100):
+        stats.update(seq, 0, 1000, 10)
+    for seq in (0, 1, 3, 4):               # restarted sender, seq 2 lost
+        stats.update(seq, 0, 2000, 10)
+    assert stats.resets == 1
+    assert stats.late == 0
+    assert stats.received == 104
+    assert stats.expected == 105
+    assert stats.lost == 1
+    assert stats.latency.max == 2000
+    assert stats.summary()['resets'] == 1
@@ -0,0 +1,26 @@
+import pytest
+
+from multicast_sender import parse_rate
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('20000000', 20e6),
+    ('8M', 8e6),
+    ('500k', 500e3),
+    ('2.5Mbps', 2.5e6),
+    ('1 Gbit/s', 1e9),
+    ('100kbit', 100e3),
+    ('4mb/s', 4e6),
+    ('64000bps', 64e3),
+    (' 10 M ', 10e6),
+])
+def test_parse_rate(value, expected):
+    assert parse_rate(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'fast', 'M', '8Mbpss', '8x', '0', '-1M',
+                                   'nan', 'inf', '-inf', 'infM', '8MB', '8MBps', '1 GB/s',
+                                   '100 kbytes'])
+def test_parse_rate_rejects_garbage(value):
+    with pytest.raises(ValueError):
+        parse_rate(value)
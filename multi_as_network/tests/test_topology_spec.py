@@ -0,0 +1,62 @@
+import ipaddress
+
+import pytest
+
+from topology_spec import TopologySpec, plan_topology
+
+
+def test_addresses_are_unique_and_paired():
+    plan = plan_topology(num_as=4, routers_per_as=5, intra_as='ring')
+    subnets = set()
+    for link in plan['links']:
+        src = ipaddress.ip_interface(link['src_ip'])
+        dst = ipaddress.ip_interface(link['dst_ip'])
+        assert src.network == dst.network and src.ip != dst.ip
+        assert src.network not in subnets
+        subnets.add(src.network)
+        if link['type'] == 'Host':
+            assert src.network.subnet_of(ipaddress.ip_network('172.16.0.0/12'))
+            assert src.network.prefixlen == 24
+        else:
+            assert src.network.subnet_of(ipaddress.ip_network('10.0.0.0/8'))
+            assert src.network.prefixlen == 30
+
+
+def test_interface_names_are_sequential_per_node():
+    spec = TopologySpec(plan_topology(num_as=3, routers_per_as=3))
+    for node in spec.nodes():
+        names = [entry['intf'] for entry in spec.interfaces(node)]
+        assert names == [f'{node}-eth{i}' for i in range(len(names))]
+
+
+def test_hosts_use_their_router_as_gateway():
+    spec = TopologySpec(plan_topology(num_as=3, routers_per_as=3, hosts_per_edge=2))
+    for host, data in spec.hosts.items():
+        (entry,) = spec.interfaces(host)
+        assert entry['peer'] == data['router']
+        assert entry['peer_ip'].split('/')[0] == data['gateway']
+    # Border routers carry no hosts
+    border = {e['peer'] for node in spec.routers for e in spec.interfaces(node)
+              if e['type'] in ('BGP', 'Peering')}
+    assert not border & {data['router'] for data in spec.hosts.values()}
+
+
+def test_default_inter_as_graph():
+    spec = TopologySpec(plan_topology(num_as=4, routers_per_as=2, igp=['ospf', 'rip'] * 2))
+    kinds = [link['type'] for link in spec.links]
+    assert kinds.count('BGP') == 3        # AS 100 provides transit to the rest
+    assert kinds.count('Peering') == 2    # AS 200-300, AS 300-400
+    assert spec.as_info['AS 200']['igp'] == 'RIP'
+    assert spec.routers_by_as['AS 100'] == ['r1', 'r2']
+
+
+@pytest.mark.parametrize('params', [
+    {'num_as': 0},
+    {'num_as': 2, 'routers_per_as': [1]},
+    {'num_as': 2, 'igp': 'isis'},
+    {'num_as': 2, 'intra_as': 'mesh'},
+    {'num_as': 2, 'inter_as': [(0, 0, 'transit')]},
+])
+def test_invalid_parameters(params):
+    with pytest.raises(ValueError):
+        plan_topology(**params)
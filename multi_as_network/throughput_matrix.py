@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Host-to-Host Throughput Matrix
+
+Measures forwarding capacity between every ordered pair of hosts (pc1..pc4,
+tv_server) with the bundled blaster and sink from traffic.py: per pair
+throughput, loss (UDP) or retransmits (TCP), and RTT under load. All pairs
+run at the same time by default, which shows shared bottlenecks such as
+the r2-r4 and r6-r7 transit links; --pairwise measures each pair alone.
+
+Commands go through the node execution service that run.py starts, so run
+it as root while the network is up:
+    sudo python3 throughput_matrix.py --rate 50M --duration 10
+    sudo python3 throughput_matrix.py --tcp --pairwise --png matrix.png
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import node_exec
+from topology_spec import TopologySpec
+from traffic import BLAST_PORT
+from multicast_sender import parse_rate
+
+TRAFFIC = Path(__file__).resolve().with_name('traffic.py')
+SHADES = ' ░▒▓█'
+
+
+def start_sinks(hosts, port):
+    """Start a sink on every host, returns host -> PID"""
+    commands = [(host, f'python3 {TRAFFIC} sink --port {port} --out /tmp/sink-{host}.json '
+                       f'> /dev/null 2>&1 & echo $!') for host in hosts]
+    results = node_exec.run_many(commands)
+    return {host: output.strip() for (host, _), (_, output, _) in zip(commands, results)}
+
+
+def stop_sinks(pids):
+    """Stop the sinks and return host -> [per-source results]"""
+    node_exec.run_many([(host, f'kill {pid}; wait {pid}') for host, pid in pids.items()])
+    results = {}
+    for host in pids:
+        try:
+            with open(f'/tmp/sink-{host}.json') as f:
+                results[host] = json.load(f)
+        except (OSError, ValueError):
+            results[host] = []
+    return results
+
+
+def blast_command(dest_ip, port, args, stream_id):
+    if args.tcp:
+        return f'python3 {TRAFFIC} blast {dest_ip} --port {port} --tcp --duration {args.duration:g}'
+    return (f'python3 {TRAFFIC} blast {dest_ip} --port {port} --rate {args.rate:g} '
+            f'--size {args.size} --duration {args.duration:g} --stream-id {stream_id}')
+
+
+def run_blasts(spec, pairs, port, args):
+    """
+    Run blasters for (src, dst) pairs concurrently; a host with several
+    destinations runs them as background jobs of one shell command.
+    Returns (src, dst) -> blaster result.
+    """
+    by_src = {}
+    for n, (src, dst) in enumerate(pairs):
+        by_src.setdefault(src, []).append(
+            blast_command(spec.primary_ip(dst), port, args, n + 1))
+    commands = [(src, ' & '.join(cmds) + ' & wait') for src, cmds in by_src.items()]
+    outputs = node_exec.run_many(commands, timeout=args.duration + 30)
+
+    by_dest_ip = {spec.primary_ip(host): host for host in spec.hosts}
+    results = {}
+    for (src, _), (_, output, _) in zip(commands, outputs):
+        for line in output.splitlines():
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            results[(src, by_dest_ip.get(result['dest']))] = result
+    return results
+
+
+def combine(spec, pairs, blasts, sinks):
+    """Per-pair throughput, loss and RTT"""
+    host_of = {spec.primary_ip(host): host for host in spec.hosts}
+    proto = None
+    matrix = {}
+    for src, dst in pairs:
+        blast = blasts.get((src, dst))
+        received = next((entry for entry in sinks.get(dst, [])
+                         if host_of.get(entry['source']) == src
+                         and entry['proto'] == (blast or {}).get('proto', entry['proto'])), None)
+        cell = {'src': src, 'dst': dst, 'mbps': None, 'offered_mbps': None,
+                'loss_pct': None, 'retransmits': None, 'rtt_ms': None}
+        if blast:
+            proto = blast['proto']
+            cell['offered_mbps'] = blast['offered_mbps']
+            cell['retransmits'] = blast.get('retransmits')
+            cell['rtt_ms'] = (blast.get('rtt_ms') or {}).get('p50')
+        if blast and received:
+            cell['mbps'] = round(received['bytes'] * 8 / blast['elapsed'] / 1e6, 3)
+            cell['loss_pct'] = received.get('loss_pct')
+        matrix[(src, dst)] = cell
+    return matrix, proto
+
+
+def measure(spec, hosts, args):
+    pairs = [(src, dst) for src in hosts for dst in hosts if src != dst]
+    rounds = [[pair] for pair in pairs] if args.pairwise else [pairs]
+    blasts, sinks = {}, {}
+    for n, round_pairs in enumerate(rounds):
+        port = args.port + (n if args.pairwise else 0)
+        pids = start_sinks(sorted({dst for _, dst in round_pairs}), port)
+        time.sleep(0.5)
+        blasts.update(run_blasts(spec, round_pairs, port, args))
+        for host, entries in stop_sinks(pids).items():
+            sinks.setdefault(host, []).extend(entries)
+    return combine(spec, pairs, blasts, sinks)
+
+
+def print_matrix(hosts, matrix, key, title, fmt, shade=False):
+    values = [cell[key] for cell in matrix.values() if cell[key] is not None]
+    top = max(values) if values else 0
+    width = max(9, max(len(h) for h in hosts) + 1)
+    print(f"\n{title}")
+    print(' ' * width + ''.join(f'{dst:>{width + 2}}' for dst in hosts))
+    for src in hosts:
+        row = f'{src:<{width}}'
+        for dst in hosts:
+            cell = matrix.get((src, dst))
+            value = None if cell is None else cell[key]
+            if src == dst:
+                text = '·'
+            elif value is None:
+                text = '-'
+            else:
+                text = fmt.format(value)
+                if shade:
+                    level = int(round((len(SHADES) - 1) * value / top)) if top else 0
+                    text = SHADES[level] + ' ' + text
+            row += f'{text:>{width + 2}}'
+        print(row)
+
+
+def save_png(hosts, matrix, path, proto):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    data = [[(matrix.get((s, d)) or {}).get('mbps') or 0.0 for d in hosts] for s in hosts]
+    fig, ax = plt.subplots(figsize=(1.2 * len(hosts) + 2, 1.0 * len(hosts) + 1.5))
+    image = ax.imshow(data, cmap='viridis')
+    ax.set_xticks(range(len(hosts)))
+    ax.set_xticklabels(hosts)
+    ax.set_yticks(range(len(hosts)))
+    ax.set_yticklabels(hosts)
+    ax.set_xlabel('destination')
+    ax.set_ylabel('source')
+    for i, src in enumerate(hosts):
+        for j, dst in enumerate(hosts):
+            if src != dst:
+                ax.text(j, i, f'{data[i][j]:.1f}', ha='center', va='center', color='white')
+    fig.colorbar(image, ax=ax, label='Mbit/s')
+    ax.set_title(f'{proto.upper()} throughput matrix')
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput matrix across all host pairs')
+    parser.add_argument('--hosts', nargs='*', default=None,
+                        help='hosts to include (default: all hosts in the spec)')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec (default: topology.json)')
+    parser.add_argument('--tcp', action='store_true',
+                        help='TCP bulk transfer instead of paced UDP')
+    parser.add_argument('--rate', type=parse_rate, default=50e6,
+                        help="UDP rate per pair, e.g. '50M' (default: 50M)")
+    parser.add_argument('--size', type=int, default=1400,
+                        help='UDP datagram size (default: 1400)')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=BLAST_PORT)
+    parser.add_argument('--pairwise', action='store_true',
+                        help='measure one pair at a time instead of all at once')
+    parser.add_argument('--json-out', default=None, help='write per-pair results here')
+    parser.add_argument('--png', default=None, help='also save a heatmap image')
+    args = parser.parse_args()
+
+    spec = TopologySpec.load(args.spec)
+    hosts = args.hosts or list(spec.hosts)
+    mode = 'pairwise' if args.pairwise else 'concurrent'
+    flows = len(hosts) * (len(hosts) - 1)
+    print(f"🚀 {flows} flows ({mode}, {'TCP' if args.tcp else f'UDP {args.rate / 1e6:g} Mbit/s'}), "
+          f"{args.duration:g}s each")
+
+    try:
+        matrix, proto = measure(spec, hosts, args)
+    except (OSError, ConnectionError) as e:
+        print(f"❌ Cannot reach the node execution service: {e} (is run.py running?)")
+        sys.exit(1)
+    proto = proto or ('tcp' if args.tcp else 'udp')
+
+    print_matrix(hosts, matrix, 'mbps', 'Throughput (Mbit/s, rows = source)', '{:.1f}', shade=True)
+    if proto == 'udp':
+        print_matrix(hosts, matrix, 'loss_pct', 'Loss (%)', '{:.2f}')
+    else:
+        print_matrix(hosts, matrix, 'retransmits', 'TCP retransmits', '{:d}')
+    print_matrix(hosts, matrix, 'rtt_ms', 'RTT under load (ms, p50)', '{:.2f}')
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'proto': proto, 'mode': mode, 'duration': args.duration,
+                       'pairs': list(matrix.values())}, f, indent=2)
+    if args.png:
+        save_png(hosts, matrix, args.png, proto)
+        print(f"\n✅ Heatmap saved to {args.png}")
+
+    missing = [cell for cell in matrix.values() if cell['mbps'] is None]
+    if missing:
+        print(f"\n❌ No traffic measured for {len(missing)} pairs")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,10 +17,20 @@ Hosts:
 - PC2 connected to R3
 - PC3 connected to R8
 - PC4 connected to R9
+
+Links are shaped (bandwidth, delay, jitter, loss, queue size) according to
+a profile from link_profiles.json when one is given; see link_profiles.py.
+
+GeneratedTopo builds larger topologies (N ASes x M routers) from parameters
+for scale benchmarks, via topology_spec.plan_topology().
 """
 
 from mininet.topo import Topo
 from mininet.node import Node
+from mininet.link import TCIntf
+
+from link_profiles import LinkProfiles
+from topology_spec import TopologySpec
 
 
 class LinuxRouter(Node):
@@ -59,101 +69,66 @@ class NetworkTopo(Topo):
     - 192.168.2.0/24: PC2 on R3
     - 192.168.3.0/24: PC3 on R8
     - 192.168.4.0/24: PC4 on R9
+    - 10.100.5.0/24: TV Server on R5
+
+    The routers, hosts, links and IP plan are read from topology.json
+    (see topology_spec.py), shared with the visualizer and the editor.
     """
 
-    def build(self):
+    def build(self, spec=None, link_profile=None, profiles=None):
+        """
+        Build routers, hosts and links from a TopologySpec (default:
+        topology.json). `link_profile` names a shaping profile from
+        `profiles` (default: link_profiles.json); without one, links are
+        plain veth pairs.
+        """
+        self.spec = spec if spec is not None else TopologySpec.load()
+        self.link_profile = None
+        if link_profile is not None:
+            profiles = profiles if profiles is not None else LinkProfiles.load()
+            self.link_profile = profiles.resolve(link_profile)
+
         # Create routers
-        # ISP #1 (AS 200) - RIP
-        r1 = self.addNode('r1', cls=LinuxRouter, ip=None)
-        r2 = self.addNode('r2', cls=LinuxRouter, ip=None)
-        r3 = self.addNode('r3', cls=LinuxRouter, ip=None)
-        
-        # Tier 1 (AS 100) - OSPF
-        r4 = self.addNode('r4', cls=LinuxRouter, ip=None)
-        r5 = self.addNode('r5', cls=LinuxRouter, ip=None)
-        r6 = self.addNode('r6', cls=LinuxRouter, ip=None)
-        
-        # ISP #2 (AS 300) - OSPF
-        r7 = self.addNode('r7', cls=LinuxRouter, ip=None)
-        r8 = self.addNode('r8', cls=LinuxRouter, ip=None)
-        r9 = self.addNode('r9', cls=LinuxRouter, ip=None)
-
-        # Create hosts
-        pc1 = self.addHost('pc1', ip='192.168.1.2/24', defaultRoute='via 192.168.1.1')
-        pc2 = self.addHost('pc2', ip='192.168.2.2/24', defaultRoute='via 192.168.2.1')
-        pc3 = self.addHost('pc3', ip='192.168.3.2/24', defaultRoute='via 192.168.3.1')
-        pc4 = self.addHost('pc4', ip='192.168.4.2/24', defaultRoute='via 192.168.4.1')
-        
-        # TV Server for multicast IPTV service (connected to R5 in Tier 1)
-        tv_server = self.addHost('tv_server', ip='10.100.5.10/24', defaultRoute='via 10.100.5.1')
-
-        # ISP #1 internal links (RIP)
-        # R1 - R2: 10.0.1.0/24
-        self.addLink(r1, r2,
-                     intfName1='r1-eth0', params1={'ip': '10.0.1.1/24'},
-                     intfName2='r2-eth0', params2={'ip': '10.0.1.2/24'})
-        
-        # R2 - R3: 10.0.2.0/24
-        self.addLink(r2, r3,
-                     intfName1='r2-eth1', params1={'ip': '10.0.2.1/24'},
-                     intfName2='r3-eth0', params2={'ip': '10.0.2.2/24'})
-
-        # Tier 1 internal links (OSPF)
-        # R4 - R5: 10.0.4.0/24
-        self.addLink(r4, r5,
-                     intfName1='r4-eth0', params1={'ip': '10.0.4.1/24'},
-                     intfName2='r5-eth0', params2={'ip': '10.0.4.2/24'})
-        
-        # R5 - R6: 10.0.5.0/24
-        self.addLink(r5, r6,
-                     intfName1='r5-eth1', params1={'ip': '10.0.5.1/24'},
-                     intfName2='r6-eth0', params2={'ip': '10.0.5.2/24'})
-
-        # ISP #2 internal links (OSPF)
-        # R7 - R8: 10.0.7.0/24
-        self.addLink(r7, r8,
-                     intfName1='r7-eth0', params1={'ip': '10.0.7.1/24'},
-                     intfName2='r8-eth0', params2={'ip': '10.0.7.2/24'})
-        
-        # R7 - R9: 10.0.8.0/24
-        self.addLink(r7, r9,
-                     intfName1='r7-eth1', params1={'ip': '10.0.8.1/24'},
-                     intfName2='r9-eth0', params2={'ip': '10.0.8.2/24'})
-
-        # BGP links
-        # R2 - R4 (ISP#1 to Tier1): 10.0.3.0/24
-        self.addLink(r2, r4,
-                     intfName1='r2-eth2', params1={'ip': '10.0.3.1/24'},
-                     intfName2='r4-eth1', params2={'ip': '10.0.3.2/24'})
-        
-        # R6 - R7 (Tier1 to ISP#2): 10.0.6.0/24
-        self.addLink(r6, r7,
-                     intfName1='r6-eth1', params1={'ip': '10.0.6.1/24'},
-                     intfName2='r7-eth2', params2={'ip': '10.0.6.2/24'})
-
-        # Peering link
-        # R2 - R7 (ISP#1 to ISP#2 peering): 10.0.9.0/24
-        self.addLink(r2, r7,
-                     intfName1='r2-eth3', params1={'ip': '10.0.9.1/24'},
-                     intfName2='r7-eth3', params2={'ip': '10.0.9.2/24'})
-
-        # Host links
-        # PC1 - R1: 192.168.1.0/24
-        self.addLink(pc1, r1,
-                     intfName2='r1-eth1', params2={'ip': '192.168.1.1/24'})
-        
-        # PC2 - R3: 192.168.2.0/24
-        self.addLink(pc2, r3,
-                     intfName2='r3-eth1', params2={'ip': '192.168.2.1/24'})
-        
-        # PC3 - R8: 192.168.3.0/24
-        self.addLink(pc3, r8,
-                     intfName2='r8-eth1', params2={'ip': '192.168.3.1/24'})
-        
-        # PC4 - R9: 192.168.4.0/24
-        self.addLink(pc4, r9,
-                     intfName2='r9-eth1', params2={'ip': '192.168.4.1/24'})
-        
-        # TV Server - R5: 10.100.5.0/24 (for multicast IPTV)
-        self.addLink(tv_server, r5,
-                     intfName2='r5-eth2', params2={'ip': '10.100.5.1/24'})
+        for router in self.spec.routers:
+            self.addNode(router, cls=LinuxRouter, ip=None)
+
+        # Create hosts (PCs and the TV server)
+        for host, host_data in self.spec.hosts.items():
+            self.addHost(host, ip=host_data['ip'],
+                         defaultRoute=f"via {host_data['gateway']}")
+
+        # Create links
+        for link in self.spec.links:
+            shaping = {}
+            if self.link_profile is not None:
+                shaping = profiles.params(self.link_profile, link)
+            opts = {'intf': TCIntf} if shaping else {}
+            if link['type'] == 'Host':
+                # The host side is addressed by addHost()
+                self.addLink(link['src'], link['dst'],
+                             intfName1=link.get('src_intf'), params1=dict(shaping),
+                             intfName2=link['dst_intf'],
+                             params2={'ip': link['dst_ip'], **shaping}, **opts)
+            else:
+                self.addLink(link['src'], link['dst'],
+                             intfName1=link['src_intf'],
+                             params1={'ip': link['src_ip'], **shaping},
+                             intfName2=link['dst_intf'],
+                             params2={'ip': link['dst_ip'], **shaping}, **opts)
+
+
+class GeneratedTopo(NetworkTopo):
+    """
+    Parametric Multi-AS Topology
+
+    Builds N ASes with M routers each from plan_topology() instead of hand
+    numbering, e.g. for scale benchmarks:
+
+        GeneratedTopo(num_as=10, routers_per_as=20, igp=['ospf', 'rip'] * 5)
+
+    The generated spec is kept in `self.spec`.
+    """
+
+    def build(self, link_profile=None, **params):
+        super(GeneratedTopo, self).build(spec=TopologySpec.generate(**params),
+                                         link_profile=link_profile)
@@ -7,9 +7,21 @@ A native GUI tool to visualize and edit the Mininet network topology
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import json
+import os
 import re
+import shutil
 from pathlib import Path
 import subprocess
+import threading
+import time
+
+from topology_spec import TopologySpec
+from topology_layout import get_layout
+import frr_apply
+import link_profiles
+
+# Refresh expands the whole tree up to this many nodes
+EXPAND_ALL_NODES = 100
 
 
 class TopologyEditor:
@@ -20,6 +32,14 @@ class TopologyEditor:
         
         # Data structures
         self.topology_data = self.load_topology()
+        self.tree_loaded = set()  # tree items whose children are inserted
+        self.loaded_config = None
+        # Diagram window (showing spec digest viz_digest), running job
+        # (a cancel Event) and the last finished figure
+        self.viz_window = None
+        self.viz_digest = None
+        self.viz_job = None
+        self.viz_cache = {}
         
         # Create UI
         self.create_ui()
@@ -54,7 +74,7 @@ class TopologyEditor:
         toolbar = ttk.Frame(parent)
         toolbar.pack(fill=tk.X, padx=5, pady=5)
         
-        ttk.Button(toolbar, text="Refresh", command=self.refresh_topology_view).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Refresh", command=self.reload_topology).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Visualize", command=self.visualize_topology).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Export", command=self.export_topology).pack(side=tk.LEFT, padx=2)
         
@@ -80,6 +100,7 @@ class TopologyEditor:
         
         # Bind selection event
         self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.tree.bind('<<TreeviewOpen>>', self.on_tree_open)
         
         # Configure columns
         self.tree['columns'] = ('value', 'type')
@@ -135,7 +156,7 @@ class TopologyEditor:
         ttk.Label(selector_frame, text="Router:").pack(side=tk.LEFT, padx=5)
         self.router_var = tk.StringVar()
         self.router_combo = ttk.Combobox(selector_frame, textvariable=self.router_var,
-                                         values=['r1', 'r2', 'r3', 'r4', 'r5', 'r6', 'r7', 'r8', 'r9'],
+                                         values=list(self.spec.routers),
                                          state='readonly')
         self.router_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         self.router_combo.bind('<<ComboboxSelected>>', self.load_router_config)
@@ -156,6 +177,7 @@ class TopologyEditor:
         ttk.Button(toolbar, text="Save", command=self.save_config).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Reload", command=self.load_router_config).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Validate", command=self.validate_config).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Apply", command=self.apply_config).pack(side=tk.LEFT, padx=2)
         
         # Config editor
         editor_frame = ttk.Frame(parent)
@@ -238,23 +260,27 @@ Routing Protocols:
         text_widget.config(state=tk.DISABLED)
     
     def load_topology(self):
-        """Load topology data from topology.py and config files"""
+        """Load topology data from the shared topology spec (topology.json)"""
+        self.spec = TopologySpec.load()
+        try:
+            self.link_profiles = link_profiles.LinkProfiles.load()
+        except (OSError, ValueError):
+            self.link_profiles = None
+        
         topology = {
             'routers': {},
-            'hosts': {},
-            'links': [],
+            'hosts': self.spec.hosts,
+            'links': self.spec.links,
             'as_info': {
-                'AS 100': {'routers': ['r4', 'r5', 'r6'], 'igp': 'OSPF'},
-                'AS 200': {'routers': ['r1', 'r2', 'r3'], 'igp': 'RIP'},
-                'AS 300': {'routers': ['r7', 'r8', 'r9'], 'igp': 'OSPF'}
+                as_name: {'routers': as_data['routers'], 'igp': as_data['igp']}
+                for as_name, as_data in self.spec.as_info.items()
             }
         }
         
         # Define routers
-        routers = ['r1', 'r2', 'r3', 'r4', 'r5', 'r6', 'r7', 'r8', 'r9']
-        for router in routers:
+        for router in self.spec.routers:
             topology['routers'][router] = {
-                'interfaces': [],
+                'interfaces': [entry['intf'] for entry in self.spec.interfaces(router)],
                 'config_files': {
                     'frr.conf': f'{router}/frr.conf',
                     'daemons': f'{router}/daemons',
@@ -262,95 +288,133 @@ Routing Protocols:
                 }
             }
         
-        # Define hosts
-        hosts = {
-            'pc1': {'ip': '192.168.1.2/24', 'gateway': '192.168.1.1', 'router': 'r1'},
-            'pc2': {'ip': '192.168.2.2/24', 'gateway': '192.168.2.1', 'router': 'r3'},
-            'pc3': {'ip': '192.168.3.2/24', 'gateway': '192.168.3.1', 'router': 'r8'},
-            'pc4': {'ip': '192.168.4.2/24', 'gateway': '192.168.4.1', 'router': 'r9'}
-        }
-        topology['hosts'] = hosts
-        
-        # Define links
-        links = [
-            {'src': 'r1', 'dst': 'r2', 'src_ip': '10.0.1.1/24', 'dst_ip': '10.0.1.2/24', 'type': 'RIP'},
-            {'src': 'r2', 'dst': 'r3', 'src_ip': '10.0.2.1/24', 'dst_ip': '10.0.2.2/24', 'type': 'RIP'},
-            {'src': 'r2', 'dst': 'r4', 'src_ip': '10.0.3.1/24', 'dst_ip': '10.0.3.2/24', 'type': 'BGP'},
-            {'src': 'r4', 'dst': 'r5', 'src_ip': '10.0.4.1/24', 'dst_ip': '10.0.4.2/24', 'type': 'OSPF'},
-            {'src': 'r5', 'dst': 'r6', 'src_ip': '10.0.5.1/24', 'dst_ip': '10.0.5.2/24', 'type': 'OSPF'},
-            {'src': 'r6', 'dst': 'r7', 'src_ip': '10.0.6.1/24', 'dst_ip': '10.0.6.2/24', 'type': 'BGP'},
-            {'src': 'r7', 'dst': 'r8', 'src_ip': '10.0.7.1/24', 'dst_ip': '10.0.7.2/24', 'type': 'OSPF'},
-            {'src': 'r7', 'dst': 'r9', 'src_ip': '10.0.8.1/24', 'dst_ip': '10.0.8.2/24', 'type': 'OSPF'},
-            {'src': 'r2', 'dst': 'r7', 'src_ip': '10.0.9.1/24', 'dst_ip': '10.0.9.2/24', 'type': 'Peering'},
-            {'src': 'pc1', 'dst': 'r1', 'src_ip': '192.168.1.2/24', 'dst_ip': '192.168.1.1/24', 'type': 'Host'},
-            {'src': 'pc2', 'dst': 'r3', 'src_ip': '192.168.2.2/24', 'dst_ip': '192.168.2.1/24', 'type': 'Host'},
-            {'src': 'pc3', 'dst': 'r8', 'src_ip': '192.168.3.2/24', 'dst_ip': '192.168.3.1/24', 'type': 'Host'},
-            {'src': 'pc4', 'dst': 'r9', 'src_ip': '192.168.4.2/24', 'dst_ip': '192.168.4.1/24', 'type': 'Host'}
-        ]
-        topology['links'] = links
-        
         return topology
     
+    def reload_topology(self):
+        """Re-read topology.json and update the tree items that changed"""
+        try:
+            self.topology_data = self.load_topology()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to load topology: {e}")
+            return
+        self.refresh_topology_view()
+    
     def refresh_topology_view(self):
-        """Refresh the topology tree view"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Add AS sections
-        for as_name, as_data in self.topology_data['as_info'].items():
-            as_node = self.tree.insert('', 'end', text=as_name, 
-                                       values=(as_data['igp'], 'AS'),
-                                       tags=('as',))
+        """
+        Sync the topology tree view. Children are inserted only when an item
+        is first expanded, and items already shown are updated in place, so
+        a refresh only touches rows that changed. Small topologies are fully
+        expanded as before.
+        """
+        self.sync_tree()
+        if len(self.spec.nodes()) <= EXPAND_ALL_NODES:
+            self.expand_all(self.tree)
+    
+    def tree_rows(self, item):
+        """
+        Rows (iid, text, values, tags, expandable) under a tree item. Item
+        ids follow the topology ('as:AS 100', 'router:r1', 'intfs:r1',
+        'intf:r1:0', 'hosts', 'host:pc1'), so a refresh can match them.
+        """
+        hosts = self.topology_data['hosts']
+        kind, _, name = item.partition(':')
+        if item == '':
+            rows = [(f'as:{as_name}', as_name, (as_data['igp'], 'AS'), ('as',),
+                     bool(as_data['routers']))
+                    for as_name, as_data in self.topology_data['as_info'].items()]
+            rows.append(('hosts', 'Hosts', (f"{len(hosts)} hosts", 'Group'), ('hosts',),
+                         bool(hosts)))
+            return rows
+        if kind == 'as':
+            return [(f'router:{router}', router, ('Router', 'Device'), ('router',),
+                     bool(self.spec.interfaces(router)))
+                    for router in self.topology_data['as_info'][name]['routers']]
+        if kind == 'router':
+            # Interfaces come from the spec's per-node index
+            interfaces = self.spec.interfaces(name)
+            if not interfaces:
+                return []
+            return [(f'intfs:{name}', 'Interfaces', (f'{len(interfaces)} links', 'Group'),
+                     (), True)]
+        if kind == 'intfs':
+            return [(f'intf:{name}:{index}', f"to {entry['peer']}",
+                     (entry['ip'], entry['type']), (), False)
+                    for index, entry in enumerate(self.spec.interfaces(name))]
+        if kind == 'hosts':
+            return [(f'host:{host}', host, (data['ip'], 'Host'), ('host',), True)
+                    for host, data in hosts.items()]
+        if kind == 'host':
+            data = hosts[name]
+            return [(f'gateway:{name}', 'Gateway', (data['gateway'], 'Config'), (), False),
+                    (f'host-router:{name}', 'Router', (data['router'], 'Config'), (), False)]
+        return []
+    
+    def sync_tree(self, parent=''):
+        """Make a populated item's children match tree_rows(), recursing into populated ones"""
+        rows = self.tree_rows(parent)
+        wanted = {row[0] for row in rows}
+        for child in self.tree.get_children(parent):
+            if child not in wanted:
+                self.tree.delete(child)
+        
+        for index, (iid, text, values, tags, expandable) in enumerate(rows):
+            values = tuple(str(value) for value in values)
+            if not self.tree.exists(iid):
+                self.tree.insert(parent, index, iid=iid, text=text, values=values, tags=tags)
+                self.tree_loaded.discard(iid)
+            else:
+                current = self.tree.item(iid)
+                if (current['text'] != text
+                        or tuple(str(value) for value in current['values']) != values):
+                    self.tree.item(iid, text=text, values=values, tags=tags)
+                if self.tree.parent(iid) != parent or self.tree.index(iid) != index:
+                    self.tree.move(iid, parent, index)
             
-            # Add routers in this AS
-            for router in as_data['routers']:
-                router_node = self.tree.insert(as_node, 'end', text=router,
-                                              values=('Router', 'Device'),
-                                              tags=('router',))
-                
-                # Add interfaces
-                interfaces = [link for link in self.topology_data['links'] 
-                            if link['src'] == router or link['dst'] == router]
-                
-                if interfaces:
-                    intf_node = self.tree.insert(router_node, 'end', text='Interfaces',
-                                                values=(f'{len(interfaces)} links', 'Group'))
-                    for link in interfaces:
-                        if link['src'] == router:
-                            link_text = f"to {link['dst']}"
-                            link_ip = link['src_ip']
-                        else:
-                            link_text = f"to {link['src']}"
-                            link_ip = link['dst_ip']
-                        
-                        self.tree.insert(intf_node, 'end', text=link_text,
-                                       values=(link_ip, link['type']))
-        
-        # Add hosts section
-        hosts_node = self.tree.insert('', 'end', text='Hosts',
-                                     values=(f"{len(self.topology_data['hosts'])} hosts", 'Group'),
-                                     tags=('hosts',))
-        
-        for host_name, host_data in self.topology_data['hosts'].items():
-            host_node = self.tree.insert(hosts_node, 'end', text=host_name,
-                                        values=(host_data['ip'], 'Host'),
-                                        tags=('host',))
-            self.tree.insert(host_node, 'end', text='Gateway',
-                           values=(host_data['gateway'], 'Config'))
-            self.tree.insert(host_node, 'end', text='Router',
-                           values=(host_data['router'], 'Config'))
-        
-        # Expand all
-        self.expand_all(self.tree)
+            if iid in self.tree_loaded:
+                self.sync_tree(iid)
+            else:
+                # Unpopulated items only carry a placeholder so they can be opened
+                placeholder = f'{iid}#placeholder'
+                if expandable and not self.tree.exists(placeholder):
+                    self.tree.insert(iid, 'end', iid=placeholder, text='Loading...')
+                elif not expandable and self.tree.exists(placeholder):
+                    self.tree.delete(placeholder)
+    
+    def populate_tree_item(self, item):
+        """Replace an item's placeholder with its children"""
+        placeholder = f'{item}#placeholder'
+        if self.tree.exists(placeholder):
+            self.tree.delete(placeholder)
+        self.tree_loaded.add(item)
+        self.sync_tree(item)
+    
+    def on_tree_open(self, event):
+        """Populate an item the first time it is expanded"""
+        item = self.tree.focus()
+        if item and item not in self.tree_loaded:
+            self.populate_tree_item(item)
     
     def expand_all(self, tree, item=''):
         """Expand all tree items"""
         children = tree.get_children(item)
         for child in children:
-            tree.item(child, open=True)
+            if tree.exists(f'{child}#placeholder'):
+                self.populate_tree_item(child)
+            if not tree.item(child, 'open'):
+                tree.item(child, open=True)
             self.expand_all(tree, child)
     
+    def link_shaping(self, link):
+        """Shaping of a link under the active (or default) link profile"""
+        if self.link_profiles is None:
+            return 'no link_profiles.json'
+        try:
+            name = self.link_profiles.resolve(link_profiles.active_profile())
+        except ValueError:
+            name = self.link_profiles.resolve()
+        params = self.link_profiles.params(name, link)
+        return f"{link_profiles.describe(params)} (profile {name})"
+
     def on_tree_select(self, event):
         """Handle tree selection event"""
         selection = self.tree.selection()
@@ -358,6 +422,8 @@ Routing Protocols:
             return
         
         item = selection[0]
+        if item.endswith('#placeholder'):
+            return
         item_text = self.tree.item(item, 'text')
         item_values = self.tree.item(item, 'values')
         
@@ -378,8 +444,7 @@ Routing Protocols:
                 details += f"  • {config_type}: {config_path}\n"
             
             # Show links
-            links = [link for link in self.topology_data['links'] 
-                    if link['src'] == item_text or link['dst'] == item_text]
+            links = [entry['link'] for entry in self.spec.interfaces(item_text)]
             if links:
                 details += f"\n{'='*60}\n"
                 details += f"Connected Links:\n"
@@ -389,6 +454,22 @@ Routing Protocols:
                         details += f"  • {item_text} ({link['src_ip']}) → {link['dst']} ({link['dst_ip']}) [{link['type']}]\n"
                     else:
                         details += f"  • {link['src']} ({link['src_ip']}) → {item_text} ({link['dst_ip']}) [{link['type']}]\n"
+                    details += f"      shaping: {self.link_shaping(link)}\n"
+
+        # If it's an interface, show the link and its shaping
+        if item.startswith('intf:'):
+            router, _, index = item[len('intf:'):].rpartition(':')
+            interfaces = self.spec.interfaces(router)
+            entry = interfaces[int(index)] if int(index) < len(interfaces) else None
+            if entry:
+                link = entry['link']
+                details += f"\n{'='*60}\n"
+                details += f"Link Details:\n"
+                details += f"{'='*60}\n"
+                details += f"  Local:    {router} {entry['intf']} ({entry['ip']})\n"
+                details += f"  Peer:     {entry['peer']} {entry['peer_intf']} ({entry['peer_ip']})\n"
+                details += f"  Class:    {link_profiles.link_class(link)}\n"
+                details += f"  Shaping:  {self.link_shaping(link)}\n"
         
         self.details_text.delete('1.0', tk.END)
         self.details_text.insert('1.0', details)
@@ -410,6 +491,7 @@ Routing Protocols:
                 
                 self.config_editor.delete('1.0', tk.END)
                 self.config_editor.insert('1.0', content)
+                self.loaded_config = content
                 self.config_status.config(text=f"Loaded: {config_path}")
             else:
                 self.config_status.config(text=f"File not found: {config_path}")
@@ -417,6 +499,24 @@ Routing Protocols:
             messagebox.showerror("Error", f"Failed to load config: {str(e)}")
             self.config_status.config(text=f"Error loading file")
     
+    def write_config(self, router, config_type, content):
+        """
+        Save a router config without any dialog, keeping the previous
+        version as <file>.bak. Returns (path, error) with error None on success.
+        """
+        config_path = Path(f"{router}/{config_type}")
+        try:
+            if config_path.exists():
+                shutil.copy2(config_path, config_path.with_suffix(config_path.suffix + '.bak'))
+            tmp_path = config_path.with_suffix(config_path.suffix + '.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write(content)
+            os.replace(tmp_path, config_path)
+        except OSError as e:
+            return config_path, str(e)
+        self.loaded_config = content
+        return config_path, None
+    
     def save_config(self):
         """Save router configuration file"""
         router = self.router_var.get()
@@ -426,24 +526,74 @@ Routing Protocols:
             messagebox.showwarning("Warning", "Please select a router first")
             return
         
-        config_path = Path(f"{router}/{config_type}")
+        content = self.config_editor.get('1.0', tk.END)
+        config_path, error = self.write_config(router, config_type, content)
+        if error:
+            messagebox.showerror("Error", f"Failed to save config: {error}")
+            self.config_status.config(text=f"Error saving file")
+            return
+        self.config_status.config(text=f"Saved: {config_path}")
+        messagebox.showinfo("Success", f"Configuration saved to {config_path}")
+    
+    def apply_config(self):
+        """Push the edited frr.conf to the running router without restarting FRR"""
+        router = self.router_var.get()
+        config_type = self.config_type_var.get()
         
-        try:
-            content = self.config_editor.get('1.0', tk.END)
-            
-            # Backup original file
-            if config_path.exists():
-                backup_path = config_path.with_suffix(config_path.suffix + '.bak')
-                config_path.rename(backup_path)
-            
-            with open(config_path, 'w') as f:
-                f.write(content)
-            
-            self.config_status.config(text=f"Saved: {config_path}")
-            messagebox.showinfo("Success", f"Configuration saved to {config_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save config: {str(e)}")
+        if not router or config_type != 'frr.conf':
+            messagebox.showinfo("Info", "Apply is only available for frr.conf files")
+            return
+        
+        new_text = self.config_editor.get('1.0', tk.END)
+        removed, added = frr_apply.diff_config(self.loaded_config or '', new_text)
+        if not removed and not added:
+            messagebox.showinfo("Apply", "No changes to apply")
+            return
+        
+        if not messagebox.askyesno("Apply",
+                                   f"Push {len(removed)} removed and {len(added)} added "
+                                   f"lines to the running {router}?"):
+            return
+        
+        old_text = self.loaded_config
+        config_path, error = self.write_config(router, config_type, new_text)
+        if error:
+            messagebox.showerror("Error", f"Failed to save config, nothing was pushed: {error}")
             self.config_status.config(text=f"Error saving file")
+            return
+        self.config_status.config(text=f"Saved {config_path}, applying changes to {router}...")
+        
+        def worker():
+            try:
+                result = frr_apply.apply_config(router, new_text, old_text=old_text,
+                                                spec=self.spec)
+            except Exception as e:
+                result = {'router': router, 'error': str(e)}
+            self.root.after(0, self.on_config_applied, result)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def on_config_applied(self, result):
+        """Report the outcome of apply_config (runs on the Tk thread)"""
+        router = result['router']
+        if 'error' in result:
+            messagebox.showerror("Error", f"Failed to apply config: {result['error']}")
+            self.config_status.config(text=f"Error applying to {router}")
+            return
+        
+        if result['returncode'] != 0:
+            messagebox.showerror("Error", f"vtysh reported errors on {router}:\n\n{result['output']}")
+            self.config_status.config(text=f"Error applying to {router}")
+            return
+        
+        summary = (f"Saved {router}/frr.conf and pushed {len(result['commands'])} "
+                   f"commands to {router} in {result['apply_time']:.2f}s")
+        if result['converged']:
+            summary += f", reconverged after {result['converge_time']:.2f}s"
+        elif result['converged'] is False:
+            summary += f", NOT reconverged after {result['converge_time']:.2f}s"
+        self.config_status.config(text=summary)
+        messagebox.showinfo("Apply", summary)
     
     def validate_config(self):
         """Validate FRR configuration"""
@@ -479,247 +629,120 @@ Routing Protocols:
             messagebox.showinfo("Validation", "Configuration looks good!")
     
     def visualize_topology(self):
-        """Create a visual graph of the topology using matplotlib with AS-based clustering"""
+        """
+        Show the topology diagram. Layout and drawing run in a worker thread
+        while the window shows a progress bar and a Cancel button; the
+        finished figure is handed back to the Tk loop. The figure and layout
+        are kept per spec digest, so an unchanged topology opens instantly.
+        """
         try:
-            import matplotlib.pyplot as plt
-            import matplotlib.patches as mpatches
-            import networkx as nx
-            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            import networkx  # noqa: F401
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # noqa: F401
+            import visualize_topology as visualize
         except ImportError:
             messagebox.showerror("Error", 
                                "matplotlib and networkx are required for visualization.\n"
                                "Install with: pip install matplotlib networkx")
             return
         
+        digest = self.spec.digest()
+        if self.viz_window is not None and self.viz_window.winfo_exists():
+            if self.viz_digest == digest:
+                self.viz_window.lift()
+                return
+            self.close_visualization()
+        
         # Create new window
         viz_window = tk.Toplevel(self.root)
         viz_window.title("Network Topology Visualization")
         viz_window.geometry("1400x900")
+        viz_window.protocol("WM_DELETE_WINDOW", self.close_visualization)
+        self.viz_window = viz_window
+        self.viz_digest = digest
         
-        # Create graph
-        G = nx.Graph()
-        
-        # Define IP addresses for each node (primary management IP)
-        node_ips = {
-            # Routers - using their router-id or primary interface
-            'r1': '10.0.1.1',
-            'r2': '10.0.1.2',
-            'r3': '10.0.2.2',
-            'r4': '10.0.3.2',
-            'r5': '10.0.4.2',
-            'r6': '10.0.5.2',
-            'r7': '10.0.6.2',
-            'r8': '10.0.7.2',
-            'r9': '10.0.8.2',
-            # Hosts
-            'pc1': '192.168.1.2',
-            'pc2': '192.168.2.2',
-            'pc3': '192.168.3.2',
-            'pc4': '192.168.4.2'
-        }
-        
-        # Add nodes with IP info
-        for router in self.topology_data['routers']:
-            G.add_node(router, node_type='router', ip=node_ips[router])
-        
-        for host in self.topology_data['hosts']:
-            G.add_node(host, node_type='host', ip=node_ips[host])
-        
-        # Add edges
-        for link in self.topology_data['links']:
-            G.add_edge(link['src'], link['dst'], 
-                      link_type=link['type'],
-                      src_ip=link.get('src_ip', ''),
-                      dst_ip=link.get('dst_ip', ''))
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(16, 10))
-        
-        # Define custom positions based on AS topology (similar to reference image)
-        pos = {
-            # Tier 1 (AS 100) - Top center
-            'r4': (2, 8),
-            'r5': (5, 8),
-            'r6': (8, 8),
-            
-            # ISP #1 (AS 200) - Bottom left
-            'r1': (1, 3),
-            'r2': (3, 4),
-            'r3': (5, 3),
-            'pc1': (1, 1),
-            'pc2': (5, 1),
-            
-            # ISP #2 (AS 300) - Bottom right
-            'r7': (8, 4),
-            'r8': (7, 3),
-            'r9': (9, 3),
-            'pc3': (7, 1),
-            'pc4': (9, 1),
-        }
-        
-        # Define AS boundaries for visual grouping
-        as_boxes = {
-            'Tier 1\n(AS 100)': {
-                'xy': (1.2, 6.8),
-                'width': 7.6,
-                'height': 2.0,
-                'color': '#FFE6E6',
-                'edge_color': '#FF6B6B',
-                'routers': ['r4', 'r5', 'r6'],
-                'igp': 'OSPF',
-                'label_position': 'right'
-            },
-            'ISP #1\n(AS 200)': {
-                'xy': (0.2, 0.2),
-                'width': 5.6,
-                'height': 4.6,
-                'color': '#E6F3FF',
-                'edge_color': '#4A90E2',
-                'routers': ['r1', 'r2', 'r3'],
-                'igp': 'RIP',
-                'label_position': 'left'
-            },
-            'ISP #2\n(AS 300)': {
-                'xy': (6.2, 0.2),
-                'width': 3.6,
-                'height': 4.6,
-                'color': '#E6FFE6',
-                'edge_color': '#4CAF50',
-                'routers': ['r7', 'r8', 'r9'],
-                'igp': 'OSPF',
-                'label_position': 'right'
-            }
-        }
+        if self.viz_cache.get('digest') == digest:
+            self.show_visualization(self.viz_cache['fig'], self.viz_cache['render'])
+            return
         
-        # Draw AS boundary boxes
-        for as_name, box_info in as_boxes.items():
-            rect = mpatches.FancyBboxPatch(
-                box_info['xy'], box_info['width'], box_info['height'],
-                boxstyle="round,pad=0.1",
-                linewidth=2,
-                edgecolor=box_info['edge_color'],
-                facecolor=box_info['color'],
-                alpha=0.3,
-                linestyle='--'
-            )
-            ax.add_patch(rect)
-            
-            # Position label based on label_position
-            if box_info['label_position'] == 'left':
-                label_x = box_info['xy'][0] + box_info['width'] * 0.15
-            else:  # right
-                label_x = box_info['xy'][0] + box_info['width'] * 0.85
-            
-            label_y = box_info['xy'][1] + box_info['height'] * 0.85
-            ax.text(label_x, label_y, as_name,
-                   fontsize=11, fontweight='bold',
-                   color=box_info['edge_color'],
-                   ha='center', va='center',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
-                           edgecolor=box_info['edge_color'], linewidth=1.5))
-            
-            # Add IGP label
-            igp_y = box_info['xy'][1] + box_info['height'] * 0.15
-            ax.text(label_x, igp_y, f"IGP: {box_info['igp']}",
-                   fontsize=9, style='italic',
-                   color=box_info['edge_color'],
-                   ha='center', va='center')
-        
-        # Separate nodes by type
-        routers = [n for n, d in G.nodes(data=True) if d.get('node_type') == 'router']
-        hosts = [n for n, d in G.nodes(data=True) if d.get('node_type') == 'host']
-        
-        # Draw edges with different colors and styles based on type
-        edge_styles = {
-            'RIP': {'color': '#4A90E2', 'width': 2.5, 'style': 'solid', 'alpha': 0.7},
-            'OSPF': {'color': '#4CAF50', 'width': 2.5, 'style': 'solid', 'alpha': 0.7},
-            'BGP': {'color': '#FF6B6B', 'width': 3.5, 'style': 'solid', 'alpha': 0.9},
-            'Peering': {'color': '#9C27B0', 'width': 3.0, 'style': 'dashed', 'alpha': 0.8},
-            'Host': {'color': '#757575', 'width': 2.0, 'style': 'solid', 'alpha': 0.5}
-        }
+        # Progress indicator while the worker runs
+        progress_frame = ttk.Frame(viz_window)
+        progress_frame.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        status = ttk.Label(progress_frame, text="Starting...", font=('Arial', 11))
+        status.pack(pady=5)
+        bar = ttk.Progressbar(progress_frame, mode='indeterminate', length=300)
+        bar.pack(pady=5)
+        bar.start(10)
+        ttk.Button(progress_frame, text="Cancel",
+                   command=self.close_visualization).pack(pady=5)
+        
+        cancelled = threading.Event()
+        self.viz_job = cancelled
+        spec = self.spec
+        
+        def report(text):
+            if not cancelled.is_set():
+                self.root.after(0, lambda: status.winfo_exists() and status.config(text=text))
+        
+        def worker():
+            # Layout computation itself cannot be interrupted; a cancelled
+            # job finishes in the background and its result is only cached
+            try:
+                report(f"Computing layout for {len(spec.nodes())} nodes...")
+                start = time.monotonic()
+                layout, source = get_layout(spec)
+                report(f"Drawing ({source} layout, {time.monotonic() - start:.1f}s)...")
+                fig, render = visualize.build_figure(spec, layout, max_figsize=(14, 8.5))
+                result = {'digest': digest, 'fig': fig, 'render': render, 'layout': layout}
+            except Exception as e:
+                result = {'digest': digest, 'error': str(e)}
+            self.root.after(0, self.on_visualization_ready, cancelled, result)
         
-        for link_type, style in edge_styles.items():
-            edges = [(u, v) for u, v, d in G.edges(data=True) 
-                    if d.get('link_type') == link_type]
-            if edges:
-                nx.draw_networkx_edges(G, pos, edgelist=edges,
-                                      edge_color=style['color'],
-                                      width=style['width'],
-                                      style=style['style'],
-                                      alpha=style['alpha'],
-                                      ax=ax)
-        
-        # Draw router nodes
-        nx.draw_networkx_nodes(G, pos, nodelist=routers, 
-                              node_color='white',
-                              edgecolors='#333333',
-                              linewidths=2.5,
-                              node_size=2500, 
-                              node_shape='s',
-                              ax=ax)
-        
-        # Draw host nodes
-        nx.draw_networkx_nodes(G, pos, nodelist=hosts,
-                              node_color='#B2DFDB',
-                              edgecolors='#00796B',
-                              linewidths=2,
-                              node_size=2000,
-                              node_shape='o',
-                              ax=ax)
-        
-        # Draw node labels with names
-        nx.draw_networkx_labels(G, pos, font_size=11, font_weight='bold',
-                               font_family='sans-serif', ax=ax)
-        
-        # Draw IP addresses below each node
-        ip_labels = {node: node_ips[node] for node in G.nodes()}
-        ip_pos = {node: (x, y - 0.35) for node, (x, y) in pos.items()}
-        
-        for node, (x, y) in ip_pos.items():
-            ax.text(x, y, ip_labels[node],
-                   fontsize=8,
-                   ha='center', va='top',
-                   color='#555555',
-                   bbox=dict(boxstyle='round,pad=0.2', facecolor='white', 
-                            edgecolor='none', alpha=0.8))
-        
-        # Create custom legend
-        legend_elements = [
-            mpatches.Patch(facecolor='white', edgecolor='#333333', linewidth=2, label='Routers'),
-            mpatches.Patch(facecolor='#B2DFDB', edgecolor='#00796B', linewidth=2, label='Hosts'),
-            mpatches.Patch(facecolor='none', edgecolor='#4A90E2', linewidth=2.5, label='RIP'),
-            mpatches.Patch(facecolor='none', edgecolor='#4CAF50', linewidth=2.5, label='OSPF'),
-            mpatches.Patch(facecolor='none', edgecolor='#FF6B6B', linewidth=3.5, label='BGP'),
-            mpatches.Patch(facecolor='none', edgecolor='#9C27B0', linewidth=3, 
-                          linestyle='--', label='Peering'),
-            mpatches.Patch(facecolor='none', edgecolor='#757575', linewidth=2, label='Host Link')
-        ]
-        
-        ax.legend(handles=legend_elements, loc='upper left', fontsize=10,
-                 framealpha=0.9, edgecolor='black')
-        
-        ax.set_title("Multi-AS Network Topology", fontsize=18, fontweight='bold', pad=20)
-        ax.set_xlim(-0.5, 10.5)
-        ax.set_ylim(-0.5, 9.5)
-        ax.axis('off')
-        
-        plt.tight_layout()
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def on_visualization_ready(self, job, result):
+        """Take over the worker's figure (runs on the Tk thread)"""
+        if 'error' not in result:
+            self.viz_cache = result
+        if job is not self.viz_job:
+            return  # cancelled or superseded
+        self.viz_job = None
+        if 'error' in result:
+            self.close_visualization()
+            messagebox.showerror("Error", f"Visualization failed: {result['error']}")
+            return
+        for child in self.viz_window.winfo_children():
+            child.destroy()
+        self.show_visualization(result['fig'], result['render'])
+    
+    def show_visualization(self, fig, render):
+        """Embed a finished figure in the visualization window"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
         
         # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=viz_window)
+        canvas = FigureCanvasTkAgg(fig, master=self.viz_window)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Add toolbar
-        toolbar_frame = ttk.Frame(viz_window)
+        toolbar_frame = ttk.Frame(self.viz_window)
         toolbar_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Button(toolbar_frame, text="Save Image", 
-                  command=lambda: self.save_visualization(fig)).pack(side=tk.LEFT, padx=5)
+                  command=lambda: self.save_visualization(fig, render)).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar_frame, text="Close", 
-                  command=viz_window.destroy).pack(side=tk.RIGHT, padx=5)
+                  command=self.close_visualization).pack(side=tk.RIGHT, padx=5)
+    
+    def close_visualization(self):
+        """Close the visualization window, cancelling a running job"""
+        if self.viz_job is not None:
+            self.viz_job.set()
+            self.viz_job = None
+        if self.viz_window is not None and self.viz_window.winfo_exists():
+            self.viz_window.destroy()
+        self.viz_window = None
+        self.viz_digest = None
     
-    def save_visualization(self, fig):
+    def save_visualization(self, fig, render=None):
         """Save the visualization to a file"""
         from tkinter import filedialog
         
@@ -729,7 +752,8 @@ Routing Protocols:
         )
         
         if filename:
-            fig.savefig(filename, dpi=300, bbox_inches='tight')
+            bbox = render['bbox'] if render else 'tight'
+            fig.savefig(filename, dpi=300, bbox_inches=bbox, facecolor='white')
             messagebox.showinfo("Success", f"Visualization saved to {filename}")
     
     def export_topology(self):
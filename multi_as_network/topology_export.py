@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Streaming Topology Exporter
+
+Writes the topology straight from the spec to SVG, Graphviz DOT or GraphML,
+one element per write and without building a matplotlib figure, so even
+diagrams with thousands of nodes are on disk in about a second with memory
+bounded by the spec itself. The files open in browsers and vector editors
+(SVG), Graphviz/xdot (DOT) or Gephi/yEd/Cytoscape (GraphML).
+
+Node positions come from the spec layout or the cached automatic layout
+(topology_layout.py); DOT and GraphML carry them as attributes so viewers
+can keep the same picture.
+
+Usage:
+    python3 topology_export.py big.svg --spec big.json
+    python3 topology_export.py big.dot --spec big.json
+    python3 topology_export.py big.graphml --spec big.json
+"""
+
+import argparse
+import os
+import sys
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+from topology_layout import get_layout
+from topology_spec import TopologySpec
+
+FORMATS = ('svg', 'dot', 'graphml')
+
+# Same styles as visualize_topology.py (not imported: it loads matplotlib)
+LINK_STYLES = {
+    'RIP': {'color': '#4A90E2', 'width': 2.5, 'alpha': 0.7},
+    'OSPF': {'color': '#4CAF50', 'width': 2.5, 'alpha': 0.7},
+    'BGP': {'color': '#FF6B6B', 'width': 3.5, 'alpha': 0.9},
+    'Peering': {'color': '#9C27B0', 'width': 3.0, 'alpha': 0.8},
+    'Host': {'color': '#757575', 'width': 2.0, 'alpha': 0.5},
+}
+PIXELS_PER_UNIT = 40
+# SVG: leave out IP labels above this many nodes
+LABEL_THRESHOLD = 2000
+
+
+def _addr(ip):
+    return (ip or '').split('/')[0]
+
+
+def _extent(layout):
+    pos = layout['pos']
+    boxes = layout.get('as_boxes', {})
+    xs = [p[0] for p in pos.values()] + [b['xy'][0] for b in boxes.values()]
+    xs += [b['xy'][0] + b['width'] for b in boxes.values()]
+    ys = [p[1] for p in pos.values()] + [b['xy'][1] for b in boxes.values()]
+    ys += [b['xy'][1] + b['height'] for b in boxes.values()]
+    return min(xs) - 1.5, max(xs) + 1.5, min(ys) - 1.5, max(ys) + 1.5
+
+
+def write_svg(spec, layout, f, labels=None):
+    """SVG with AS boxes, links, nodes and labels as separate layers"""
+    pos = layout['pos']
+    x0, x1, y0, y1 = _extent(layout)
+    scale = PIXELS_PER_UNIT
+
+    def px(x, y):
+        # SVG y grows downwards
+        return round((x - x0) * scale, 1), round((y1 - y) * scale, 1)
+
+    width, height = round((x1 - x0) * scale), round((y1 - y0) * scale)
+    if labels is None:
+        labels = len(pos) <= LABEL_THRESHOLD
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" font-family="sans-serif">\n')
+    f.write('<style>\n')
+    for link_type, style in LINK_STYLES.items():
+        dash = ' stroke-dasharray: 8 5;' if link_type == 'Peering' else ''
+        f.write(f".l-{link_type} {{ stroke: {style['color']}; stroke-width: {style['width']}; "
+                f"opacity: {style['alpha']};{dash} }}\n")
+    f.write('.router { fill: white; stroke: #333333; stroke-width: 2; }\n'
+            '.host { fill: #B2DFDB; stroke: #00796B; stroke-width: 2; }\n'
+            '.name { font-size: 11px; font-weight: bold; text-anchor: middle; '
+            'dominant-baseline: central; }\n'
+            '.ip { font-size: 8px; fill: #555555; text-anchor: middle; }\n'
+            '.as { font-size: 13px; font-weight: bold; }\n'
+            '</style>\n')
+    f.write('<rect width="100%" height="100%" fill="white"/>\n')
+    f.write(f'<text x="{width / 2}" y="24" text-anchor="middle" font-size="20" '
+            f'font-weight="bold">{escape(spec.name)}</text>\n')
+
+    f.write('<g id="as-boxes">\n')
+    for as_name, box in layout.get('as_boxes', {}).items():
+        x, y = px(box['xy'][0], box['xy'][1] + box['height'])
+        label = escape(spec.as_label(as_name).replace('\n', ' '))
+        igp = escape(spec.as_info[as_name].get('igp', ''))
+        f.write(f'<rect x="{x}" y="{y}" width="{round(box["width"] * scale, 1)}" '
+                f'height="{round(box["height"] * scale, 1)}" rx="8" fill="{box["color"]}" '
+                f'fill-opacity="0.3" stroke="{box["edge_color"]}" stroke-width="2" '
+                f'stroke-dasharray="6 4"/>\n')
+        f.write(f'<text class="as" x="{x + 8}" y="{y + 18}" fill="{box["edge_color"]}">'
+                f'{label} - IGP: {igp}</text>\n')
+    f.write('</g>\n<g id="links">\n')
+    for link in spec.links:
+        (ax, ay), (bx, by) = px(*pos[link['src']]), px(*pos[link['dst']])
+        link_type = link['type'] if link['type'] in LINK_STYLES else 'Host'
+        f.write(f'<line class="l-{link_type}" x1="{ax}" y1="{ay}" x2="{bx}" y2="{by}">'
+                f'<title>{escape(link["src"])} {escape(_addr(link.get("src_ip")))} - '
+                f'{escape(link["dst"])} {escape(_addr(link.get("dst_ip")))} '
+                f'[{escape(link["type"])}]</title></line>\n')
+    f.write('</g>\n<g id="nodes">\n')
+    for node in spec.nodes():
+        x, y = px(*pos[node])
+        title = f'<title>{escape(node)} {escape(spec.primary_ip(node))}</title>'
+        if spec.is_router(node):
+            f.write(f'<rect class="router" x="{x - 14}" y="{y - 14}" width="28" height="28">'
+                    f'{title}</rect>\n')
+        else:
+            f.write(f'<circle class="host" cx="{x}" cy="{y}" r="13">{title}</circle>\n')
+    f.write('</g>\n<g id="labels">\n')
+    for node in spec.nodes():
+        x, y = px(*pos[node])
+        f.write(f'<text class="name" x="{x}" y="{y}">{escape(node)}</text>\n')
+        if labels:
+            f.write(f'<text class="ip" x="{x}" y="{y + 24}">'
+                    f'{escape(spec.primary_ip(node))}</text>\n')
+    f.write('</g>\n</svg>\n')
+
+
+def _dot_id(value):
+    # Backslashes are kept: \n in a label is a DOT line break
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+def write_dot(spec, layout, f):
+    """Graphviz DOT with one cluster per AS; positions in points for neato -n"""
+    pos = layout['pos']
+    boxes = layout.get('as_boxes', {})
+    scale = 72 * PIXELS_PER_UNIT / 96
+    hosts_of = {}
+    for host, data in spec.hosts.items():
+        hosts_of.setdefault(data.get('router'), []).append(host)
+
+    def write_node(node, indent):
+        x, y = pos[node]
+        if spec.is_router(node):
+            shape = 'shape=box, fillcolor="white"'
+        else:
+            shape = 'shape=ellipse, fillcolor="#B2DFDB"'
+        label = f'{node}\\n{spec.primary_ip(node)}'
+        f.write(f'{indent}{_dot_id(node)} [{shape}, label={_dot_id(label)}, '
+                f'pos="{x * scale:.1f},{y * scale:.1f}"];\n')
+
+    f.write(f'graph {_dot_id(spec.name)} {{\n')
+    f.write('  graph [overlap=false, splines=false];\n')
+    f.write('  node [style=filled, fontname="sans-serif", fontsize=10];\n')
+    clustered = set()
+    for as_name, routers in spec.routers_by_as.items():
+        box = boxes.get(as_name, {})
+        f.write(f'  subgraph {_dot_id("cluster_" + as_name)} {{\n')
+        f.write(f'    label={_dot_id(spec.as_label(as_name).replace(chr(10), " "))}; '
+                f'style="dashed,filled"; color="{box.get("edge_color", "#999999")}"; '
+                f'fillcolor="{box.get("color", "#F5F5F5")}";\n')
+        for router in routers:
+            write_node(router, '    ')
+            clustered.add(router)
+            for host in hosts_of.get(router, []):
+                write_node(host, '    ')
+                clustered.add(host)
+        f.write('  }\n')
+    for node in spec.nodes():
+        if node not in clustered:
+            write_node(node, '  ')
+    for link in spec.links:
+        style = LINK_STYLES.get(link['type'], LINK_STYLES['Host'])
+        dashed = ', style=dashed' if link['type'] == 'Peering' else ''
+        f.write(f'  {_dot_id(link["src"])} -- {_dot_id(link["dst"])} '
+                f'[color="{style["color"]}", penwidth={style["width"] / 2:g}{dashed}, '
+                f'tooltip={_dot_id(link["type"])}];\n')
+    f.write('}\n')
+
+
+GRAPHML_KEYS = [
+    ('node', 'kind', 'string'), ('node', 'ip', 'string'), ('node', 'as', 'string'),
+    ('node', 'x', 'double'), ('node', 'y', 'double'),
+    ('edge', 'type', 'string'), ('edge', 'src_intf', 'string'), ('edge', 'src_ip', 'string'),
+    ('edge', 'dst_intf', 'string'), ('edge', 'dst_ip', 'string'),
+]
+
+
+def write_graphml(spec, layout, f):
+    """GraphML with node kind/IP/AS/position and link type/interfaces/IPs"""
+    pos = layout['pos']
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    for domain, name, kind in GRAPHML_KEYS:
+        f.write(f'  <key id="{domain[0]}_{name}" for="{domain}" attr.name="{name}" '
+                f'attr.type="{kind}"/>\n')
+    f.write(f'  <graph id={quoteattr(spec.name)} edgedefault="undirected">\n')
+    as_of = dict(spec.as_of)
+    for host, data in spec.hosts.items():
+        as_of.setdefault(host, spec.as_of.get(data.get('router'), ''))
+    for node in spec.nodes():
+        x, y = pos[node]
+        f.write(f'    <node id={quoteattr(node)}>'
+                f'<data key="n_kind">{"router" if spec.is_router(node) else "host"}</data>'
+                f'<data key="n_ip">{escape(spec.primary_ip(node))}</data>'
+                f'<data key="n_as">{escape(as_of.get(node) or "")}</data>'
+                f'<data key="n_x">{x}</data><data key="n_y">{y}</data></node>\n')
+    for index, link in enumerate(spec.links):
+        f.write(f'    <edge id="e{index}" source={quoteattr(link["src"])} '
+                f'target={quoteattr(link["dst"])}>'
+                f'<data key="e_type">{escape(link["type"])}</data>')
+        for key in ('src_intf', 'src_ip', 'dst_intf', 'dst_ip'):
+            if link.get(key):
+                f.write(f'<data key="e_{key}">{escape(link[key])}</data>')
+        f.write('</edge>\n')
+    f.write('  </graph>\n</graphml>\n')
+
+
+def export_format(path, fmt=None):
+    """Export format for an output path; `fmt` overrides the file extension"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r} (use {', '.join(FORMATS)})")
+    return fmt
+
+
+def export(spec, path, fmt=None, layout=None, labels=None):
+    """
+    Write `spec` to `path`; the format defaults to the file extension and
+    the layout to get_layout(spec). Returns the format written.
+    """
+    fmt = export_format(path, fmt)
+    if layout is None:
+        layout, _ = get_layout(spec)
+    with open(path, 'w', encoding='utf-8') as f:
+        if fmt == 'svg':
+            write_svg(spec, layout, f, labels)
+        elif fmt == 'dot':
+            write_dot(spec, layout, f)
+        else:
+            write_graphml(spec, layout, f)
+    return fmt
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the topology to SVG, DOT or GraphML')
+    parser.add_argument('output', help='output file (.svg, .dot or .graphml)')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec (default: topology.json)')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help='output format (default: from the file extension)')
+    parser.add_argument('--labels', choices=['auto', 'on', 'off'], default='auto',
+                        help=f'SVG IP labels (default: auto, off above {LABEL_THRESHOLD} nodes)')
+    args = parser.parse_args()
+
+    spec = TopologySpec.load(args.spec)
+    labels = {'auto': None, 'on': True, 'off': False}[args.labels]
+    try:
+        fmt = export_format(args.output, args.format)
+        start = time.monotonic()
+        layout, source = get_layout(spec)
+        layout_time = time.monotonic() - start
+        start = time.monotonic()
+        export(spec, args.output, fmt, layout, labels)
+        write_time = time.monotonic() - start
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    size = os.path.getsize(args.output)
+    print(f"✅ {len(spec.nodes())} nodes, {len(spec.links)} links written to {args.output} "
+          f"({fmt.upper()}, {size / 1024:.0f} KiB)")
+    print(f"⏱️  layout {layout_time * 1000:.0f} ms ({source}), "
+          f"write {write_time * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+AS-Clustered Topology Layout
+
+Computes node positions and AS boxes for specs without a hand-made layout
+(e.g. generated topologies):
+  1. every AS (its routers plus the hosts attached to them) is laid out on
+     its own with a force-directed placement; large topologies spread the
+     ASes over worker processes
+  2. the clusters are arranged in rows: the AS with the most inter-AS links
+     (the transit provider in the generated topologies) on top, the others
+     below it
+  3. AS boxes are computed from the bounding box of their members
+
+The result has the same shape as the spec's "layout" ({"pos": ...,
+"as_boxes": ...}) and is cached on disk keyed by spec.digest(), so drawing
+an unchanged topology again skips the layout entirely.
+
+Usage:
+    python3 topology_layout.py big.json
+    python3 topology_layout.py big.json --no-cache --workers 8
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from topology_spec import TopologySpec
+
+CACHE_DIR = Path(__file__).with_name('.layout_cache')
+# Bump when the algorithm changes so old cache entries are ignored
+LAYOUT_VERSION = 1
+
+SPACING = 2.0          # distance between neighbouring nodes
+BOX_PADDING = 1.0      # space between members and the AS box
+LABEL_SPACE = 0.8      # extra room at the top and bottom for the AS/IGP labels
+CLUSTER_GAP = 1.5      # space between AS boxes
+# Use worker processes once a topology has this many nodes
+PARALLEL_THRESHOLD = 300
+
+BOX_COLORS = [
+    ('#FFE6E6', '#FF6B6B'), ('#E6F3FF', '#4A90E2'), ('#E6FFE6', '#4CAF50'),
+    ('#FFF4E0', '#FF9800'), ('#F3E5F5', '#9C27B0'), ('#E0F7FA', '#00ACC1'),
+    ('#FBE9E7', '#795548'), ('#ECEFF1', '#607D8B'),
+]
+
+
+def force_layout(nodes, edges, seed=0, iterations=150):
+    """
+    Fruchterman-Reingold placement of one cluster, O(iterations * n^2).
+    Returns node -> (x, y) with neighbours about SPACING apart, centered
+    on the origin.
+    """
+    if not nodes:
+        return {}
+    if len(nodes) == 1:
+        return {nodes[0]: (0.0, 0.0)}
+
+    rng = random.Random(seed)
+    n = len(nodes)
+    # Start on a jittered circle, which untangles chains and rings quickly
+    pos = {}
+    for i, node in enumerate(nodes):
+        angle = 2 * math.pi * i / n
+        pos[node] = [math.cos(angle) + rng.uniform(-0.05, 0.05),
+                     math.sin(angle) + rng.uniform(-0.05, 0.05)]
+    k = 1.0 / math.sqrt(n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        disp = {node: [0.0, 0.0] for node in nodes}
+        for i, a in enumerate(nodes):
+            pa, da = pos[a], disp[a]
+            for b in nodes[i + 1:]:
+                pb = pos[b]
+                dx, dy = pa[0] - pb[0], pa[1] - pb[1]
+                dist2 = max(dx * dx + dy * dy, 1e-6)
+                force = k * k / dist2
+                da[0] += dx * force
+                da[1] += dy * force
+                disp[b][0] -= dx * force
+                disp[b][1] -= dy * force
+        for a, b in edges:
+            pa, pb = pos[a], pos[b]
+            dx, dy = pa[0] - pb[0], pa[1] - pb[1]
+            dist = max(math.sqrt(dx * dx + dy * dy), 1e-3)
+            force = dist / k
+            disp[a][0] -= dx * force
+            disp[a][1] -= dy * force
+            disp[b][0] += dx * force
+            disp[b][1] += dy * force
+        for node in nodes:
+            dx, dy = disp[node]
+            length = max(math.sqrt(dx * dx + dy * dy), 1e-9)
+            step = min(length, temperature)
+            pos[node][0] += dx / length * step
+            pos[node][1] += dy / length * step
+        temperature -= cooling
+
+    # Scale so that the mean edge length is SPACING, center on the origin
+    if edges:
+        mean = sum(math.dist(pos[a], pos[b]) for a, b in edges) / len(edges)
+    else:
+        mean = k
+    scale = SPACING / max(mean, 1e-9)
+    cx = sum(p[0] for p in pos.values()) / n
+    cy = sum(p[1] for p in pos.values()) / n
+    return {node: ((p[0] - cx) * scale, (p[1] - cy) * scale) for node, p in pos.items()}
+
+
+def _layout_cluster(task):
+    name, nodes, edges = task
+    return name, force_layout(nodes, edges, seed=name or '')
+
+
+def clusters(spec):
+    """[(AS name or None, nodes, intra-cluster edges)] - hosts join their router's AS"""
+    cluster_of = dict(spec.as_of)
+    for host, data in spec.hosts.items():
+        cluster_of[host] = spec.as_of.get(data.get('router'))
+    members = {as_name: [] for as_name in spec.as_info}
+    for node in spec.nodes():
+        members.setdefault(cluster_of.get(node), []).append(node)
+    edges = {name: [] for name in members}
+    for link in spec.links:
+        a, b = cluster_of.get(link['src']), cluster_of.get(link['dst'])
+        if a == b:
+            edges[a].append((link['src'], link['dst']))
+    return [(name, nodes, edges[name]) for name, nodes in members.items() if nodes]
+
+
+def _inter_as_degree(spec):
+    degree = {as_name: 0 for as_name in spec.as_info}
+    for link in spec.links:
+        a, b = spec.as_of.get(link['src']), spec.as_of.get(link['dst'])
+        if a and b and a != b:
+            degree[a] += 1
+            degree[b] += 1
+    return degree
+
+
+def arrange(spec, cluster_pos):
+    """Place laid-out clusters in rows; returns (pos, as_boxes)"""
+    extents = {}
+    for name, pos in cluster_pos.items():
+        xs = [x for x, _ in pos.values()]
+        ys = [y for _, y in pos.values()]
+        extents[name] = (min(xs), max(xs), min(ys), max(ys))
+
+    def size(name):
+        x0, x1, y0, y1 = extents[name]
+        pad = BOX_PADDING if name else 0.0
+        return x1 - x0 + 2 * pad, y1 - y0 + 2 * (pad + LABEL_SPACE if name else 0.0)
+
+    degree = _inter_as_degree(spec)
+    order = sorted((name for name in cluster_pos if name),
+                   key=lambda name: (-degree.get(name, 0), list(spec.as_info).index(name)))
+    rows = [order[:1]] if order else []
+    rest = order[1:]
+    columns = max(1, math.ceil(math.sqrt(len(rest))))
+    rows += [rest[i:i + columns] for i in range(0, len(rest), columns)]
+    if None in cluster_pos:
+        rows.append([None])
+
+    # Row widths/heights, rows centered on x = 0, top row highest
+    pos, as_boxes = {}, {}
+    y_top = 0.0
+    total_width = max((sum(size(n)[0] for n in row) + CLUSTER_GAP * (len(row) - 1)
+                       for row in rows), default=0.0)
+    for row in rows:
+        row_width = sum(size(n)[0] for n in row) + CLUSTER_GAP * (len(row) - 1)
+        row_height = max(size(n)[1] for n in row)
+        x = (total_width - row_width) / 2
+        for name in row:
+            width, height = size(name)
+            x0, x1, y0, y1 = extents[name]
+            # Box corner, vertically centered within the row
+            bx, by = x, y_top - (row_height + height) / 2
+            pad = BOX_PADDING + LABEL_SPACE if name else 0.0
+            dx = bx + (BOX_PADDING if name else 0.0) - x0
+            dy = by + pad - y0
+            for node, (nx_, ny_) in cluster_pos[name].items():
+                pos[node] = [round(nx_ + dx, 3), round(ny_ + dy, 3)]
+            if name:
+                index = list(spec.as_info).index(name)
+                color, edge_color = BOX_COLORS[index % len(BOX_COLORS)]
+                as_boxes[name] = {
+                    'xy': [round(bx, 3), round(by, 3)],
+                    'width': round(width, 3), 'height': round(height, 3),
+                    'color': color, 'edge_color': edge_color,
+                    'label_position': 'left' if bx + width / 2 < total_width / 2 else 'right',
+                }
+            x += width + CLUSTER_GAP
+        y_top -= row_height + CLUSTER_GAP
+
+    # Shift everything into positive coordinates like the hand-made layout
+    min_x = min([p[0] for p in pos.values()] + [b['xy'][0] for b in as_boxes.values()])
+    min_y = min([p[1] for p in pos.values()] + [b['xy'][1] for b in as_boxes.values()])
+    for p in pos.values():
+        p[0] = round(p[0] - min_x, 3)
+        p[1] = round(p[1] - min_y, 3)
+    for box in as_boxes.values():
+        box['xy'] = [round(box['xy'][0] - min_x, 3), round(box['xy'][1] - min_y, 3)]
+    return pos, as_boxes
+
+
+def compute_layout(spec, workers=None):
+    """Lay out a spec from scratch; returns {"pos": ..., "as_boxes": ...}"""
+    tasks = clusters(spec)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(spec.nodes()) >= PARALLEL_THRESHOLD else 1
+    if workers > 1 and len(tasks) > 1:
+        # Largest clusters first so they don't end up last on a worker
+        tasks.sort(key=lambda task: -len(task[1]))
+        # Spawn, not fork: callers such as the editor run this from a worker
+        # thread of a Tk process, and forking a threaded process can deadlock
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = dict(pool.map(_layout_cluster, tasks))
+    else:
+        results = dict(map(_layout_cluster, tasks))
+    pos, as_boxes = arrange(spec, results)
+    return {'pos': pos, 'as_boxes': as_boxes}
+
+
+def cache_path(spec, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / f'{spec.digest()}-v{LAYOUT_VERSION}.json'
+
+
+def get_layout(spec, cache_dir=CACHE_DIR, use_cache=True, workers=None):
+    """
+    Layout for a spec: its own "layout" if it has positions, else a cached
+    or freshly computed automatic layout. Returns (layout, source) where
+    source is 'spec', 'cache' or 'computed'.
+    """
+    if spec.layout.get('pos'):
+        return spec.layout, 'spec'
+    path = cache_path(spec, cache_dir)
+    if use_cache:
+        try:
+            with open(path) as f:
+                return json.load(f), 'cache'
+        except (OSError, ValueError):
+            pass
+    layout = compute_layout(spec, workers)
+    if use_cache:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(layout, f, separators=(',', ':'))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    return layout, 'computed'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute an AS-clustered topology layout')
+    parser.add_argument('spec', nargs='?', default=None,
+                        help='topology spec (default: topology.json)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='ignore and do not write the layout cache')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: all CPUs for large topologies)')
+    parser.add_argument('--force', action='store_true',
+                        help="compute a layout even if the spec has one")
+    parser.add_argument('-o', '--output', default=None,
+                        help='write the layout JSON here')
+    args = parser.parse_args()
+
+    spec = TopologySpec.load(args.spec)
+    start = time.monotonic()
+    if args.force:
+        layout, source = compute_layout(spec, args.workers), 'computed'
+    else:
+        layout, source = get_layout(spec, use_cache=not args.no_cache, workers=args.workers)
+    elapsed = time.monotonic() - start
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(layout, f, indent=2)
+    print(f"✅ Layout for {len(layout['pos'])} nodes in {len(layout['as_boxes'])} ASes "
+          f"({source}) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
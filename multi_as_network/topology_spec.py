@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Declarative Topology Spec
+
+A single JSON description of routers, hosts, links and the IP plan, shared by
+topology.py, visualize_topology.py and topology_editor.py. The file is parsed
+once into indexed structures (node -> links, AS -> routers,
+subnet -> interfaces) so per-node lookups cost O(degree).
+
+Spec format:
+{
+  "name": "...",
+  "as_info": {"AS 100": {"asn": 100, "name": "Tier 1", "igp": "OSPF",
+                         "routers": ["r4", ...]}, ...},
+  "routers": {"r1": {"asn": 200, "mgmt_ip": "10.0.1.1"}, ...},
+  "hosts":   {"pc1": {"ip": "192.168.1.2/24", "gateway": "192.168.1.1",
+                      "router": "r1"}, ...},
+  "links":   [{"src": "r1", "dst": "r2", "src_intf": "r1-eth0",
+               "dst_intf": "r2-eth0", "src_ip": "10.0.1.1/24",
+               "dst_ip": "10.0.1.2/24", "type": "RIP"}, ...],
+  "layout":  {"pos": {...}, "as_boxes": {...}}   (optional)
+}
+
+Usage:
+    python3 topology_spec.py generate --num-as 10 --routers-per-as 20 -o big.json
+    python3 topology_spec.py info [topology.json]
+"""
+
+import argparse
+import hashlib
+import ipaddress
+import json
+import sys
+from pathlib import Path
+
+
+DEFAULT_SPEC = Path(__file__).with_name('topology.json')
+
+
+class TopologySpec:
+    """A loaded topology spec with precomputed lookup indexes"""
+
+    def __init__(self, data):
+        self.data = data
+        self.name = data.get('name', 'Network Topology')
+        self.as_info = data.get('as_info', {})
+        self.routers = data.get('routers', {})
+        self.hosts = data.get('hosts', {})
+        self.links = data.get('links', [])
+        self.layout = data.get('layout', {})
+        self._digest = None
+        self._index()
+
+    def _index(self):
+        """Build node -> links, AS -> routers and subnet -> interfaces"""
+        self.links_by_node = {node: [] for node in self.routers}
+        self.links_by_node.update({node: [] for node in self.hosts})
+        self.interfaces_by_subnet = {}
+
+        for link in self.links:
+            for side, peer in (('src', 'dst'), ('dst', 'src')):
+                node = link[side]
+                ip = link.get(f'{side}_ip')
+                entry = {
+                    'intf': link.get(f'{side}_intf'),
+                    'ip': ip,
+                    'peer': link[peer],
+                    'peer_intf': link.get(f'{peer}_intf'),
+                    'peer_ip': link.get(f'{peer}_ip'),
+                    'type': link['type'],
+                    'link': link,
+                }
+                self.links_by_node.setdefault(node, []).append(entry)
+                if ip:
+                    subnet = str(ipaddress.ip_interface(ip).network)
+                    self.interfaces_by_subnet.setdefault(subnet, []).append(
+                        {'node': node, 'intf': entry['intf'], 'ip': ip})
+
+        self.routers_by_as = {}
+        self.as_of = {}
+        for as_name, as_data in self.as_info.items():
+            self.routers_by_as[as_name] = list(as_data['routers'])
+            for router in as_data['routers']:
+                self.as_of[router] = as_name
+
+    @classmethod
+    def load(cls, path=None):
+        """Load a spec from a JSON file (defaults to topology.json)"""
+        with open(path or DEFAULT_SPEC) as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def generate(cls, **params):
+        """Build a spec from plan_topology() parameters"""
+        return cls(plan_topology(**params))
+
+    def save(self, path):
+        """Write the spec as compact JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.data, f, separators=(',', ':'))
+
+    def digest(self):
+        """Stable content hash of the spec, used as a cache key"""
+        if self._digest is None:
+            canonical = json.dumps(self.data, sort_keys=True, separators=(',', ':'))
+            self._digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return self._digest
+
+    def nodes(self):
+        return list(self.routers) + list(self.hosts)
+
+    def is_router(self, node):
+        return node in self.routers
+
+    def interfaces(self, node):
+        """Interfaces of a node with their peers, in link order - O(degree)"""
+        return self.links_by_node.get(node, [])
+
+    def interface_for_subnet(self, subnet):
+        """Interfaces attached to a subnet such as '10.0.1.0/24'"""
+        return self.interfaces_by_subnet.get(str(ipaddress.ip_network(subnet)), [])
+
+    def primary_ip(self, node):
+        """Management IP shown for a node (without prefix length)"""
+        if node in self.hosts:
+            return self.hosts[node]['ip'].split('/')[0]
+        ip = self.routers.get(node, {}).get('mgmt_ip')
+        if ip:
+            return ip
+        for entry in self.interfaces(node):
+            if entry['ip']:
+                return entry['ip'].split('/')[0]
+        return ''
+
+    def as_label(self, as_name):
+        """Display label for an AS, e.g. 'Tier 1\\n(AS 100)'"""
+        name = self.as_info[as_name].get('name')
+        return f'{name}\n({as_name})' if name else as_name
+
+
+def _ip(value):
+    """Format a 32-bit integer as a dotted-quad IPv4 address"""
+    return f'{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}'
+
+
+def _per_as(value, num_as, name):
+    """Expand a scalar parameter to one value per AS"""
+    if isinstance(value, (list, tuple)):
+        if len(value) != num_as:
+            raise ValueError(f'{name} needs {num_as} entries, got {len(value)}')
+        return list(value)
+    return [value] * num_as
+
+
+def default_inter_as(num_as):
+    """
+    Default inter-AS graph, mirroring the hand-built lab:
+    AS index 0 is the Tier 1 transit provider of every other AS, and
+    consecutive customer ASes peer with each other.
+    """
+    graph = [(0, i, 'transit') for i in range(1, num_as)]
+    graph += [(i, i + 1, 'peering') for i in range(1, num_as - 1)]
+    return graph
+
+
+def plan_topology(num_as=3, routers_per_as=3, igp='ospf', inter_as=None,
+                  hosts_per_edge=1, intra_as='chain'):
+    """
+    Compute routers, hosts, links and addressing for a generated topology.
+
+    - num_as: number of autonomous systems (AS numbers 100, 200, ...)
+    - routers_per_as: routers in each AS (int or one value per AS)
+    - igp: 'ospf' or 'rip' (str or one value per AS)
+    - inter_as: list of (as_a, as_b, 'transit' | 'peering') using AS indexes;
+      for transit links as_a is the provider. Defaults to default_inter_as()
+    - hosts_per_edge: hosts attached to every edge router (routers without
+      inter-AS links, or all routers of an AS that has no such router)
+    - intra_as: 'chain', 'ring' or 'star' wiring inside each AS
+
+    Point-to-point links get /30s from 10.0.0.0/8, host networks get /24s
+    from 172.16.0.0/12. Interface names are allocated per node as
+    <node>-eth<N>. Runs in O(routers + links).
+
+    Returns spec data (see the module docstring) without a layout.
+    """
+    if num_as < 1:
+        raise ValueError('num_as must be at least 1')
+    sizes = _per_as(routers_per_as, num_as, 'routers_per_as')
+    igps = [i.lower() for i in _per_as(igp, num_as, 'igp')]
+    for value in igps:
+        if value not in ('ospf', 'rip'):
+            raise ValueError(f'Unsupported IGP: {value}')
+    if intra_as not in ('chain', 'ring', 'star'):
+        raise ValueError(f'Unsupported intra-AS wiring: {intra_as}')
+    if inter_as is None:
+        inter_as = default_inter_as(num_as)
+
+    plan = {'name': f'Generated {num_as}-AS Network',
+            'as_info': {}, 'routers': {}, 'hosts': {}, 'links': []}
+    next_intf = {}
+    p2p_base = 10 << 24          # 10.0.0.0/8, one /30 per router link
+    lan_base = (172 << 24) | (16 << 16)  # 172.16.0.0/12, one /24 per host
+    counters = {'p2p': 0, 'lan': 0}
+
+    def intf(node):
+        index = next_intf.get(node, 0)
+        next_intf[node] = index + 1
+        return f'{node}-eth{index}'
+
+    def add_router_link(src, dst, link_type):
+        if counters['p2p'] >= 1 << 22:
+            raise ValueError('Out of point-to-point subnets in 10.0.0.0/8')
+        net = p2p_base + 4 * counters['p2p']
+        counters['p2p'] += 1
+        plan['links'].append({
+            'src': src, 'dst': dst,
+            'src_intf': intf(src), 'dst_intf': intf(dst),
+            'src_ip': f'{_ip(net + 1)}/30', 'dst_ip': f'{_ip(net + 2)}/30',
+            'type': link_type,
+        })
+
+    # Routers and intra-AS links
+    as_routers = []
+    index = 1
+    for as_index, size in enumerate(sizes):
+        if size < 1:
+            raise ValueError('Every AS needs at least one router')
+        asn = 100 * (as_index + 1)
+        routers = [f'r{n}' for n in range(index, index + size)]
+        index += size
+        as_routers.append(routers)
+        link_type = igps[as_index].upper()
+        plan['as_info'][f'AS {asn}'] = {'asn': asn, 'igp': link_type, 'routers': routers}
+        for router in routers:
+            plan['routers'][router] = {'asn': asn}
+
+        if intra_as == 'star':
+            pairs = [(routers[0], r) for r in routers[1:]]
+        else:
+            pairs = list(zip(routers, routers[1:]))
+            if intra_as == 'ring' and size > 2:
+                pairs.append((routers[-1], routers[0]))
+        for src, dst in pairs:
+            add_router_link(src, dst, link_type)
+
+    # Inter-AS links, spreading border duties round-robin over each AS
+    cursor = [0] * num_as
+    border = set()
+    for as_a, as_b, relation in inter_as:
+        if not (0 <= as_a < num_as and 0 <= as_b < num_as) or as_a == as_b:
+            raise ValueError(f'Invalid inter-AS link: {as_a}-{as_b}')
+        if relation not in ('transit', 'peering'):
+            raise ValueError(f'Unsupported inter-AS relation: {relation}')
+        src = as_routers[as_a][cursor[as_a] % len(as_routers[as_a])]
+        dst = as_routers[as_b][cursor[as_b] % len(as_routers[as_b])]
+        cursor[as_a] += 1
+        cursor[as_b] += 1
+        border.update((src, dst))
+        add_router_link(src, dst, 'BGP' if relation == 'transit' else 'Peering')
+
+    # Hosts on edge routers
+    host_index = 1
+    for routers in as_routers:
+        edge = [r for r in routers if r not in border] or routers
+        for router in edge:
+            for _ in range(hosts_per_edge):
+                if counters['lan'] >= 1 << 12:
+                    raise ValueError('Out of host subnets in 172.16.0.0/12')
+                net = lan_base + 256 * counters['lan']
+                counters['lan'] += 1
+                host = f'h{host_index}'
+                host_index += 1
+                plan['hosts'][host] = {'ip': f'{_ip(net + 2)}/24',
+                                       'gateway': _ip(net + 1),
+                                       'router': router}
+                plan['links'].append({
+                    'src': host, 'dst': router,
+                    'src_intf': intf(host), 'dst_intf': intf(router),
+                    'src_ip': f'{_ip(net + 2)}/24', 'dst_ip': f'{_ip(net + 1)}/24',
+                    'type': 'Host',
+                })
+
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate or inspect topology specs')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('generate', help='generate a parametric topology spec')
+    gen.add_argument('--num-as', type=int, default=3)
+    gen.add_argument('--routers-per-as', type=int, default=3)
+    gen.add_argument('--igp', default='ospf',
+                     help="IGP for every AS, or a comma-separated list per AS")
+    gen.add_argument('--hosts-per-edge', type=int, default=1)
+    gen.add_argument('--intra-as', choices=['chain', 'ring', 'star'], default='chain')
+    gen.add_argument('-o', '--output', required=True)
+
+    show = sub.add_parser('info', help='summarize a spec file')
+    show.add_argument('spec', nargs='?', default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        igp = args.igp.split(',') if ',' in args.igp else args.igp
+        try:
+            spec = TopologySpec.generate(num_as=args.num_as,
+                                         routers_per_as=args.routers_per_as,
+                                         igp=igp, hosts_per_edge=args.hosts_per_edge,
+                                         intra_as=args.intra_as)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        spec.save(args.output)
+        print(f"✅ {len(spec.routers)} routers, {len(spec.hosts)} hosts, "
+              f"{len(spec.links)} links written to {args.output}")
+    else:
+        spec = TopologySpec.load(args.spec)
+        print(f"{spec.name}: {len(spec.as_info)} ASes, {len(spec.routers)} routers, "
+              f"{len(spec.hosts)} hosts, {len(spec.links)} links")
+        for as_name, routers in spec.routers_by_as.items():
+            print(f"  {as_name} ({spec.as_info[as_name]['igp']}): {', '.join(routers)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Traffic Tools for Benchmarks
+
+Probe stream: a paced unicast UDP stream with the iptv_frame header
+(sequence number + send timestamp). The receiver records every sequence
+gap with the arrival times around it, so a data-plane outage (e.g. during
+a link failure) can be measured to about one packet interval.
+
+Usage (inside Mininet hosts):
+    pc4 python3 traffic.py probe-recv --port 6000 --out /tmp/probe.json &
+    pc1 python3 traffic.py probe-send 192.168.4.2 --port 6000 --rate 1000 --duration 30
+
+The receiver stops after --duration seconds or on SIGTERM/Ctrl+C and then
+writes its JSON result.
+
+Blaster and sink: a UDP (paced) or TCP (as fast as possible) load
+generator and a sink that serves both protocols on one port and counts
+bytes, packets and UDP loss per source. UDP blasters also send echo
+requests every 100 ms that the sink reflects, for RTT under load; TCP
+blasters read the kernel's smoothed RTT and retransmits from TCP_INFO.
+
+    pc4 python3 traffic.py sink --port 7000 --out /tmp/sink.json &
+    pc1 python3 traffic.py blast 192.168.4.2 --port 7000 --rate 50M --duration 10
+    pc1 python3 traffic.py blast 192.168.4.2 --port 7000 --tcp --duration 10
+"""
+
+import argparse
+import json
+import select
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+
+import iptv_frame
+from multicast_sender import bench, parse_rate
+
+PROBE_PORT = 6000
+PROBE_SIZE = 64
+BLAST_PORT = 7000
+BLAST_SIZE = 1400
+# Echo request: the sink sends the datagram straight back
+FLAG_ECHO = 0x02
+ECHO_INTERVAL_NS = 100_000_000
+# Offsets into Linux struct tcp_info
+TCPI_RTT_OFFSET = 68
+TCPI_TOTAL_RETRANS_OFFSET = 100
+
+
+def probe_send(dest, port=PROBE_PORT, rate=1000, duration=30, size=PROBE_SIZE):
+    """Send `rate` probe packets per second to dest:port"""
+    size = max(size, iptv_frame.HEADER_SIZE)
+    bench(dest, port, 64, rate * size * 8, size, duration, batch=8)
+
+
+def probe_receive(port=PROBE_PORT, duration=None):
+    """
+    Receive a probe stream until `duration` passes or SIGTERM arrives.
+
+    Returns a dict with counters and the list of sequence gaps; every gap
+    has the (wall-clock) arrival times of the packets on both sides.
+    """
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('', port))
+    sock.settimeout(0.2)
+    buffer = bytearray(2048)
+    view = memoryview(buffer)
+
+    received = reordered = 0
+    first_seq = last_seq = None
+    first_arrival = last_arrival = None
+    gaps = []
+    deadline = time.monotonic() + duration if duration else None
+
+    try:
+        while not stopping and (deadline is None or time.monotonic() < deadline):
+            try:
+                nbytes = sock.recv_into(buffer)
+            except socket.timeout:
+                continue
+            now = time.time()
+            frame = iptv_frame.unpack(view[:nbytes])
+            if frame is None:
+                continue
+            seq = frame[1]
+            received += 1
+            if last_seq is None:
+                first_seq, first_arrival = seq, now
+            elif seq <= last_seq:
+                reordered += 1
+                continue
+            elif seq > last_seq + 1:
+                gaps.append({
+                    'after_seq': last_seq,
+                    'lost': seq - last_seq - 1,
+                    'start': round(last_arrival, 6),
+                    'end': round(now, 6),
+                    'duration_ms': round((now - last_arrival) * 1000, 3),
+                })
+            last_seq, last_arrival = seq, now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+    expected = 0 if last_seq is None else last_seq - first_seq + 1
+    return {
+        'received': received,
+        'expected': expected,
+        'lost': sum(gap['lost'] for gap in gaps),
+        'reordered': reordered,
+        'first_arrival': first_arrival,
+        'last_arrival': last_arrival,
+        'gaps': gaps,
+    }
+
+
+def blast_udp(dest, port=BLAST_PORT, rate=50e6, size=BLAST_SIZE, duration=10,
+              stream_id=1):
+    """
+    Send paced UDP datagrams and echo requests; returns a JSON-able dict
+    with what was sent and the measured RTTs.
+    """
+    size = max(size, iptv_frame.HEADER_SIZE)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.connect((dest, port))
+    sock.setblocking(False)
+    payload = bytearray(size)
+    view = memoryview(payload)
+    echo = bytearray(iptv_frame.HEADER_SIZE)
+    reply = bytearray(2048)
+    clock = time.monotonic_ns
+    interval_ns = max(1, int(size * 8 * 1e9 / rate))
+
+    sent = errors = 0
+    rtts = []
+    start = clock()
+    end = start + int(duration * 1e9)
+    next_due = start
+    next_echo = start
+    echo_seq = 0
+    while True:
+        now = clock()
+        if now >= end:
+            break
+        if now >= next_echo:
+            iptv_frame.pack_into(echo, stream_id, echo_seq, now,
+                                 iptv_frame.FLAG_MONOTONIC | FLAG_ECHO)
+            try:
+                sock.send(echo)
+            except OSError:
+                pass
+            echo_seq += 1
+            next_echo += ECHO_INTERVAL_NS
+        try:
+            while True:
+                nbytes = sock.recv_into(reply)
+                frame = iptv_frame.unpack(memoryview(reply)[:nbytes])
+                if frame and frame[3] & FLAG_ECHO:
+                    rtts.append((clock() - frame[2]) / 1e6)
+        except (BlockingIOError, ConnectionRefusedError):
+            pass
+        if now < next_due:
+            ahead = next_due - now
+            if ahead > 1_000_000:
+                # Wake up early for echo replies so RTTs aren't inflated
+                select.select([sock], [], [], (ahead - 500_000) / 1e9)
+            continue
+        if now - next_due > 100_000_000:
+            next_due = now
+        due = min(32, (now - next_due) // interval_ns + 1)
+        for seq in range(sent, sent + due):
+            iptv_frame.pack_into(payload, stream_id, seq, now, iptv_frame.FLAG_MONOTONIC)
+            try:
+                sock.send(view)
+            except OSError:
+                errors += 1
+        sent += due
+        next_due += due * interval_ns
+    elapsed = (clock() - start) / 1e9
+    sock.close()
+    rtts.sort()
+    return {
+        'proto': 'udp', 'dest': dest, 'stream': stream_id, 'elapsed': round(elapsed, 3),
+        'sent': sent, 'sent_bytes': sent * size, 'errors': errors,
+        'offered_mbps': round(sent * size * 8 / elapsed / 1e6, 3) if elapsed else 0.0,
+        'rtt_ms': {'p50': rtts[len(rtts) // 2], 'max': rtts[-1], 'n': len(rtts)} if rtts else None,
+    }
+
+
+def blast_tcp(dest, port=BLAST_PORT, duration=10, size=65536):
+    """Send over TCP as fast as possible; returns a JSON-able dict"""
+    sock = socket.create_connection((dest, port), timeout=5)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    view = memoryview(bytearray(size))
+    sent = 0
+    start = time.monotonic()
+    end = start + duration
+    try:
+        while time.monotonic() < end:
+            sent += sock.send(view)
+    except OSError:
+        pass
+    elapsed = time.monotonic() - start
+    rtt = retrans = None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 104)
+        rtt = struct.unpack_from('I', info, TCPI_RTT_OFFSET)[0] / 1000.0
+        retrans = struct.unpack_from('I', info, TCPI_TOTAL_RETRANS_OFFSET)[0]
+    except (OSError, AttributeError, struct.error):
+        pass
+    sock.close()
+    return {
+        'proto': 'tcp', 'dest': dest, 'elapsed': round(elapsed, 3),
+        'sent_bytes': sent, 'retransmits': retrans,
+        'offered_mbps': round(sent * 8 / elapsed / 1e6, 3) if elapsed else 0.0,
+        'rtt_ms': {'p50': rtt, 'max': rtt, 'n': 1} if rtt is not None else None,
+    }
+
+
+def sink(port=BLAST_PORT, duration=None):
+    """
+    Receive UDP and TCP load on one port until `duration` passes or
+    SIGTERM arrives. Returns per-source counters keyed by source IP.
+    """
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    selector = selectors.DefaultSelector()
+
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp.bind(('', port))
+    udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    udp.setblocking(False)
+    tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    tcp.bind(('', port))
+    tcp.listen(64)
+    tcp.setblocking(False)
+    selector.register(udp, selectors.EVENT_READ, 'udp')
+    selector.register(tcp, selectors.EVENT_READ, 'listen')
+
+    buffer = bytearray(65536)
+    view = memoryview(buffer)
+    sources = {}
+
+    def source(ip, proto):
+        entry = sources.get((ip, proto))
+        if entry is None:
+            entry = sources[(ip, proto)] = {'source': ip, 'proto': proto, 'bytes': 0,
+                                            'packets': 0, 'first_seq': None, 'max_seq': None,
+                                            'first': None, 'last': None}
+        return entry
+
+    deadline = time.monotonic() + duration if duration else None
+    try:
+        while not stopping and (deadline is None or time.monotonic() < deadline):
+            for key, _ in selector.select(timeout=0.2):
+                if key.data == 'listen':
+                    try:
+                        conn, addr = tcp.accept()
+                    except BlockingIOError:
+                        continue
+                    conn.setblocking(False)
+                    selector.register(conn, selectors.EVENT_READ, source(addr[0], 'tcp'))
+                elif key.data == 'udp':
+                    while True:
+                        try:
+                            nbytes, addr = udp.recvfrom_into(buffer)
+                        except BlockingIOError:
+                            break
+                        frame = iptv_frame.unpack(view[:nbytes])
+                        if frame and frame[3] & FLAG_ECHO:
+                            udp.sendto(view[:nbytes], addr)
+                            continue
+                        entry = source(addr[0], 'udp')
+                        entry['bytes'] += nbytes
+                        entry['packets'] += 1
+                        now = time.time()
+                        entry['first'] = entry['first'] or now
+                        entry['last'] = now
+                        if frame:
+                            seq = frame[1]
+                            if entry['first_seq'] is None:
+                                entry['first_seq'] = entry['max_seq'] = seq
+                            elif seq > entry['max_seq']:
+                                entry['max_seq'] = seq
+                else:
+                    entry = key.data
+                    try:
+                        nbytes = key.fileobj.recv_into(buffer)
+                    except BlockingIOError:
+                        continue
+                    except ConnectionResetError:
+                        nbytes = 0
+                    if nbytes == 0:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                        continue
+                    now = time.time()
+                    entry['bytes'] += nbytes
+                    entry['first'] = entry['first'] or now
+                    entry['last'] = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+
+    results = []
+    for entry in sources.values():
+        if entry['proto'] == 'udp' and entry['first_seq'] is not None:
+            expected = entry['max_seq'] - entry['first_seq'] + 1
+            entry['lost'] = max(0, expected - entry['packets'])
+            entry['loss_pct'] = round(100.0 * entry['lost'] / expected, 3)
+        results.append(entry)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark traffic tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    send = sub.add_parser('probe-send', help='send a paced probe stream')
+    send.add_argument('dest')
+    send.add_argument('--port', type=int, default=PROBE_PORT)
+    send.add_argument('--rate', type=int, default=1000,
+                      help='packets per second (default: 1000)')
+    send.add_argument('--size', type=int, default=PROBE_SIZE)
+    send.add_argument('--duration', type=float, default=30)
+
+    recv = sub.add_parser('probe-recv', help='receive a probe stream and record gaps')
+    recv.add_argument('--port', type=int, default=PROBE_PORT)
+    recv.add_argument('--duration', type=float, default=None,
+                      help='stop after this many seconds (default: until SIGTERM)')
+    recv.add_argument('--out', default=None,
+                      help='write the JSON result here instead of stdout')
+
+    blast = sub.add_parser('blast', help='send UDP (paced) or TCP load to a sink')
+    blast.add_argument('dest')
+    blast.add_argument('--port', type=int, default=BLAST_PORT)
+    blast.add_argument('--tcp', action='store_true', help='TCP instead of paced UDP')
+    blast.add_argument('--rate', type=parse_rate, default=50e6,
+                       help="UDP bitrate, e.g. '50M' (default: 50M)")
+    blast.add_argument('--size', type=int, default=BLAST_SIZE,
+                       help=f'UDP datagram size (default: {BLAST_SIZE})')
+    blast.add_argument('--duration', type=float, default=10)
+    blast.add_argument('--stream-id', type=int, default=1)
+
+    sink_parser = sub.add_parser('sink', help='count UDP/TCP load per source')
+    sink_parser.add_argument('--port', type=int, default=BLAST_PORT)
+    sink_parser.add_argument('--duration', type=float, default=None,
+                             help='stop after this many seconds (default: until SIGTERM)')
+    sink_parser.add_argument('--out', default=None,
+                             help='write the JSON result here instead of stdout')
+
+    args = parser.parse_args()
+    if args.command == 'blast':
+        if args.tcp:
+            result = blast_tcp(args.dest, args.port, args.duration)
+        else:
+            result = blast_udp(args.dest, args.port, args.rate, args.size,
+                               args.duration, args.stream_id)
+        print(json.dumps(result))
+    elif args.command == 'sink':
+        result = sink(args.port, args.duration)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(result, f)
+        else:
+            json.dump(result, sys.stdout, indent=2)
+            print()
+    elif args.command == 'probe-send':
+        probe_send(args.dest, args.port, args.rate, args.duration, args.size)
+    elif args.command == 'probe-recv':
+        result = probe_receive(args.port, args.duration)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(result, f)
+        else:
+            json.dump(result, sys.stdout, indent=2)
+            print()
+
+
+if __name__ == '__main__':
+    main()
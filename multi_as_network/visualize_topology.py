@@ -2,128 +2,56 @@
 """
 Standalone Network Topology Visualizer
 Generates a network diagram and saves it to a file (no GUI required)
+
+Two renderers:
+- classic: networkx drawing with a boxed IP label per node, used for small
+  topologies such as the 3-AS lab
+- fast: one LineCollection for all links, one scatter (PathCollection) per
+  node kind and plain text labels; IP labels are dropped above
+  --label-threshold nodes and node names above 4x that. The figure grows
+  with the layout, and markers and fonts shrink once it hits its size cap.
+The default ('auto') picks fast above AUTO_FAST_NODES nodes. The time spent
+in layout, drawing and each saved file is printed.
 """
 
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
-import networkx as nx
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.figure import Figure
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+import argparse
 import sys
+import time
 
+from topology_spec import TopologySpec
+from topology_layout import get_layout
 
-def create_topology_visualization(output_file='network_topology.png'):
-    """Create and save network topology visualization"""
-    
-    # Create graph
-    G = nx.Graph()
-    
-    # Define IP addresses for each node (primary management IP)
-    node_ips = {
-        # Routers - using their router-id or primary interface
-        'r1': '10.0.1.1',
-        'r2': '10.0.1.2',
-        'r3': '10.0.2.2',
-        'r4': '10.0.3.2',
-        'r5': '10.0.4.2',
-        'r6': '10.0.5.2',
-        'r7': '10.0.6.2',
-        'r8': '10.0.7.2',
-        'r9': '10.0.8.2',
-        # Hosts
-        'pc1': '192.168.1.2',
-        'pc2': '192.168.2.2',
-        'pc3': '192.168.3.2',
-        'pc4': '192.168.4.2'
-    }
-    
-    # Add routers with IP info
-    routers = ['r1', 'r2', 'r3', 'r4', 'r5', 'r6', 'r7', 'r8', 'r9']
-    for router in routers:
-        G.add_node(router, node_type='router', ip=node_ips[router])
-    
-    # Add hosts with IP info
-    hosts = ['pc1', 'pc2', 'pc3', 'pc4']
-    for host in hosts:
-        G.add_node(host, node_type='host', ip=node_ips[host])
-    
-    # Add links
-    links = [
-        {'src': 'r1', 'dst': 'r2', 'type': 'RIP'},
-        {'src': 'r2', 'dst': 'r3', 'type': 'RIP'},
-        {'src': 'r2', 'dst': 'r4', 'type': 'BGP'},
-        {'src': 'r4', 'dst': 'r5', 'type': 'OSPF'},
-        {'src': 'r5', 'dst': 'r6', 'type': 'OSPF'},
-        {'src': 'r6', 'dst': 'r7', 'type': 'BGP'},
-        {'src': 'r7', 'dst': 'r8', 'type': 'OSPF'},
-        {'src': 'r7', 'dst': 'r9', 'type': 'OSPF'},
-        {'src': 'r2', 'dst': 'r7', 'type': 'Peering'},
-        {'src': 'pc1', 'dst': 'r1', 'type': 'Host'},
-        {'src': 'pc2', 'dst': 'r3', 'type': 'Host'},
-        {'src': 'pc3', 'dst': 'r8', 'type': 'Host'},
-        {'src': 'pc4', 'dst': 'r9', 'type': 'Host'}
-    ]
-    
-    for link in links:
-        G.add_edge(link['src'], link['dst'], link_type=link['type'])
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(16, 10))
-    
-    # Define custom positions based on AS topology
-    pos = {
-        # Tier 1 (AS 100) - Top center
-        'r4': (2, 8),
-        'r5': (5, 8),
-        'r6': (8, 8),
-        
-        # ISP #1 (AS 200) - Bottom left
-        'r1': (1, 3),
-        'r2': (3, 4),
-        'r3': (5, 3),
-        'pc1': (1, 1),
-        'pc2': (5, 1),
-        
-        # ISP #2 (AS 300) - Bottom right
-        'r7': (8, 4),
-        'r8': (7, 3),
-        'r9': (9, 3),
-        'pc3': (7, 1),
-        'pc4': (9, 1),
-    }
-    
-    # Define AS boundaries for visual grouping
-    as_boxes = {
-        'Tier 1\n(AS 100)': {
-            'xy': (1.2, 6.8),
-            'width': 7.6,
-            'height': 2.0,
-            'color': '#FFE6E6',
-            'edge_color': '#FF6B6B',
-            'igp': 'OSPF',
-            'label_position': 'right'  # Label on right
-        },
-        'ISP #1\n(AS 200)': {
-            'xy': (0.2, 0.2),
-            'width': 5.6,
-            'height': 4.6,
-            'color': '#E6F3FF',
-            'edge_color': '#4A90E2',
-            'igp': 'RIP',
-            'label_position': 'left'  # Label on left
-        },
-        'ISP #2\n(AS 300)': {
-            'xy': (6.2, 0.2),
-            'width': 3.6,
-            'height': 4.6,
-            'color': '#E6FFE6',
-            'edge_color': '#4CAF50',
-            'igp': 'OSPF',
-            'label_position': 'right'  # Label on right
-        }
-    }
-    
-    # Draw AS boundary boxes
+AUTO_FAST_NODES = 60
+LABEL_THRESHOLD = 150
+# Fast renderer figure size limits (inches) and pixel cap for the PNG
+MIN_FIGSIZE = (16, 10)
+MAX_FIGSIZE = (60, 40)
+MAX_PIXELS = 8000
+# Inches per layout unit at which markers and fonts are drawn at full size
+FULL_SCALE = 1.2
+
+EDGE_STYLES = {
+    'RIP': {'color': '#4A90E2', 'width': 2.5, 'style': 'solid', 'alpha': 0.7},
+    'OSPF': {'color': '#4CAF50', 'width': 2.5, 'style': 'solid', 'alpha': 0.7},
+    'BGP': {'color': '#FF6B6B', 'width': 3.5, 'style': 'solid', 'alpha': 0.9},
+    'Peering': {'color': '#9C27B0', 'width': 3.0, 'style': 'dashed', 'alpha': 0.8},
+    'Host': {'color': '#757575', 'width': 2.0, 'style': 'solid', 'alpha': 0.5}
+}
+
+
+
+def draw_as_boxes(ax, as_boxes, scale=1.0):
+    """AS boundary boxes with their name and IGP labels"""
     for as_name, box_info in as_boxes.items():
         rect = mpatches.FancyBboxPatch(
             box_info['xy'], box_info['width'], box_info['height'],
@@ -144,7 +72,7 @@ def create_topology_visualization(output_file='network_topology.png'):
         
         label_y = box_info['xy'][1] + box_info['height'] * 0.85
         ax.text(label_x, label_y, as_name,
-               fontsize=11, fontweight='bold',
+               fontsize=max(11 * scale, 6), fontweight='bold',
                color=box_info['edge_color'],
                ha='center', va='center',
                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
@@ -153,20 +81,33 @@ def create_topology_visualization(output_file='network_topology.png'):
         # Add IGP label
         igp_y = box_info['xy'][1] + box_info['height'] * 0.15
         ax.text(label_x, igp_y, f"IGP: {box_info['igp']}",
-               fontsize=9, style='italic',
+               fontsize=max(9 * scale, 5), style='italic',
                color=box_info['edge_color'],
                ha='center', va='center')
+
+
+def draw_classic(ax, spec, pos):
+    """networkx drawing with a boxed IP label per node"""
+    import networkx as nx
+    
+    # Create graph
+    G = nx.Graph()
+    
+    # Add routers and hosts with their primary IP
+    routers = list(spec.routers)
+    for router in routers:
+        G.add_node(router, node_type='router', ip=spec.primary_ip(router))
+    
+    hosts = list(spec.hosts)
+    for host in hosts:
+        G.add_node(host, node_type='host', ip=spec.primary_ip(host))
+    
+    # Add links
+    for link in spec.links:
+        G.add_edge(link['src'], link['dst'], link_type=link['type'])
     
     # Draw edges with different colors and styles based on type
-    edge_styles = {
-        'RIP': {'color': '#4A90E2', 'width': 2.5, 'style': 'solid', 'alpha': 0.7},
-        'OSPF': {'color': '#4CAF50', 'width': 2.5, 'style': 'solid', 'alpha': 0.7},
-        'BGP': {'color': '#FF6B6B', 'width': 3.5, 'style': 'solid', 'alpha': 0.9},
-        'Peering': {'color': '#9C27B0', 'width': 3.0, 'style': 'dashed', 'alpha': 0.8},
-        'Host': {'color': '#757575', 'width': 2.0, 'style': 'solid', 'alpha': 0.5}
-    }
-    
-    for link_type, style in edge_styles.items():
+    for link_type, style in EDGE_STYLES.items():
         edges = [(u, v) for u, v, d in G.edges(data=True) 
                 if d.get('link_type') == link_type]
         if edges:
@@ -200,7 +141,7 @@ def create_topology_visualization(output_file='network_topology.png'):
                            font_family='sans-serif', ax=ax)
     
     # Draw IP addresses below each node
-    ip_labels = {node: node_ips[node] for node in G.nodes()}
+    ip_labels = {node: G.nodes[node]['ip'] for node in G.nodes()}
     ip_pos = {node: (x, y - 0.35) for node, (x, y) in pos.items()}
     
     for node, (x, y) in ip_pos.items():
@@ -210,6 +151,115 @@ def create_topology_visualization(output_file='network_topology.png'):
                color='#555555',
                bbox=dict(boxstyle='round,pad=0.2', facecolor='white', 
                         edgecolor='none', alpha=0.8))
+
+
+def label_collection(ax, labels, fontsize, color='black', weight='normal',
+                     va='center', dy=0.0):
+    """
+    Draw many labels of one font size as a single PathCollection: each
+    label is a TextPath in points, placed at its node in data coordinates,
+    so zooming keeps the text size like ax.text but without one Text
+    artist per label. `labels` is a list of ((x, y), text).
+    """
+    prop = FontProperties(family='sans-serif', weight=weight)
+    paths, offsets = [], []
+    for (x, y), text in labels:
+        path = TextPath((0, 0), text, size=fontsize, prop=prop)
+        extents = path.get_extents()
+        shift_y = extents.y1 if va == 'top' else (extents.y0 + extents.y1) / 2
+        vertices = path.vertices - ((extents.x0 + extents.x1) / 2, shift_y)
+        paths.append(Path(vertices, path.codes))
+        offsets.append((x, y + dy))
+    if paths:
+        points = Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans
+        ax.add_collection(PathCollection(paths, offsets=offsets, offset_transform=ax.transData,
+                                         transform=points, facecolors=color,
+                                         edgecolors='none', linewidths=0, zorder=3),
+                          autolim=False)
+    return len(paths)
+
+
+def draw_collections(ax, spec, pos, scale=1.0, label_threshold=LABEL_THRESHOLD):
+    """
+    All links as one LineCollection, routers and hosts as one scatter each,
+    names and IP labels as one PathCollection each, subject to the
+    level-of-detail threshold. Returns the number of labels drawn.
+    """
+    segments, colors, widths, styles = [], [], [], []
+    for link in spec.links:
+        style = EDGE_STYLES.get(link['type'], EDGE_STYLES['Host'])
+        segments.append((pos[link['src']], pos[link['dst']]))
+        colors.append(to_rgba(style['color'], style['alpha']))
+        widths.append(style['width'] * scale)
+        styles.append(style['style'])
+    ax.add_collection(LineCollection(segments, colors=colors, linewidths=widths,
+                                     linestyles=styles, zorder=1))
+    
+    for nodes, marker, size, face, edge, width in (
+            (list(spec.routers), 's', 2500, 'white', '#333333', 2.5),
+            (list(spec.hosts), 'o', 2000, '#B2DFDB', '#00796B', 2)):
+        if nodes:
+            ax.scatter([pos[n][0] for n in nodes], [pos[n][1] for n in nodes],
+                       s=size * scale * scale, marker=marker, c=face,
+                       edgecolors=edge, linewidths=width * scale, zorder=2)
+    
+    count = len(pos)
+    labels = 0
+    if count <= 4 * label_threshold:
+        labels += label_collection(ax, [(xy, node) for node, xy in pos.items()],
+                                   max(11 * scale, 3), weight='bold')
+    if count <= label_threshold:
+        labels += label_collection(ax, [(xy, spec.primary_ip(node)) for node, xy in pos.items()],
+                                   max(8 * scale, 3), color='#555555', va='top', dy=-0.35)
+    return labels
+
+
+def figure_geometry(pos, as_boxes, max_figsize=MAX_FIGSIZE, min_figsize=MIN_FIGSIZE):
+    """(figsize, dpi, scale, limits) for the fast renderer"""
+    xs = [x for x, _ in pos.values()]
+    ys = [y for _, y in pos.values()]
+    for box in as_boxes.values():
+        xs += [box['xy'][0], box['xy'][0] + box['width']]
+        ys += [box['xy'][1], box['xy'][1] + box['height']]
+    limits = (min(xs) - 1.5, max(xs) + 1.5, min(ys) - 1.5, max(ys) + 1.5)
+    width, height = limits[1] - limits[0], limits[3] - limits[2]
+    inches = min(FULL_SCALE, max_figsize[0] / width, max_figsize[1] / height)
+    figsize = (max(width * inches, min_figsize[0]), max(height * inches, min_figsize[1]))
+    dpi = min(300, MAX_PIXELS / max(figsize))
+    return figsize, dpi, inches / FULL_SCALE, limits
+
+
+def build_figure(spec, layout, mode='auto', label_threshold=LABEL_THRESHOLD,
+                 max_figsize=MAX_FIGSIZE):
+    """
+    Draw the topology on a new Figure. The figure is not registered with
+    pyplot, so this can run off the GUI thread (the topology editor does).
+    Returns (fig, render) where render has 'fast', 'dpi' and 'bbox' for
+    savefig.
+    """
+    pos = {node: tuple(xy) for node, xy in layout['pos'].items()}
+    
+    as_boxes = {}
+    for as_name, box in layout.get('as_boxes', {}).items():
+        as_boxes[spec.as_label(as_name)] = dict(box, igp=spec.as_info[as_name]['igp'])
+    
+    fast = mode == 'fast' or (mode == 'auto' and len(pos) > AUTO_FAST_NODES)
+    if fast:
+        min_figsize = (min(MIN_FIGSIZE[0], max_figsize[0]), min(MIN_FIGSIZE[1], max_figsize[1]))
+        figsize, dpi, scale, limits = figure_geometry(pos, as_boxes, max_figsize, min_figsize)
+        fig = Figure(figsize=figsize)
+    else:
+        dpi, scale = 300, 1.0
+        fig = Figure(figsize=(16, 10))
+    ax = fig.add_subplot()
+    
+    # Draw AS boundary boxes
+    draw_as_boxes(ax, as_boxes, scale)
+    
+    if fast:
+        draw_collections(ax, spec, pos, scale, label_threshold)
+    else:
+        draw_classic(ax, spec, pos)
     
     # Create custom legend
     legend_elements = [
@@ -226,30 +276,85 @@ def create_topology_visualization(output_file='network_topology.png'):
     ax.legend(handles=legend_elements, loc='upper left', fontsize=10,
              framealpha=0.9, edgecolor='black')
     
-    ax.set_title("Multi-AS Network Topology", fontsize=18, fontweight='bold', pad=20)
-    ax.set_xlim(-0.5, 10.5)
-    ax.set_ylim(-0.5, 9.5)
-    ax.axis('off')
+    ax.set_title(spec.name, fontsize=18, fontweight='bold', pad=20)
+    if fast:
+        ax.set_xlim(limits[0], limits[1])
+        ax.set_ylim(limits[2], limits[3])
+        ax.axis('off')
+        # tight_layout and bbox_inches='tight' measure every text artist;
+        # the title needs about 0.7 in at the top
+        fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=1 - 0.7 / figsize[1])
+        bbox = None
+    else:
+        xs = [x for x, _ in pos.values()]
+        ys = [y for _, y in pos.values()]
+        ax.set_xlim(min(xs) - 1.5, max(xs) + 1.5)
+        ax.set_ylim(min(ys) - 1.5, max(ys) + 1.5)
+        ax.axis('off')
+        fig.tight_layout()
+        bbox = 'tight'
+    return fig, {'fast': fast, 'dpi': dpi, 'bbox': bbox}
+
+
+def create_topology_visualization(output_file='network_topology.png', spec=None,
+                                  mode='auto', label_threshold=LABEL_THRESHOLD, pdf=True):
+    """
+    Create and save network topology visualization. A PDF is written next
+    to a PNG unless `pdf` is False. Returns phase -> seconds.
+    """
+    spec = spec if spec is not None else TopologySpec.load()
+    timings = {}
+    start = time.monotonic()
+    
+    # Positions and AS boundaries come from the spec layout, or from the
+    # automatic AS-clustered layout (cached per topology)
+    layout, source = get_layout(spec)
+    timings['layout'] = time.monotonic() - start
     
-    plt.tight_layout()
+    start = time.monotonic()
+    fig, render = build_figure(spec, layout, mode, label_threshold)
+    fast, dpi, bbox = render['fast'], render['dpi'], render['bbox']
+    timings['draw'] = time.monotonic() - start
     
     # Save to file
-    plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
+    start = time.monotonic()
+    fig.savefig(output_file, dpi=dpi, bbox_inches=bbox, facecolor='white')
+    timings['save'] = time.monotonic() - start
     print(f"✅ Network topology saved to: {output_file}")
     
     # Also save as PDF
-    pdf_file = output_file.replace('.png', '.pdf')
-    plt.savefig(pdf_file, bbox_inches='tight', facecolor='white')
-    print(f"✅ Network topology saved to: {pdf_file}")
+    if pdf and output_file.endswith('.png'):
+        start = time.monotonic()
+        pdf_file = output_file[:-len('.png')] + '.pdf'
+        fig.savefig(pdf_file, bbox_inches=bbox, facecolor='white')
+        timings['pdf'] = time.monotonic() - start
+        print(f"✅ Network topology saved to: {pdf_file}")
     
-    plt.close()
+    renderer = 'fast' if fast else 'classic'
+    print(f"⏱️  {len(layout['pos'])} nodes, {renderer} renderer: "
+          f"layout {timings['layout'] * 1000:.0f} ms ({source}), draw {timings['draw'] * 1000:.0f} ms, "
+          + ', '.join(f"{phase} {timings[phase] * 1000:.0f} ms"
+                      for phase in ('save', 'pdf') if phase in timings))
+    return timings
 
 
 if __name__ == '__main__':
-    output_file = sys.argv[1] if len(sys.argv) > 1 else 'network_topology.png'
+    parser = argparse.ArgumentParser(description='Render the network topology to a file')
+    parser.add_argument('output_file', nargs='?', default='network_topology.png')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec to draw (default: topology.json)')
+    parser.add_argument('--mode', choices=['auto', 'classic', 'fast'], default='auto',
+                        help=f'renderer (default: auto, fast above {AUTO_FAST_NODES} nodes)')
+    parser.add_argument('--label-threshold', type=int, default=LABEL_THRESHOLD,
+                        help='fast renderer: drop IP labels above this many nodes '
+                             f'and names above 4x (default: {LABEL_THRESHOLD})')
+    parser.add_argument('--no-pdf', action='store_true',
+                        help='only write the PNG')
+    args = parser.parse_args()
     
     try:
-        create_topology_visualization(output_file)
+        create_topology_visualization(args.output_file, TopologySpec.load(args.spec),
+                                      args.mode, args.label_threshold, not args.no_pdf)
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
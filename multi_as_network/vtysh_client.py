@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Batched vtysh Query Client
+
+Sends many `show ... json` commands to a router in a single vtysh
+invocation (`vtysh -N <router> -c ... -c ...`) and splits the concatenated
+output back into one parsed document per command with
+json.JSONDecoder.raw_decode. If the output can't be split cleanly (a daemon
+that isn't running prints a text error instead of JSON), the commands are
+retried one per invocation. Queries to different routers run concurrently,
+so collecting the state of every router costs about one vtysh round trip.
+
+Usage (as root, while the network is running):
+    sudo python3 vtysh_client.py                        # default state, all routers
+    sudo python3 vtysh_client.py -c "show ip bgp json" --routers r2 r7 --json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from topology_spec import TopologySpec
+
+# Protocol state collected by default
+STATE_COMMANDS = [
+    'show ip route json',
+    'show ip ospf neighbor json',
+    'show ip route rip json',
+    'show ip bgp summary json',
+    'show ip pim neighbor json',
+]
+
+_decoder = json.JSONDecoder()
+
+
+def split_documents(text):
+    """
+    Parse concatenated JSON documents. Returns the list of documents, or
+    None if anything other than JSON and whitespace is in the text.
+    """
+    documents = []
+    position, end = 0, len(text)
+    while True:
+        while position < end and text[position].isspace():
+            position += 1
+        if position >= end:
+            return documents
+        try:
+            document, position = _decoder.raw_decode(text, position)
+        except ValueError:
+            return None
+        documents.append(document)
+
+
+def _vtysh(router, commands, timeout):
+    args = ['vtysh', '-N', router]
+    for command in commands:
+        args += ['-c', command]
+    try:
+        return subprocess.run(args, capture_output=True, text=True, timeout=timeout).stdout
+    except (subprocess.SubprocessError, OSError):
+        return None
+
+
+def query_one(router, command, timeout=5):
+    """Run one 'show ... json' command, return the parsed output or None"""
+    output = _vtysh(router, [command], timeout)
+    documents = split_documents(output) if output is not None else None
+    return documents[0] if documents and len(documents) == 1 else None
+
+
+def query(router, commands, timeout=10):
+    """
+    Run several 'show ... json' commands on a router in one vtysh call.
+
+    Returns a list with one parsed document (or None) per command.
+    """
+    commands = list(commands)
+    if not commands:
+        return []
+    if len(commands) > 1:
+        output = _vtysh(router, commands, timeout)
+        documents = split_documents(output) if output is not None else None
+        if documents is not None and len(documents) == len(commands):
+            return documents
+    # Can't tell which output belongs to which command: one call each
+    return [query_one(router, command, timeout) for command in commands]
+
+
+def query_many(requests, workers=32, timeout=10):
+    """
+    Query many routers concurrently.
+
+    `requests` maps router -> [commands]; returns router -> [documents].
+    """
+    if not requests:
+        return {}
+    workers = max(1, min(workers, len(requests)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {router: pool.submit(query, router, commands, timeout)
+                   for router, commands in requests.items()}
+        return {router: future.result() for router, future in futures.items()}
+
+
+def collect_state(routers, commands=STATE_COMMANDS, workers=32, timeout=10):
+    """router -> {command: document} for the same commands on every router"""
+    results = query_many({router: commands for router in routers}, workers, timeout)
+    return {router: dict(zip(commands, documents)) for router, documents in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query many routers through vtysh')
+    parser.add_argument('--routers', nargs='*', default=None,
+                        help='routers to query (default: all routers in the spec)')
+    parser.add_argument('-c', '--command', action='append', default=None,
+                        help="'show ... json' command, may be repeated "
+                             '(default: routing protocol state)')
+    parser.add_argument('--spec', default=None,
+                        help='topology spec (default: topology.json)')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--json', action='store_true',
+                        help='print all parsed documents as JSON')
+    args = parser.parse_args()
+
+    routers = args.routers or list(TopologySpec.load(args.spec).routers)
+    commands = args.command or STATE_COMMANDS
+
+    start = time.monotonic()
+    state = collect_state(routers, commands, args.workers)
+    elapsed = time.monotonic() - start
+
+    if args.json:
+        print(json.dumps(state, indent=2))
+        return
+    unreachable = 0
+    for router in routers:
+        failed = [command for command, document in state[router].items() if document is None]
+        unreachable += len(failed) == len(commands)
+        status = '✓' if not failed else '❌'
+        print(f"{status} {router}: {len(commands) - len(failed)}/{len(commands)} commands"
+              + (f" (no JSON from: {', '.join(failed)})" if failed else ''))
+    print(f"\n✅ Queried {len(routers)} routers x {len(commands)} commands "
+          f"in {elapsed * 1000:.0f} ms")
+    sys.exit(1 if unreachable else 0)
+
+
+if __name__ == '__main__':
+    main()